@@ -10,6 +10,66 @@ model_dir = project_root / "models"
 # ---------------- CONFIGURACIÓN ----------------
 st.set_page_config(page_title="Calidad del Aire en el GAM", layout="wide")
 
+# ---------------- CACHÉ DE DATOS ----------------
+DATASETS = {"contaminantes": "contaminantes", "flujo": "flujo_vehicular", "clima": "clima"}
+
+
+@st.cache_resource
+def almacen_datos():
+    from src.datos.AlmacenDatos import AlmacenDatos
+    return AlmacenDatos(project_root / "data" / "processed")
+
+
+@st.cache_data(show_spinner="Cargando datos...", max_entries=16)
+def cargar_dataset(nombre, huella):
+    # `huella` (archivo, tamaño y mtime) es parte de la clave: la caché se renueva al cambiar los datos
+    return almacen_datos().cargar(nombre)
+
+
+@st.cache_resource(show_spinner="Calculando estadísticas por bloques...", max_entries=8)
+def estadisticas_dataset(nombre, huella):
+    # Una pasada por bloques sobre el archivo: memoria acotada aunque el dataset no quepa en RAM
+    from src.eda.EstadisticasStreaming import EstadisticasStreaming
+    return EstadisticasStreaming.desde_almacen(almacen_datos(), nombre)
+
+
+@st.cache_resource
+def cubos_dataset(nombre):
+    from src.datos.CubosAgregados import CubosAgregados
+    return CubosAgregados(almacen_datos(), nombre)
+
+
+def cubos_datos() -> dict:
+    """{nombre: CubosAgregados} al día (solo stat si los datos no cambiaron; incremental si crecieron)."""
+    return {nombre: cubos_dataset(nombre).actualizar() for nombre in DATASETS.values()}
+
+
+def huellas_datos() -> dict:
+    """{clave de sesión: huella} de los datasets procesados (solo stat de archivos)."""
+    almacen = almacen_datos()
+    return {clave: almacen.huella(nombre) for clave, nombre in DATASETS.items()}
+
+
+def datos_cargados() -> dict | None:
+    """Datasets vigentes desde la caché, o None si no se han cargado en esta sesión."""
+    if not all(clave in st.session_state for clave in DATASETS):
+        return None
+    huellas = huellas_datos()
+    if any(h is None for h in huellas.values()):
+        return None
+    return {clave: cargar_dataset(DATASETS[clave], h) for clave, h in huellas.items()}
+
+
+def version_datos(huellas: dict) -> str:
+    return "|".join(h for _, h in sorted(huellas.items()))
+
+
+def tabla_unificada(huellas: dict):
+    # Misma tabla (alineada por fecha, hora y ubicación) que usa Visualizador: se une una vez por versión
+    from src.visualizacion.Visualizador import tabla_unificada as unificar
+    datos = {clave: cargar_dataset(DATASETS[clave], h) for clave, h in huellas.items()}
+    return unificar(datos["flujo"], datos["contaminantes"], datos["clima"], version_datos(huellas))
+
 # ---------------- MENÚ LATERAL ----------------
 with st.sidebar:
     menu = option_menu(
@@ -45,9 +105,14 @@ if menu == "Carga de Datos":
     st.title("Carga de Datos del Proyecto")
 
     try:
-        df_cont = pd.read_csv("data/processed/contaminantes.csv", parse_dates=["fecha"])
-        df_flujo = pd.read_csv("data/processed/flujo_vehicular.csv", parse_dates=["fecha"])
-        df_clima = pd.read_csv("data/processed/clima.csv", parse_dates=["fecha"])
+        # Parquet tipado (o CSV si es la copia más reciente), con fecha ya como datetime.
+        # Se lee de disco solo si cambió la huella del archivo; si no, sale de la caché.
+        huellas = huellas_datos()
+        if any(h is None for h in huellas.values()):
+            raise FileNotFoundError
+        df_cont = cargar_dataset("contaminantes", huellas["contaminantes"])
+        df_flujo = cargar_dataset("flujo_vehicular", huellas["flujo"])
+        df_clima = cargar_dataset("clima", huellas["clima"])
 
         st.success(" Datasets cargados desde 'data/processed/'")
         st.subheader("Contaminantes")
@@ -69,27 +134,42 @@ if menu == "Carga de Datos":
 elif menu == "EDA":
     st.title(" Análisis Exploratorio de Datos (EDA)")
 
-    if "contaminantes" in st.session_state and "flujo" in st.session_state and "clima" in st.session_state:
+    streaming = st.toggle("Modo streaming (datasets grandes)", key="eda_streaming",
+                          help="Estadísticas de una pasada por bloques sin cargar los datos completos")
+    huellas = huellas_datos()
+    if streaming:
+        datos = ({clave: estadisticas_dataset(DATASETS[clave], h) for clave, h in huellas.items()}
+                 if all(huellas.values()) else None)
+    else:
+        datos = datos_cargados()
+    if datos is not None:
         from src.eda.ProcesadorEDA import ProcesadorEDA
 
         dfs = {
-            "Contaminantes": st.session_state["contaminantes"],
-            "FlujoVehicular": st.session_state["flujo"],
-            "Clima": st.session_state["clima"]
+            "Contaminantes": datos["contaminantes"],
+            "FlujoVehicular": datos["flujo"],
+            "Clima": datos["clima"]
         }
-
-        # Crear tabla unificada
-        df_unificado = dfs["Contaminantes"].merge(
-            dfs["FlujoVehicular"], on="fecha", how="inner"
-        ).merge(
-            dfs["Clima"], on="fecha", how="inner"
-        )
-        dfs["TablaUnificada"] = df_unificado
-
-        eda = ProcesadorEDA(dfs)
-
-        dataset = st.selectbox(" Selecciona un dataset para analizar:", list(dfs.keys()))
-        df = dfs[dataset]
+        cubos = cubos_datos()
+        eda = ProcesadorEDA(dfs, huellas={
+            "Contaminantes": huellas["contaminantes"],
+            "FlujoVehicular": huellas["flujo"],
+            "Clima": huellas["clima"],
+            "TablaUnificada": version_datos(huellas),
+        }, cubos={
+            "Contaminantes": cubos["contaminantes"],
+            "FlujoVehicular": cubos["flujo_vehicular"],
+            "Clima": cubos["clima"],
+        })
+
+        # La tabla unificada necesita los datos completos en memoria
+        opciones = list(dfs.keys()) + ([] if streaming else ["TablaUnificada"])
+        dataset = st.selectbox(" Selecciona un dataset para analizar:", opciones)
+        if dataset == "TablaUnificada":
+            # Solo se construye al elegirla (cacheada por la huella de los tres datasets)
+            df = tabla_unificada(huellas)
+        else:
+            df = dfs[dataset]
 
         # Análisis clásico de EDA
         eda.info_general_df(dataset, df)
@@ -101,6 +181,8 @@ elif menu == "EDA":
         eda.analisis_temporal(freq="D")
         eda.analisis_temporal(freq="W")
 
+    elif streaming:
+        st.error(" No se encontraron los archivos procesados.")
     else:
         st.warning("️ Primero carga los datos en 'Carga de Datos'.")
 
@@ -108,13 +190,14 @@ elif menu == "EDA":
 elif menu == "Visualizaciones":
     st.title(" Visualizaciones personalizadas")
 
-    if "contaminantes" in st.session_state and "flujo" in st.session_state and "clima" in st.session_state:
-        df_cont = st.session_state["contaminantes"]
-        df_flujo = st.session_state["flujo"]
-        df_clima = st.session_state["clima"]
+    datos = datos_cargados()
+    if datos is not None:
+        df_cont = datos["contaminantes"]
+        df_flujo = datos["flujo"]
+        df_clima = datos["clima"]
 
         from src.visualizacion.Visualizador import Visualizador
-        vis = Visualizador(df_cont, df_flujo, df_clima)
+        vis = Visualizador(df_cont, df_flujo, df_clima, cubos=cubos_datos(), version=version_datos(huellas_datos()))
 
         # Consumo promedio por hora
         st.markdown("### Promedio de contaminantes por hora del día")
@@ -139,24 +222,33 @@ elif menu == "Visualizaciones":
 elif menu == "Modelos":
     st.title("Modelos de Machine Learning")
 
-    import joblib
+    from src.modelos.RegistroModelos import RegistroModelos, CargadorModelos
+
+    @st.cache_resource
+    def cargador_modelo(nombre):
+        # Uno por modelo y por proceso: recarga solo cuando se promueve otra versión
+        return CargadorModelos(RegistroModelos(model_dir / "registry"), nombre)
+
     modelos = {
-        "Calidad del Aire": "modelo_calidad_aire.pkl",
-        "Regresión (PM2.5)": "modelo_regresion.pkl",
-        "Clasificación (ICA)": "modelo_clasificacion.pkl"
+        "Regresión (PM2.5)": "modelo_regresion",
+        "Clasificación (ICA)": "modelo_clasificacion"
     }
 
     st.subheader(" Ingresa los datos para la predicción")
 
-    hora = st.slider("Hora del día", 0, 23, 12)
-    flujo = st.number_input("Flujo vehicular", min_value=0, value=1800)
-    temp = st.number_input("Temperatura (°C)", min_value=0.0, value=25.0)
-    humedad = st.slider("Humedad (%)", 0, 100, 70)
-    viento = st.number_input("Velocidad del viento (km/h)", min_value=0.0, value=7.0)
-    pm10 = st.number_input("PM10", min_value=0.0, value=50.0)
-    co = st.number_input("CO", min_value=0.0, value=1.0)
-    no2 = st.number_input("NO2", min_value=0.0, value=80.0)
-    o3 = st.number_input("O3", min_value=0.0, value=100.0)
+    # Formulario: los controles no disparan reruns hasta pulsar "Predecir"
+    with st.form("prediccion"):
+        hora = st.slider("Hora del día", 0, 23, 12)
+        flujo = st.number_input("Flujo vehicular", min_value=0, value=1800)
+        temp = st.number_input("Temperatura (°C)", min_value=0.0, value=25.0)
+        humedad = st.slider("Humedad (%)", 0, 100, 70)
+        viento = st.number_input("Velocidad del viento (km/h)", min_value=0.0, value=7.0)
+        pm10 = st.number_input("PM10", min_value=0.0, value=50.0)
+        co = st.number_input("CO", min_value=0.0, value=1.0)
+        no2 = st.number_input("NO2", min_value=0.0, value=80.0)
+        o3 = st.number_input("O3", min_value=0.0, value=100.0)
+
+        predecir = st.form_submit_button(" Predecir")
 
     ejemplo = pd.DataFrame([{
         "hora": hora,
@@ -170,22 +262,25 @@ elif menu == "Modelos":
         "o3": o3
     }])
 
-    if st.button(" Predecir"):
+    if predecir:
         for nombre, archivo in modelos.items():
-            path = model_dir / archivo
-            if path.exists():
-                modelo = joblib.load(path)
-
-                if hasattr(modelo, "feature_names_in_"):
-                    for col in modelo.feature_names_in_:
-                        if col not in ejemplo.columns:
-                            ejemplo[col] = 0.0
-                    ejemplo = ejemplo[modelo.feature_names_in_]
-
-                pred = modelo.predict(ejemplo)[0]
-                st.success(f" {nombre} → **{pred}**")
-            else:
+            try:
+                modelo, meta = cargador_modelo(archivo).modelo()
+            except FileNotFoundError:
                 st.error(f" Modelo no encontrado: {archivo}")
+                continue
+
+            features = meta.get("features") or list(ejemplo.columns)
+            entrada = ejemplo.reindex(columns=features, fill_value=0.0)
+            pred = modelo.predict(entrada)[0]
+            if nombre == "Regresión (PM2.5)":
+                from src.modelos.CalculadoraICA import CalculadoraICA
+                ica = CalculadoraICA("basico").calcular(pd.DataFrame({"pm2_5": [pred]})).iloc[0]
+                st.success(f" {nombre} → **{pred:.2f}** (ICA {ica['ica']:.0f}: {ica['ica_categoria']})")
+            else:
+                st.success(f" {nombre} → **{pred}**")
+            if meta.get("version"):
+                st.caption(f"Versión {meta['version']} · {meta.get('modelo', '')} · {meta.get('metricas', {})}")
 
 # ---------------- BASE DE DATOS ----------------
 elif menu == "Base de Datos":
@@ -320,7 +415,6 @@ utilizando técnicas de ciencia de datos, machine learning y visualización inte
 
 ## Modelos de Machine Learning
 
-- **Calidad del Aire** → predicción numérica de contaminación (ejemplo: 40.8).  
 - **Regresión (PM2.5)** → concentración estimada de partículas PM2.5.  
 - **Clasificación (ICA)** → categoría de calidad del aire:
   - `Buena`: Aire limpio.
@@ -1,63 +1,137 @@
 # Clase ClienteAPI: realiza peticiones a APIs públicas y transforma los resultados en DataFrames.
 # src/api/ClienteAPI.py
-import requests
 import pandas as pd
 from pathlib import Path
 
+from src.api.DescargadorAPI import DescargadorAPI
+from src.datos.AlmacenDatos import AlmacenDatos
+from src.helpers.Utilidades import Utilidades
+
+
+# Estaciones del GAM (ubicacion normalizada → lat, lon aproximadas del punto de aforo)
+ESTACIONES_GAM = {
+    "alajuela centro": (10.0163, -84.2116),
+    "circunvalacion": (9.9175, -84.0645),
+    "general canas": (9.9620, -84.1330),
+    "ruta 27": (9.9330, -84.1800),
+    "ruta 32": (9.9560, -84.0700),
+    "san pedro": (9.9333, -84.0500),
+    "zapote": (9.9210, -84.0600),
+}
+
 
 class ClienteAPI:
     """
     Cliente para descargar datos de calidad del aire y clima histórico
-    desde Open-Meteo.
+    desde Open-Meteo, para una coordenada o para un registro de estaciones.
     """
 
-    def __init__(self, base_dir: str = "data/processed", lat: float = 9.9281, lon: float = -84.0907):
+    URL_AIR_QUALITY = "https://air-quality-api.open-meteo.com/v1/air-quality"
+    URL_ARCHIVO = "https://archive-api.open-meteo.com/v1/archive"
+
+    def __init__(self, base_dir: str = "data/processed", lat: float = 9.9281, lon: float = -84.0907,
+                 descargador: DescargadorAPI | None = None,
+                 url_air_quality: str | None = None, url_archivo: str | None = None,
+                 estaciones: dict | None = None):
         self.lat = lat
         self.lon = lon
+        self.estaciones = {Utilidades.normalizar_texto(k): v for k, v in (estaciones or ESTACIONES_GAM).items()}
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        # Descargas por bloques concurrentes, con reintentos y caché en disco
+        self.descargador = descargador or DescargadorAPI()
+        self.url_air_quality = url_air_quality or self.URL_AIR_QUALITY
+        self.url_archivo = url_archivo or self.URL_ARCHIVO
+
+    @staticmethod
+    def _a_dataframe(respuestas: list) -> pd.DataFrame:
+        """Une los bloques horarios de varias respuestas en un solo DataFrame ordenado."""
+        df = pd.concat([pd.DataFrame(r["hourly"]) for r in respuestas], ignore_index=True)
+        df["time"] = pd.to_datetime(df["time"], errors="coerce")
+        df = df.drop_duplicates(subset="time").sort_values("time", ignore_index=True)
+        return df.dropna()
 
     def descargar_air_quality(self, start: str, end: str) -> pd.DataFrame:
         """
         Descarga calidad del aire horario (PM10, PM2.5, CO, NO2, O3).
         Formato fechas: 'YYYY-MM-DD'
         """
-        url = "https://air-quality-api.open-meteo.com/v1/air-quality"
         params = {
             "latitude": self.lat,
             "longitude": self.lon,
             "hourly": "pm10,pm2_5,carbon_monoxide,nitrogen_dioxide,ozone",
-            "start_date": start,
-            "end_date": end,
             "timezone": "America/Costa_Rica"
         }
-        r = requests.get(url, params=params, timeout=60)
-        r.raise_for_status()
-        data = r.json()
-        df = pd.DataFrame(data["hourly"])
-        df["time"] = pd.to_datetime(df["time"], errors="coerce")
-        return df.dropna()
+        return self._a_dataframe(self.descargador.obtener_por_bloques(self.url_air_quality, params, start, end))
 
     def descargar_clima_historico(self, start: str, end: str) -> pd.DataFrame:
         """
         Descarga clima histórico (temperatura, humedad, precipitación, viento).
         Formato fechas: 'YYYY-MM-DD'
         """
-        url = "https://archive-api.open-meteo.com/v1/archive"
         params = {
             "latitude": self.lat,
             "longitude": self.lon,
-            "start_date": start,
-            "end_date": end,
             "hourly": "temperature_2m,relative_humidity_2m,precipitation,wind_speed_10m",
             "timezone": "America/Costa_Rica"
         }
-        r = requests.get(url, params=params, timeout=60)
-        r.raise_for_status()
-        data = r.json()
-        df = pd.DataFrame(data["hourly"])
+        return self._a_dataframe(self.descargador.obtener_por_bloques(self.url_archivo, params, start, end))
+
+    # ===============================
+    # Varias estaciones
+    # ===============================
+    def _descargar_estaciones(self, url: str, hourly: str, start: str, end: str,
+                              estaciones: list[str] | None, tamano_lote: int) -> pd.DataFrame:
+        """
+        Descarga todas las estaciones con solicitudes multi-coordenada
+        (latitude/longitude separadas por comas, hasta `tamano_lote` por solicitud)
+        y todos los bloques de fechas en paralelo. Retorna formato largo (ubicacion, time, ...).
+        """
+        nombres = [Utilidades.normalizar_texto(n) for n in (estaciones or self.estaciones)]
+        faltantes = [n for n in nombres if n not in self.estaciones]
+        if faltantes:
+            raise KeyError(f"❌ Estaciones sin coordenadas en el registro: {faltantes}")
+
+        lotes = [nombres[i:i + tamano_lote] for i in range(0, len(nombres), tamano_lote)]
+        rangos = self.descargador.dividir_rango(start, end, self.descargador.dias_por_bloque)
+        tareas, etiquetas = [], []
+        for lote in lotes:
+            for s, e in rangos:
+                tareas.append((url, {
+                    "latitude": ",".join(str(self.estaciones[n][0]) for n in lote),
+                    "longitude": ",".join(str(self.estaciones[n][1]) for n in lote),
+                    "hourly": hourly,
+                    "start_date": s,
+                    "end_date": e,
+                    "timezone": "America/Costa_Rica"
+                }))
+                etiquetas.append(lote)
+
+        partes = []
+        for lote, respuesta in zip(etiquetas, self.descargador.obtener_muchos(tareas)):
+            # Con una sola coordenada la API responde un objeto; con varias, una lista en el mismo orden
+            respuestas = respuesta if isinstance(respuesta, list) else [respuesta]
+            for nombre, r in zip(lote, respuestas):
+                partes.append(pd.DataFrame(r["hourly"]).assign(ubicacion=nombre))
+
+        df = pd.concat(partes, ignore_index=True)
         df["time"] = pd.to_datetime(df["time"], errors="coerce")
-        return df.dropna()
+        df["ubicacion"] = df["ubicacion"].astype("category")
+        df = df.drop_duplicates(subset=["ubicacion", "time"]).sort_values(["ubicacion", "time"], ignore_index=True)
+        columnas = ["ubicacion", "time"] + [c for c in df.columns if c not in ("ubicacion", "time")]
+        return df[columnas].dropna()
+
+    def descargar_air_quality_estaciones(self, start: str, end: str, estaciones: list[str] | None = None,
+                                         tamano_lote: int = 10) -> pd.DataFrame:
+        """Calidad del aire horaria para todas las estaciones del registro (o las indicadas)."""
+        return self._descargar_estaciones(self.url_air_quality, "pm10,pm2_5,carbon_monoxide,nitrogen_dioxide,ozone",
+                                          start, end, estaciones, tamano_lote)
+
+    def descargar_clima_historico_estaciones(self, start: str, end: str, estaciones: list[str] | None = None,
+                                             tamano_lote: int = 10) -> pd.DataFrame:
+        """Clima histórico horario para todas las estaciones del registro (o las indicadas)."""
+        return self._descargar_estaciones(self.url_archivo, "temperature_2m,relative_humidity_2m,precipitation,wind_speed_10m",
+                                          start, end, estaciones, tamano_lote)
 
     def guardar_csv(self, df: pd.DataFrame, nombre: str) -> Path:
         """
@@ -67,3 +141,10 @@ class ClienteAPI:
         df.to_csv(path, index=False, encoding="utf-8")
         print(f" Archivo guardado en {path}")
         return path
+
+    def guardar(self, df: pd.DataFrame, nombre: str, formato: str = "auto") -> Path:
+        """
+        Guarda un DataFrame en data/processed mediante AlmacenDatos
+        (Parquet tipado si pyarrow está disponible, si no CSV).
+        """
+        return AlmacenDatos(self.base_dir, formato=formato).guardar(df, nombre)
@@ -0,0 +1,148 @@
+# Clase DescargadorAPI: descargas concurrentes por bloques con reintentos, límite de tasa y caché en disco.
+# src/api/DescargadorAPI.py
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class DescargadorAPI:
+    """
+    Descargador HTTP para las APIs de Open-Meteo:
+    - Divide rangos de fechas en bloques de `dias_por_bloque` días
+    - Descarga bloques (y coordenadas) en paralelo con un pool de hilos sobre una
+      única requests.Session con pool de conexiones
+    - Límite de tasa global (solicitudes por segundo) y reintentos con backoff
+      exponencial ante errores de red, 429 y 5xx (respeta Retry-After)
+    - Caché en disco de respuestas JSON por (endpoint, parámetros: lat, lon, rango, variables)
+    """
+
+    ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+    def __init__(self, workers: int = 4, dias_por_bloque: int = 31, solicitudes_por_segundo: float = 5.0,
+                 reintentos: int = 5, espera_base: float = 1.0, timeout: float = 60,
+                 ruta_cache: str | Path | None = "data/cache/api"):
+        self.workers = workers
+        self.dias_por_bloque = dias_por_bloque
+        self.intervalo = 1.0 / solicitudes_por_segundo if solicitudes_por_segundo else 0.0
+        self.reintentos = reintentos
+        self.espera_base = espera_base
+        self.timeout = timeout
+        self.ruta_cache = Path(ruta_cache) if ruta_cache else None
+        if self.ruta_cache:
+            self.ruta_cache.mkdir(parents=True, exist_ok=True)
+
+        self.session = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adaptador)
+        self.session.mount("https://", adaptador)
+
+        self._lock_tasa = threading.Lock()
+        self._proxima_solicitud = 0.0
+
+    # ===============================
+    # 1. Rangos
+    # ===============================
+    @staticmethod
+    def dividir_rango(start: str, end: str, dias_por_bloque: int) -> list[tuple[str, str]]:
+        """Divide [start, end] (fechas 'YYYY-MM-DD', inclusivas) en bloques consecutivos."""
+        inicio, fin = date.fromisoformat(start), date.fromisoformat(end)
+        bloques = []
+        while inicio <= fin:
+            cierre = min(inicio + timedelta(days=dias_por_bloque - 1), fin)
+            bloques.append((inicio.isoformat(), cierre.isoformat()))
+            inicio = cierre + timedelta(days=1)
+        return bloques
+
+    # ===============================
+    # 2. Caché
+    # ===============================
+    def _clave_cache(self, url: str, params: dict) -> str:
+        texto = json.dumps({"url": url, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def _leer_cache(self, clave: str):
+        if self.ruta_cache is None:
+            return None
+        path = self.ruta_cache / f"{clave}.json"
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _escribir_cache(self, clave: str, datos, params: dict):
+        # Rangos que llegan hasta hoy pueden estar incompletos: no se cachean
+        if self.ruta_cache is None or params.get("end_date", "") >= date.today().isoformat():
+            return
+        path = self.ruta_cache / f"{clave}.json"
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(datos, f)
+        os.replace(tmp, path)
+
+    # ===============================
+    # 3. Solicitudes
+    # ===============================
+    def _esperar_turno(self):
+        """Límite de tasa global compartido por todos los hilos."""
+        if not self.intervalo:
+            return
+        with self._lock_tasa:
+            ahora = time.monotonic()
+            turno = max(ahora, self._proxima_solicitud)
+            self._proxima_solicitud = turno + self.intervalo
+        if turno > ahora:
+            time.sleep(turno - ahora)
+
+    def _backoff(self, intento: int, retry_after: str | None = None):
+        if retry_after and retry_after.isdigit():
+            time.sleep(float(retry_after))
+        else:
+            time.sleep(self.espera_base * 2 ** intento + random.uniform(0, self.espera_base / 2))
+
+    def obtener_json(self, url: str, params: dict):
+        """GET con caché, límite de tasa y reintentos con backoff exponencial."""
+        clave = self._clave_cache(url, params)
+        datos = self._leer_cache(clave)
+        if datos is not None:
+            return datos
+
+        for intento in range(self.reintentos + 1):
+            self._esperar_turno()
+            try:
+                r = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if intento >= self.reintentos:
+                    raise
+                self._backoff(intento)
+                continue
+            if r.status_code in self.ESTADOS_REINTENTABLES and intento < self.reintentos:
+                self._backoff(intento, r.headers.get("Retry-After"))
+                continue
+            r.raise_for_status()
+            datos = r.json()
+            break
+
+        self._escribir_cache(clave, datos, params)
+        return datos
+
+    def obtener_muchos(self, tareas: list[tuple[str, dict]]) -> list:
+        """Ejecuta varias solicitudes (url, params) en paralelo y conserva el orden."""
+        if len(tareas) <= 1 or self.workers <= 1:
+            return [self.obtener_json(url, params) for url, params in tareas]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda t: self.obtener_json(*t), tareas))
+
+    def obtener_por_bloques(self, url: str, params: dict, start: str, end: str) -> list:
+        """Divide el rango en bloques y retorna las respuestas JSON de cada bloque, en orden."""
+        tareas = [(url, {**params, "start_date": s, "end_date": e})
+                  for s, e in self.dividir_rango(start, end, self.dias_por_bloque)]
+        return self.obtener_muchos(tareas)
@@ -0,0 +1,174 @@
+# Backends de base de datos: conexión y dialecto SQL para SQLite y SQL Server.
+# src/basedatos/BackendsBaseDatos.py
+import datetime
+import sqlite3
+import uuid
+from pathlib import Path
+
+# SQLite guarda fechas como texto ISO (evita los adaptadores por defecto, obsoletos en 3.12)
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(sep=" "))
+
+# Tipos compactos por dtype de pandas (comunes a ambos backends)
+TIPOS_SQL = {
+    "int8": "SMALLINT",
+    "int16": "SMALLINT",
+    "int32": "INT",
+    "int64": "INT",
+    "float32": "REAL",
+    "float64": "FLOAT",
+    "object": "NVARCHAR(255)",
+    "str": "NVARCHAR(255)",
+    "category": "NVARCHAR(100)",
+    "bool": "BIT",
+    "datetime64[ns]": "DATETIME"
+}
+
+TABLA_UBICACIONES = "Ubicaciones"
+
+
+class BackendSQLServer:
+    """SQL Server vía pyodbc (Windows Authentication o usuario/clave)."""
+
+    nombre = "SQL Server"
+    tipos_sql = {**TIPOS_SQL, "datetime64[ns]": "DATETIME2"}
+    soporta_particiones = True
+
+    def __init__(self, server, database, driver="ODBC Driver 17 for SQL Server", usuario=None, clave=None):
+        auth = f"UID={usuario};PWD={clave};" if usuario else "Trusted_Connection=yes;"
+        self.conn_str = f"DRIVER={{{driver}}};SERVER={server};DATABASE={database};{auth}"
+        self._clave = f"mssql://{server}/{database}/{usuario or 'windows'}"
+
+    def clave(self) -> str:
+        return self._clave
+
+    def conectar(self):
+        import pyodbc  # solo se requiere si se usa SQL Server
+        return pyodbc.connect(self.conn_str)
+
+    # ===============================
+    # Dialecto
+    # ===============================
+    def sql_crear_diccionario(self) -> list[str]:
+        return [f"""
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = '{TABLA_UBICACIONES}')
+        CREATE TABLE {TABLA_UBICACIONES} (
+            id SMALLINT IDENTITY(1,1) PRIMARY KEY,
+            nombre NVARCHAR(100) NOT NULL UNIQUE
+        )
+        """]
+
+    def sql_particion(self, tabla: str, limites: list[str]) -> list[str]:
+        """Función y esquema de partición mensual sobre fecha (RANGE RIGHT: un mes por partición)."""
+        valores = ", ".join(f"'{l}'" for l in limites)
+        return [
+            f"""
+            IF NOT EXISTS (SELECT * FROM sys.partition_functions WHERE name = 'pf_{tabla}_mes')
+            CREATE PARTITION FUNCTION pf_{tabla}_mes (DATE) AS RANGE RIGHT FOR VALUES ({valores})
+            """,
+            f"""
+            IF NOT EXISTS (SELECT * FROM sys.partition_schemes WHERE name = 'ps_{tabla}_mes')
+            CREATE PARTITION SCHEME ps_{tabla}_mes AS PARTITION pf_{tabla}_mes ALL TO ([PRIMARY])
+            """,
+        ]
+
+    def sql_crear_tabla(self, tabla: str, columnas_sql: str) -> str:
+        # PK no agrupada: el índice agrupado queda libre para (fecha, hora)
+        return f"""
+        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = '{tabla}')
+        CREATE TABLE {tabla} (
+            id INT IDENTITY(1,1) NOT NULL,
+            {columnas_sql},
+            CONSTRAINT PK_{tabla} PRIMARY KEY NONCLUSTERED (id) ON [PRIMARY]
+        )
+        """
+
+    def sql_indices(self, tabla: str, columnas: list[str], particionada: bool = False) -> list[str]:
+        sentencias = []
+        if "fecha" in columnas:
+            clave = "fecha, hora" if "hora" in columnas else "fecha"
+            destino = f" ON ps_{tabla}_mes(fecha)" if particionada else ""
+            sentencias.append(f"""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'CIX_{tabla}_fecha_hora')
+            CREATE CLUSTERED INDEX CIX_{tabla}_fecha_hora ON {tabla} ({clave}){destino}
+            """)
+        if "ubicacion_id" in columnas:
+            incluye = ", fecha" if "fecha" in columnas else ""
+            sentencias.append(f"""
+            IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_{tabla}_ubicacion')
+            CREATE NONCLUSTERED INDEX IX_{tabla}_ubicacion ON {tabla} (ubicacion_id{incluye})
+            """)
+        return sentencias
+
+    def sql_vista(self, tabla: str) -> list[str]:
+        return [f"""
+        CREATE OR ALTER VIEW {tabla}_v AS
+        SELECT t.*, u.nombre AS ubicacion
+        FROM {tabla} t LEFT JOIN {TABLA_UBICACIONES} u ON u.id = t.ubicacion_id
+        """]
+
+
+class BackendSQLite:
+    """SQLite local (archivo), útil para desarrollo, pruebas y como sustituto de SQL Server."""
+
+    nombre = "SQLite"
+    tipos_sql = TIPOS_SQL
+    soporta_particiones = False
+
+    def __init__(self, ruta: str | Path = "data/ContaminacionAire.db"):
+        self.ruta = str(ruta)
+        if self.ruta == ":memory:":
+            # ":memory:" daría a cada conexión del pool su propia base vacía: se usa una base
+            # en memoria con nombre y caché compartida, común a todas las conexiones de este backend
+            self.uri = f"file:memoria_{uuid.uuid4().hex}?mode=memory&cache=shared"
+        else:
+            self.uri = None
+            Path(self.ruta).parent.mkdir(parents=True, exist_ok=True)
+
+    def clave(self) -> str:
+        return f"sqlite://{self.uri or Path(self.ruta).resolve()}"
+
+    def conectar(self):
+        # check_same_thread=False: la conexión puede pasar entre hilos a través del pool
+        if self.uri:
+            return sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        return sqlite3.connect(self.ruta, check_same_thread=False)
+
+    # ===============================
+    # Dialecto
+    # ===============================
+    def sql_crear_diccionario(self) -> list[str]:
+        return [f"""
+        CREATE TABLE IF NOT EXISTS {TABLA_UBICACIONES} (
+            id INTEGER PRIMARY KEY,
+            nombre NVARCHAR(100) NOT NULL UNIQUE
+        )
+        """]
+
+    def sql_particion(self, tabla: str, limites: list[str]) -> list[str]:
+        return []  # SQLite no tiene particiones; el índice (fecha, hora) acota los rangos
+
+    def sql_crear_tabla(self, tabla: str, columnas_sql: str) -> str:
+        return f"""
+        CREATE TABLE IF NOT EXISTS {tabla} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {columnas_sql}
+        )
+        """
+
+    def sql_indices(self, tabla: str, columnas: list[str], particionada: bool = False) -> list[str]:
+        sentencias = []
+        if "fecha" in columnas:
+            clave = "fecha, hora" if "hora" in columnas else "fecha"
+            sentencias.append(f"CREATE INDEX IF NOT EXISTS IX_{tabla}_fecha_hora ON {tabla} ({clave})")
+        if "ubicacion_id" in columnas:
+            incluye = ", fecha" if "fecha" in columnas else ""
+            sentencias.append(f"CREATE INDEX IF NOT EXISTS IX_{tabla}_ubicacion ON {tabla} (ubicacion_id{incluye})")
+        return sentencias
+
+    def sql_vista(self, tabla: str) -> list[str]:
+        return [f"""
+        CREATE VIEW IF NOT EXISTS {tabla}_v AS
+        SELECT t.*, u.nombre AS ubicacion
+        FROM {tabla} t LEFT JOIN {TABLA_UBICACIONES} u ON u.id = t.ubicacion_id
+        """]
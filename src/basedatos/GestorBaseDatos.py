@@ -1,97 +1,317 @@
- #Clase GestorBaseDatos: conecta con SQLite, MySQL, PostgreSQL o SQL Server y permite ejecutar consultas.
+ #Clase GestorBaseDatos: conecta con SQLite o SQL Server (backends con pool de conexiones) y permite ejecutar consultas.
 
-import pyodbc
 import pandas as pd
 
+from src.helpers.Utilidades import Utilidades, TIPOS_COLUMNAS
+from src.basedatos.BackendsBaseDatos import BackendSQLServer, BackendSQLite, TABLA_UBICACIONES
+from src.basedatos.PoolConexiones import PoolConexiones
+
+
 class GestorBaseDatos:
-    def __init__(self, server, database):
+    def __init__(self, server=None, database=None, backend=None, pool=None, tamano_pool=5):
         """
-        Inicializa la conexión usando Windows Authentication.
+        Inicializa el gestor sobre un backend:
+        - GestorBaseDatos(server, database): SQL Server con Windows Authentication
+        - GestorBaseDatos(backend=BackendSQLite("data/ContaminacionAire.db")): SQLite local
+        Todas las instancias del mismo backend comparten un PoolConexiones.
         """
-        self.conn_str = (
-            f"DRIVER={{ODBC Driver 17 for SQL Server}};"
-            f"SERVER={server};DATABASE={database};Trusted_Connection=yes;"
-        )
+        if backend is None:
+            if server is None or database is None:
+                raise ValueError("❌ Indica server y database, o un backend")
+            backend = BackendSQLServer(server, database)
+        self.backend = backend
+        self.pool = pool or PoolConexiones.compartido(backend, tamano=tamano_pool)
         self.conn = None
+        self._columnas_tabla = {}
 
     def conectar(self):
-        """Conecta a SQL Server usando Windows Authentication."""
+        """Toma una conexión del pool compartido."""
         try:
-            self.conn = pyodbc.connect(self.conn_str)
-            print("✅ Conexión establecida con SQL Server (Windows Authentication)")
+            self.conn = self.pool.obtener()
+            print(f"✅ Conexión establecida con {self.backend.nombre} (pool de {self.pool.tamano})")
         except Exception as e:
             self.conn = None
             print(" Error en la conexión:", e)
 
-    def crear_tabla_desde_dataframe(self, df, tabla):
-        """Crea una tabla automáticamente según el DataFrame"""
+    def metricas_pool(self) -> dict:
+        """Tamaño del pool, conexiones en uso y tiempos de espera."""
+        return self.pool.metricas()
+
+    def crear_tabla_desde_dataframe(self, df, tabla, indices=True, particionar_por_mes=False):
+        """
+        Crea una tabla automáticamente según el DataFrame, con esquema compacto:
+        - fecha DATE, hora SMALLINT, contaminantes/clima REAL
+        - ubicacion se guarda como ubicacion_id SMALLINT contra la tabla diccionario Ubicaciones
+          (y se crea la vista <tabla>_v que expone el nombre)
+        - índices: agrupado en (fecha, hora) y secundario en ubicacion_id
+        - particionar_por_mes: partición mensual sobre fecha (solo SQL Server)
+        """
         if not self.conn:
             print(" No hay conexión activa.")
             return
 
         cursor = self.conn.cursor()
-
-        # Tipos de datos básicos
-        tipo_sql = {
-            "int64": "INT",
-            "float64": "FLOAT",
-            "object": "NVARCHAR(255)",
-            "bool": "BIT",
-            "datetime64[ns]": "DATETIME"
-        }
+        tipo_sql = self.backend.tipos_sql
 
         # Ajustes especiales para tus CSV
-        columnas_sql = []
+        columnas_sql, columnas = [], []
         for col, dtype in df.dtypes.items():
             if col.lower() == "fecha":
                 columnas_sql.append(f"[{col}] DATE")
             elif col.lower() == "hora":
-                columnas_sql.append(f"[{col}] INT")
+                columnas_sql.append(f"[{col}] SMALLINT")
+            elif col.lower() == "ubicacion":
+                col = "ubicacion_id"
+                columnas_sql.append(f"[{col}] SMALLINT REFERENCES {TABLA_UBICACIONES}(id)")
+            elif TIPOS_COLUMNAS.get(col) == "float32":
+                columnas_sql.append(f"[{col}] REAL")
             else:
                 columnas_sql.append(f"[{col}] {tipo_sql.get(str(dtype), 'NVARCHAR(255)')}")
+            columnas.append(col)
 
         columnas_sql_str = ", ".join(columnas_sql)
 
-        query = f"""
-        IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = '{tabla}')
-        CREATE TABLE {tabla} (
-            id INT IDENTITY(1,1) PRIMARY KEY,
-            {columnas_sql_str}
-        )
-        """
-        cursor.execute(query)
+        particionada = particionar_por_mes and self.backend.soporta_particiones and "fecha" in columnas
+        if particionar_por_mes and not particionada:
+            print(f"ℹ️ {self.backend.nombre}: sin partición por mes, se usa solo el índice (fecha, hora)")
+
+        sentencias = []
+        if "ubicacion_id" in columnas:
+            sentencias += self.backend.sql_crear_diccionario()
+        if particionada:
+            sentencias += self.backend.sql_particion(tabla, self._limites_mensuales(df["fecha"]))
+        sentencias.append(self.backend.sql_crear_tabla(tabla, columnas_sql_str))
+        if indices:
+            sentencias += self.backend.sql_indices(tabla, columnas, particionada)
+        if "ubicacion_id" in columnas:
+            sentencias += self.backend.sql_vista(tabla)
+
+        for sentencia in sentencias:
+            cursor.execute(sentencia)
         self.conn.commit()
-        print(f"🛠️ Tabla '{tabla}' creada/verificada en SQL Server")
+        self._columnas_tabla.pop(tabla, None)
+        print(f"🛠️ Tabla '{tabla}' creada/verificada en {self.backend.nombre}")
+
+    @staticmethod
+    def _limites_mensuales(fechas, meses_extra=12) -> list[str]:
+        """Primer día de cada mes entre la fecha mínima y la máxima + `meses_extra` meses."""
+        fechas = pd.to_datetime(fechas, errors="coerce").dropna()
+        if fechas.empty:
+            inicio = pd.Timestamp.today().to_period("M").start_time
+            fin = inicio
+        else:
+            inicio = fechas.min().to_period("M").start_time
+            fin = fechas.max().to_period("M").start_time
+        limites = pd.date_range(inicio, fin + pd.DateOffset(months=meses_extra), freq="MS")
+        return [d.strftime("%Y-%m-%d") for d in limites]
+
+    def _columnas(self, tabla) -> list[str]:
+        if tabla not in self._columnas_tabla:
+            cursor = self.conn.cursor()
+            cursor.execute(f"SELECT * FROM {tabla} WHERE 1 = 0")
+            self._columnas_tabla[tabla] = [d[0] for d in cursor.description]
+            cursor.close()
+        return self._columnas_tabla[tabla]
+
+    def marca_agua(self, tabla) -> pd.Timestamp | None:
+        """
+        Última fecha + hora ya guardada en la tabla (None si está vacía).
+        Permite inserciones incrementales sin estado aparte: la base de datos es la referencia.
+        """
+        if not self.conn:
+            print(" No hay conexión activa.")
+            return None
+        columnas = self._columnas(tabla)
+        if "fecha" not in columnas:
+            raise ValueError(f"❌ La tabla '{tabla}' no tiene columna fecha para insertar incrementalmente")
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT MAX(fecha) FROM {tabla}")
+            fecha = cursor.fetchone()[0]
+            if fecha is None:
+                return None
+            hora = 0
+            if "hora" in columnas:
+                # Se compara con el valor tal como lo devuelve el driver (date o texto en SQLite)
+                cursor.execute(f"SELECT MAX(hora) FROM {tabla} WHERE fecha = ?", (fecha,))
+                hora = cursor.fetchone()[0] or 0
+        finally:
+            cursor.close()
+        return pd.Timestamp(fecha).normalize() + pd.Timedelta(hours=int(hora))
 
-    def insertar_dataframe(self, df, tabla):
-        """Inserta un DataFrame completo en la tabla (optimizado con executemany)"""
+    def vaciar_tabla(self, tabla):
+        """Borra todas las filas de la tabla (conserva esquema, índices y vistas)."""
         if not self.conn:
             print(" No hay conexión activa.")
             return
+        cursor = self.conn.cursor()
+        cursor.execute(f"DELETE FROM {tabla}")
+        self.conn.commit()
+        cursor.close()
+        print(f"🧹 Tabla '{tabla}' vaciada")
 
+    def ids_ubicacion(self, nombres) -> dict:
+        """Retorna {nombre: id} en la tabla Ubicaciones, insertando los nombres nuevos."""
+        nombres = sorted({str(n) for n in nombres if pd.notna(n)})
         cursor = self.conn.cursor()
-        columnas = ",".join([f"[{c}]" for c in df.columns])
-        placeholders = ",".join("?" * len(df.columns))
-        query = f"INSERT INTO {tabla} ({columnas}) VALUES ({placeholders})"
+        cursor.execute(f"SELECT nombre, id FROM {TABLA_UBICACIONES}")
+        ids = {nombre: id_ for nombre, id_ in cursor.fetchall()}
 
-        data = [tuple(row) for row in df.to_numpy()]
-        cursor.executemany(query, data)
+        faltantes = [(n,) for n in nombres if n not in ids]
+        if faltantes:
+            cursor.executemany(f"INSERT INTO {TABLA_UBICACIONES} (nombre) VALUES (?)", faltantes)
+            self.conn.commit()
+            cursor.execute(f"SELECT nombre, id FROM {TABLA_UBICACIONES}")
+            ids = {nombre: id_ for nombre, id_ in cursor.fetchall()}
+        cursor.close()
+        return ids
 
-        self.conn.commit()
-        print(f" {len(df)} registros insertados en '{tabla}'")
+    def _a_ubicacion_id(self, bloque: pd.DataFrame) -> pd.DataFrame:
+        """Sustituye la columna ubicacion por ubicacion_id (solo valores distintos van a la BD)."""
+        ubicacion = bloque["ubicacion"].astype(str)
+        ids = self.ids_ubicacion(ubicacion.unique())
+        posicion = bloque.columns.get_loc("ubicacion")
+        bloque = bloque.drop(columns="ubicacion")
+        bloque.insert(posicion, "ubicacion_id", ubicacion.map(ids).astype("Int16"))
+        return bloque
+
+    def insertar_dataframe(self, df, tabla, tamano_lote=10_000, progreso=True):
+        """
+        Inserción masiva por lotes:
+        - `df` puede ser un DataFrame o un iterable de DataFrames (p.ej. bloques de
+          GestorDatos.iterar_csv), así nunca se materializa la lista completa de filas
+        - Cada lote se convierte columna a columna a tipos nativos (DATE, INT, FLOAT, None)
+        - Usa fast_executemany cuando el driver lo soporta (pyodbc) y hace commit por lote
+        """
+        if not self.conn:
+            print(" No hay conexión activa.")
+            return 0
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.fast_executemany = True
+        except AttributeError:
+            pass  # el driver (p.ej. sqlite3) no lo soporta
+
+        bloques = [df] if isinstance(df, pd.DataFrame) else df
+        total_conocido = len(df) if isinstance(df, pd.DataFrame) else None
+        query, insertadas = None, 0
+        for bloque in bloques:
+            # Tablas con diccionario de ubicaciones: se inserta el id en vez del texto
+            if "ubicacion" in bloque.columns and "ubicacion_id" in self._columnas(tabla):
+                bloque = self._a_ubicacion_id(bloque)
+            if query is None:
+                columnas = ",".join([f"[{c}]" for c in bloque.columns])
+                placeholders = ",".join("?" * len(bloque.columns))
+                query = f"INSERT INTO {tabla} ({columnas}) VALUES ({placeholders})"
+
+            for inicio in range(0, len(bloque), tamano_lote):
+                lote = bloque.iloc[inicio:inicio + tamano_lote]
+                cursor.executemany(query, self._filas_tipadas(lote))
+                self.conn.commit()
+                insertadas += len(lote)
+                if progreso:
+                    avance = f"/{total_conocido} ({insertadas / total_conocido:.0%})" if total_conocido else ""
+                    print(f"   ↳ {insertadas}{avance} filas insertadas en '{tabla}'")
+
+        print(f" {insertadas} registros insertados en '{tabla}'")
+        return insertadas
 
-    def consultar(self, query):
-        """Ejecuta una consulta y devuelve un DataFrame"""
+    @staticmethod
+    def _filas_tipadas(lote: pd.DataFrame) -> list:
+        """
+        Convierte un lote a tuplas con tipos nativos de Python por columna
+        (sin pasar cada valor por un array object de NumPy):
+        fecha → date, hora/enteros → int, flotantes → float, nulos → None.
+        """
+        columnas = []
+        for col in lote.columns:
+            serie = lote[col]
+            if col.lower() == "fecha" or pd.api.types.is_datetime64_any_dtype(serie.dtype):
+                fechas = pd.to_datetime(serie, errors="coerce")
+                valores = fechas.dt.date if col.lower() == "fecha" else fechas.dt.to_pydatetime()
+                columnas.append([None if pd.isna(v) else v for v in valores])
+            elif pd.api.types.is_bool_dtype(serie.dtype) or pd.api.types.is_numeric_dtype(serie.dtype):
+                if serie.isna().any():
+                    columnas.append(serie.astype(object).where(serie.notna(), None).tolist())
+                else:
+                    columnas.append(serie.tolist())
+            else:
+                columnas.append([None if pd.isna(v) else str(v) for v in serie.tolist()])
+        return list(zip(*columnas))
+
+    def consultar(self, query, params=None):
+        """Ejecuta una consulta (opcionalmente parametrizada con ?) y devuelve un DataFrame"""
         if not self.conn:
             print(" No hay conexión activa.")
             return pd.DataFrame()
-        return pd.read_sql(query, self.conn)
+        return pd.read_sql(query, self.conn, params=params)
+
+    def consultar_por_bloques(self, query, params=None, tamano_bloque=50_000, formato="pandas"):
+        """
+        Ejecuta una consulta y entrega el resultado por bloques de `tamano_bloque` filas
+        (generador), para procesar resultados más grandes que la memoria.
+        - params: parámetros de la consulta (placeholders ?)
+        - formato: "pandas" (DataFrame) o "arrow" (pyarrow.RecordBatch)
+        A cada bloque se le aplican los tipos fijos (fecha datetime, hora int8,
+        contaminantes float32, ubicacion category). Las categorías de ubicacion son las
+        mismas en todos los bloques (se pueden concatenar y comparar sus códigos).
+        """
+        if formato not in ("pandas", "arrow"):
+            raise ValueError(f"❌ Formato no soportado: {formato}")
+        if not self.conn:
+            print(" No hay conexión activa.")
+            return
+        if formato == "arrow":
+            import pyarrow as pa
+
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params or ())
+            columnas = [d[0] for d in cursor.description]
+            tipo_ubicacion = self._tipo_ubicacion(query, params) if "ubicacion" in columnas else None
+            while True:
+                filas = cursor.fetchmany(tamano_bloque)
+                if not filas:
+                    break
+                bloque = pd.DataFrame.from_records(filas, columns=columnas)
+                if tipo_ubicacion is not None:
+                    bloque["ubicacion"] = self._a_categoria(bloque["ubicacion"], tipo_ubicacion)
+                bloque = Utilidades.aplicar_tipos(bloque)
+                yield pa.RecordBatch.from_pandas(bloque, preserve_index=False) if formato == "arrow" else bloque
+        finally:
+            cursor.close()
+
+    def _tipo_ubicacion(self, query, params) -> pd.CategoricalDtype:
+        """
+        Categorías fijas de ubicacion para todos los bloques de una consulta: los nombres del
+        diccionario Ubicaciones o, si la base no lo tiene, los valores distintos del resultado.
+        """
+        cursor = self.conn.cursor()
+        try:
+            try:
+                cursor.execute(f"SELECT nombre FROM {TABLA_UBICACIONES}")
+            except Exception:
+                cursor.execute(f"SELECT DISTINCT ubicacion FROM ({query}) q", params or ())
+            nombres = sorted({str(fila[0]) for fila in cursor.fetchall() if fila[0] is not None})
+        finally:
+            cursor.close()
+        return pd.CategoricalDtype(nombres)
+
+    @staticmethod
+    def _a_categoria(serie: pd.Series, tipo: pd.CategoricalDtype) -> pd.Series:
+        categorica = serie.astype(object).where(serie.isna(), serie.astype(str)).astype(tipo)
+        desconocidas = categorica.isna() & serie.notna()
+        if desconocidas.any():
+            raise ValueError(f"❌ Ubicaciones fuera del diccionario {TABLA_UBICACIONES}: "
+                             f"{sorted(serie[desconocidas].astype(str).unique())}")
+        return categorica
 
     def cerrar(self):
-        """Cierra la conexión si existe"""
+        """Devuelve la conexión al pool si existe"""
         if self.conn:
-            self.conn.close()
+            self.pool.devolver(self.conn)
             self.conn = None
-            print("🔒 Conexión cerrada")
+            print("🔒 Conexión devuelta al pool")
         else:
             print(" No había conexión activa para cerrar")
@@ -0,0 +1,134 @@
+# Clase PoolConexiones: pool de conexiones thread-safe compartido por backend.
+# src/basedatos/PoolConexiones.py
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones para cualquier backend con conectar():
+    - Crea conexiones bajo demanda hasta `tamano`; luego espera a que se devuelva una
+    - Thread-safe (varios hilos de ingesta, la app y el entrenamiento)
+    - Métricas: tamaño, conexiones abiertas/en uso y tiempos de espera
+    - PoolConexiones.compartido(backend) reutiliza un único pool por base de datos
+    """
+
+    _compartidos = {}
+    _lock_compartidos = threading.Lock()
+
+    def __init__(self, backend, tamano: int = 5, timeout: float = 30.0):
+        self.backend = backend
+        self.tamano = tamano
+        self.timeout = timeout
+        self._libres = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._abiertas = 0
+        self._en_uso = 0
+        self._solicitudes = 0
+        self._esperas = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+
+    @classmethod
+    def compartido(cls, backend, tamano: int = 5, timeout: float = 30.0) -> "PoolConexiones":
+        """
+        Retorna el pool compartido del backend (lo crea la primera vez).
+        Si ya existe, conserva su tamaño y timeout y avisa cuando se piden otros.
+        """
+        with cls._lock_compartidos:
+            pool = cls._compartidos.get(backend.clave())
+            if pool is None:
+                pool = cls(backend, tamano=tamano, timeout=timeout)
+                cls._compartidos[backend.clave()] = pool
+            elif (tamano, timeout) != (pool.tamano, pool.timeout):
+                print(f"⚠️ Ya existe un pool de {backend.nombre} con tamaño {pool.tamano} y timeout "
+                      f"{pool.timeout:g} s: se ignoran tamaño {tamano} y timeout {timeout:g} s")
+            return pool
+
+    # ===============================
+    # 1. Obtener / devolver
+    # ===============================
+    def obtener(self, timeout: float | None = None):
+        """Toma una conexión libre, abre una nueva si hay cupo o espera hasta `timeout`."""
+        inicio = time.perf_counter()
+        with self._lock:
+            self._solicitudes += 1
+            crear = self._libres.empty() and self._abiertas < self.tamano
+            if crear:
+                self._abiertas += 1
+
+        if crear:
+            try:
+                conn = self.backend.conectar()
+            except Exception:
+                with self._lock:
+                    self._abiertas -= 1
+                raise
+        else:
+            try:
+                conn = self._libres.get(timeout=self.timeout if timeout is None else timeout)
+            except queue.Empty:
+                raise TimeoutError(f"❌ Sin conexiones libres en el pool de {self.backend.nombre} "
+                                   f"(tamaño {self.tamano})") from None
+
+        espera = time.perf_counter() - inicio
+        with self._lock:
+            self._en_uso += 1
+            if not crear:
+                self._esperas += 1
+                self._espera_total += espera
+                self._espera_max = max(self._espera_max, espera)
+        return conn
+
+    def devolver(self, conn):
+        """Devuelve la conexión al pool descartando cualquier transacción pendiente."""
+        try:
+            conn.rollback()
+        except Exception:
+            # Conexión rota: se descarta y se libera su cupo
+            with self._lock:
+                self._abiertas -= 1
+                self._en_uso -= 1
+            return
+        with self._lock:
+            self._en_uso -= 1
+        self._libres.put(conn)
+
+    @contextmanager
+    def conexion(self, timeout: float | None = None):
+        conn = self.obtener(timeout)
+        try:
+            yield conn
+        finally:
+            self.devolver(conn)
+
+    # ===============================
+    # 2. Métricas y cierre
+    # ===============================
+    def metricas(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend.nombre,
+                "tamano": self.tamano,
+                "abiertas": self._abiertas,
+                "en_uso": self._en_uso,
+                "libres": self._libres.qsize(),
+                "solicitudes": self._solicitudes,
+                "esperas": self._esperas,
+                "espera_total_s": self._espera_total,
+                "espera_promedio_s": self._espera_total / self._esperas if self._esperas else 0.0,
+                "espera_max_s": self._espera_max,
+            }
+
+    def cerrar_todas(self):
+        """Cierra las conexiones libres del pool (las que están en uso no se tocan)."""
+        while True:
+            try:
+                conn = self._libres.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._abiertas -= 1
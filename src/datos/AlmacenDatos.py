@@ -0,0 +1,279 @@
+# Clase AlmacenDatos: guarda y carga los datasets procesados en Parquet (tipado) o CSV.
+# src/datos/AlmacenDatos.py
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from src.helpers.Utilidades import Utilidades, COLUMNAS_FECHA
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional: sin él se usa CSV
+    pa = ds = pq = None
+
+
+# Columna temporal de cada dataset procesado (para filtros por rango)
+COLUMNA_TIEMPO = {
+    "clima": "fecha",
+    "contaminantes": "fecha",
+    "flujo_vehicular": "fecha",
+    "TablaUnificada": "fecha",
+    "air_quality_clean": "time",
+    "clima_historico": "time",
+}
+
+
+class AlmacenDatos:
+    """
+    Capa de almacenamiento para data/processed:
+    - "parquet": un directorio <nombre>.parquet/ con archivos part-*.parquet,
+      tipos fijos, proyección de columnas y filtros por fecha a nivel de row group
+    - "csv": el formato original <nombre>.csv (compatibilidad)
+    - "auto": parquet si pyarrow está instalado, si no csv
+    """
+
+    TAMANO_ROW_GROUP = 64_000
+    MAX_PARTES = 64  # al superarlo, anexar() compacta el dataset en un solo archivo
+
+    def __init__(self, ruta: str | Path = "data/processed", formato: str = "auto"):
+        if formato not in ("auto", "parquet", "csv"):
+            raise ValueError(f"❌ Formato no soportado: {formato}")
+        if formato == "auto":
+            formato = "parquet" if pa is not None else "csv"
+        if formato == "parquet" and pa is None:
+            raise ImportError("❌ El formato parquet requiere pyarrow")
+
+        self.ruta = Path(ruta)
+        self.formato = formato
+        Utilidades.asegurar_directorio(self.ruta)
+
+    # ===============================
+    # 1. Rutas
+    # ===============================
+    @staticmethod
+    def nombre_dataset(nombre: str) -> str:
+        """'clima.csv' / 'clima.parquet' / 'clima' → 'clima'"""
+        base, ext = os.path.splitext(os.path.basename(nombre))
+        return base if ext in (".csv", ".parquet") else os.path.basename(nombre)
+
+    def ruta_csv(self, nombre: str) -> Path:
+        return self.ruta / f"{self.nombre_dataset(nombre)}.csv"
+
+    def ruta_parquet(self, nombre: str) -> Path:
+        return self.ruta / f"{self.nombre_dataset(nombre)}.parquet"
+
+    def _partes_parquet(self, nombre: str) -> list[Path]:
+        path = self.ruta_parquet(nombre)
+        if not path.is_dir():
+            return []
+        return sorted(path.glob("part-*.parquet"))
+
+    def _mtime_parquet(self, nombre: str) -> float:
+        partes = self._partes_parquet(nombre)
+        return max(p.stat().st_mtime for p in partes) if partes else -1.0
+
+    def _mtime_csv(self, nombre: str) -> float:
+        path = self.ruta_csv(nombre)
+        return path.stat().st_mtime if path.exists() else -1.0
+
+    def existe(self, nombre: str) -> bool:
+        return self._mtime_parquet(nombre) >= 0 or self._mtime_csv(nombre) >= 0
+
+    def archivos(self, nombre: str) -> list[tuple[str, int, int]]:
+        """(nombre, tamaño, mtime_ns) de cada archivo de la copia vigente, en orden."""
+        formato = self.formato_vigente(nombre)
+        if formato is None:
+            return []
+        paths = self._partes_parquet(nombre) if formato == "parquet" else [self.ruta_csv(nombre)]
+        return [(p.name, p.stat().st_size, p.stat().st_mtime_ns) for p in paths]
+
+    def huella(self, nombre: str) -> str | None:
+        """
+        Huella barata de la copia vigente (formato + nombre, tamaño y mtime de cada archivo),
+        sin leer los datos. Cambia con guardar()/anexar(); sirve como clave de caché.
+        """
+        formato = self.formato_vigente(nombre)
+        if formato is None:
+            return None
+        return formato + ";" + ";".join(f"{n}:{t}:{m}" for n, t, m in self.archivos(nombre))
+
+    def formato_vigente(self, nombre: str) -> str | None:
+        """Formato con la copia más reciente del dataset (None si no existe)."""
+        t_parquet, t_csv = self._mtime_parquet(nombre), self._mtime_csv(nombre)
+        if t_parquet < 0 and t_csv < 0:
+            return None
+        if t_parquet >= t_csv and pa is not None:
+            return "parquet"
+        return "csv" if t_csv >= 0 else None
+
+    @staticmethod
+    def columna_tiempo(nombre: str, columnas) -> str | None:
+        col = COLUMNA_TIEMPO.get(AlmacenDatos.nombre_dataset(nombre))
+        if col in columnas:
+            return col
+        return next((c for c in COLUMNAS_FECHA if c in columnas), None)
+
+    # ===============================
+    # 2. Escritura
+    # ===============================
+    def guardar(self, df: pd.DataFrame, nombre: str) -> Path:
+        """Guarda (reemplaza) un dataset completo en el formato del almacén."""
+        if self.formato == "csv":
+            path = self.ruta_csv(nombre)
+            df.to_csv(path, index=False)
+        else:
+            path = self.ruta_parquet(nombre)
+            df = Utilidades.aplicar_tipos(df)
+            col_t = self.columna_tiempo(nombre, df.columns)
+            if col_t is not None and not df[col_t].is_monotonic_increasing:
+                # Ordenado por tiempo, las estadísticas por row group permiten saltar meses completos
+                df = df.sort_values(col_t, kind="stable")
+
+            tmp = path.with_name(path.name + ".tmp")
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir(parents=True)
+            pq.write_table(
+                pa.Table.from_pandas(df, preserve_index=False),
+                tmp / "part-00000.parquet",
+                row_group_size=self.TAMANO_ROW_GROUP,
+            )
+            self.reemplazar_directorio(tmp, path)
+
+        print(f"✅ Dataset '{self.nombre_dataset(nombre)}' guardado en {path}")
+        return path
+
+    def anexar(self, df: pd.DataFrame, nombre: str) -> Path:
+        """
+        Agrega filas al final de un dataset sin reescribirlo:
+        - parquet: un nuevo part-NNNNN.parquet (se compacta cada MAX_PARTES)
+        - csv: append sin cabecera
+        Las columnas se alinean con las del dataset existente.
+        """
+        vigente = self.formato_vigente(nombre)
+        if vigente is None:
+            return self.guardar(df, nombre)
+        if vigente != self.formato:
+            # La copia vigente está en el otro formato: se migra una sola vez
+            previo = self.cargar(nombre)
+            return self.guardar(pd.concat([previo, df.reindex(columns=previo.columns)], ignore_index=True), nombre)
+
+        if self.formato == "csv":
+            path = self.ruta_csv(nombre)
+            df = df.reindex(columns=pd.read_csv(path, nrows=0).columns)
+            df.to_csv(path, index=False, mode="a", header=False)
+        else:
+            path = self.ruta_parquet(nombre)
+            partes = self._partes_parquet(nombre)
+            esquema = pq.read_schema(partes[0])
+            df = Utilidades.aplicar_tipos(df.reindex(columns=esquema.names))
+            siguiente = int(partes[-1].stem.split("-")[1]) + 1
+            destino = path / f"part-{siguiente:05d}.parquet"
+            tmp = destino.with_name(destino.name + ".tmp")
+            tabla = pa.Table.from_pandas(df, preserve_index=False).cast(esquema)
+            pq.write_table(tabla, tmp, row_group_size=self.TAMANO_ROW_GROUP)
+            os.replace(tmp, destino)
+            if len(partes) + 1 > self.MAX_PARTES:
+                self.compactar(nombre)
+
+        print(f"✅ {len(df)} filas anexadas a '{self.nombre_dataset(nombre)}'")
+        return path
+
+    def compactar(self, nombre: str):
+        """Reescribe un dataset parquet de varias partes como un único archivo ordenado."""
+        if self.formato == "parquet" and len(self._partes_parquet(nombre)) > 1:
+            self.guardar(self._cargar_parquet(nombre, None, None, None), nombre)
+
+    @staticmethod
+    def reemplazar_directorio(tmp: Path, destino: Path):
+        """Sustituye `destino` por `tmp` minimizando la ventana sin datos."""
+        viejo = destino.with_name(destino.name + ".old")
+        shutil.rmtree(viejo, ignore_errors=True)
+        if destino.exists():
+            os.replace(destino, viejo)
+        os.replace(tmp, destino)
+        shutil.rmtree(viejo, ignore_errors=True)
+
+    # ===============================
+    # 3. Lectura
+    # ===============================
+    def cargar(self, nombre: str, columnas: list[str] | None = None,
+               desde=None, hasta=None) -> pd.DataFrame:
+        """
+        Carga un dataset con tipos fijos.
+        - columnas: proyección (solo se leen esas columnas en parquet)
+        - desde / hasta: rango [desde, hasta) sobre fecha/time; en parquet se
+          descartan los row groups fuera del rango sin leerlos
+        Se usa la copia más reciente (parquet o csv) del dataset.
+        """
+        formato = self.formato_vigente(nombre)
+        if formato is None:
+            raise FileNotFoundError(f"❌ No se encontró el dataset {self.nombre_dataset(nombre)} en {self.ruta}")
+        if formato == "parquet":
+            return self._cargar_parquet(nombre, columnas, desde, hasta)
+        return self._cargar_csv(nombre, columnas, desde, hasta)
+
+    def iterar(self, nombre: str, columnas: list[str] | None = None, tamano_bloque: int = 200_000):
+        """Recorre la copia vigente por bloques tipados de hasta `tamano_bloque` filas (memoria acotada)."""
+        formato = self.formato_vigente(nombre)
+        if formato is None:
+            raise FileNotFoundError(f"❌ No se encontró el dataset {self.nombre_dataset(nombre)} en {self.ruta}")
+        if formato == "parquet":
+            dataset = ds.dataset([str(p) for p in self._partes_parquet(nombre)], format="parquet")
+            for lote in dataset.to_batches(columns=columnas, batch_size=tamano_bloque):
+                yield Utilidades.aplicar_tipos(lote.to_pandas())
+        else:
+            with pd.read_csv(self.ruta_csv(nombre), usecols=columnas, chunksize=tamano_bloque) as lector:
+                for bloque in lector:
+                    yield Utilidades.aplicar_tipos(bloque)
+
+    def columnas(self, nombre: str) -> list[str]:
+        """Nombres de columnas del dataset sin leer los datos (esquema parquet o cabecera csv)."""
+        formato = self.formato_vigente(nombre)
+        if formato is None:
+            raise FileNotFoundError(f"❌ No se encontró el dataset {self.nombre_dataset(nombre)} en {self.ruta}")
+        if formato == "parquet":
+            return list(pq.read_schema(self._partes_parquet(nombre)[0]).names)
+        return list(pd.read_csv(self.ruta_csv(nombre), nrows=0).columns)
+
+    def _cargar_parquet(self, nombre, columnas, desde, hasta) -> pd.DataFrame:
+        dataset = ds.dataset([str(p) for p in self._partes_parquet(nombre)], format="parquet")
+        col_t = self.columna_tiempo(nombre, dataset.schema.names)
+
+        filtro = None
+        if col_t is not None:
+            tipo_t = dataset.schema.field(col_t).type
+            if desde is not None:
+                filtro = ds.field(col_t) >= pa.scalar(pd.Timestamp(desde), type=tipo_t)
+            if hasta is not None:
+                cond = ds.field(col_t) < pa.scalar(pd.Timestamp(hasta), type=tipo_t)
+                filtro = cond if filtro is None else filtro & cond
+
+        tabla = dataset.to_table(columns=columnas, filter=filtro)
+        return Utilidades.aplicar_tipos(tabla.to_pandas())
+
+    def _cargar_csv(self, nombre, columnas, desde, hasta) -> pd.DataFrame:
+        path = self.ruta_csv(nombre)
+        cabecera = pd.read_csv(path, nrows=0).columns
+        col_t = self.columna_tiempo(nombre, cabecera)
+
+        usecols = None
+        if columnas is not None:
+            usecols = list(columnas)
+            if col_t is not None and (desde is not None or hasta is not None) and col_t not in usecols:
+                usecols.append(col_t)
+
+        df = Utilidades.aplicar_tipos(pd.read_csv(path, usecols=usecols))
+        if col_t is not None and (desde is not None or hasta is not None):
+            mascara = pd.Series(True, index=df.index)
+            if desde is not None:
+                mascara &= df[col_t] >= pd.Timestamp(desde)
+            if hasta is not None:
+                mascara &= df[col_t] < pd.Timestamp(hasta)
+            df = df[mascara].reset_index(drop=True)
+        if columnas is not None:
+            df = df[list(columnas)]
+        return df
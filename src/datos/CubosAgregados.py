@@ -0,0 +1,231 @@
+# Clase CubosAgregados: rollups materializados (hora del día, día, semana, mes) por ubicación y variable.
+# src/datos/CubosAgregados.py
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.datos.AlmacenDatos import AlmacenDatos
+from src.datos.UnificadorDatos import UnificadorDatos
+
+try:
+    import pyarrow  # noqa: F401  (to_parquet/read_parquet)
+    EXTENSION = ".parquet"
+except ImportError:  # pyarrow es opcional: sin él los cubos se guardan con pickle
+    EXTENSION = ".pkl"
+
+GRANULARIDADES = ("hora_dia", "dia", "semana", "mes")
+# Frecuencia pandas equivalente de cada granularidad temporal (semanas de lunes a domingo)
+FRECUENCIA = {"dia": "D", "semana": "W-MON", "mes": "MS"}
+CLAVES = ["periodo", "ubicacion", "variable"]
+TOTAL = "(todas)"  # ubicación de los datasets sin columna ubicacion
+
+_COMBINAR = {"count": "sum", "sum": "sum", "min": "min", "max": "max", "sumsq": "sum"}
+
+
+class CubosAgregados:
+    """
+    Agregados de un dataset procesado, materializados una vez por versión de datos:
+
+        data/processed/.cubos/<nombre>/<granularidad>.parquet   (periodo, ubicacion, variable,
+                                                                 count, sum, min, max, sumsq)
+        data/processed/.cubos/<nombre>/estado.json              (archivos de origen, marca de agua)
+
+    - Granularidades: hora del día (0-23), día, semana y mes
+    - count/sum/min/max/sumsq se combinan exactamente, así que agregar horas nuevas no
+      requiere releer el histórico: actualizar() lee solo las filas posteriores a la marca
+      de agua cuando el dataset creció por anexar() (las horas nuevas llegan en orden,
+      como en UnificacionIncremental); si fue reemplazado, reconstruye
+    - Sin cambios en los archivos de origen, actualizar() solo hace un stat por archivo
+    - Los gráficos consultan con consulta()/serie(), que derivan media y desviación
+    """
+
+    def __init__(self, almacen: AlmacenDatos | None, nombre: str, variables: list[str] | None = None):
+        self.almacen = almacen
+        self.nombre = AlmacenDatos.nombre_dataset(nombre)
+        self.variables = variables
+        self.ruta = almacen.ruta / ".cubos" / self.nombre if almacen is not None else None
+        self.cubos = {}
+        self.estado = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame, nombre: str = "dataset", variables: list[str] | None = None):
+        """Cubos en memoria para un DataFrame ya cargado (sin persistencia ni actualización)."""
+        cubos = cls(None, nombre, variables)
+        cubos.cubos = cls.agregar(df, variables)
+        return cubos
+
+    # ===============================
+    # 1. Cálculo
+    # ===============================
+    @staticmethod
+    def _periodos(marca: pd.Series) -> dict:
+        valores = marca.to_numpy(dtype="datetime64[ns]")
+        dias = valores.astype("datetime64[D]")
+        # 1970-01-01 fue jueves: +3 lleva el lunes al inicio de la semana
+        lunes = dias - ((dias.astype("int64") + 3) % 7).astype("timedelta64[D]")
+        return {
+            "hora_dia": marca.dt.hour.to_numpy(dtype="int16"),
+            "dia": dias.astype("datetime64[ns]"),
+            "semana": lunes.astype("datetime64[ns]"),
+            "mes": valores.astype("datetime64[M]").astype("datetime64[ns]"),
+        }
+
+    @staticmethod
+    def agregar(df: pd.DataFrame, variables: list[str] | None = None) -> dict:
+        """{granularidad: cubo} de un bloque de filas (índice periodo, ubicacion, variable)."""
+        if variables is None:
+            variables = [c for c in df.select_dtypes(include="number").columns if c != "hora"]
+        marca = UnificadorDatos.marca_temporal(df)
+        validas = marca.notna().to_numpy()
+        valores = df.loc[validas, variables].astype("float64")
+        ubicacion = (df.loc[validas, "ubicacion"].astype(str).to_numpy() if "ubicacion" in df.columns
+                     else np.full(validas.sum(), TOTAL, dtype=object))
+        cuadrados = valores.pow(2).add_suffix("__sq")
+        tabla = pd.concat([valores, cuadrados], axis=1)
+
+        cubos = {}
+        for granularidad, periodo in CubosAgregados._periodos(marca[validas]).items():
+            grupos = tabla.groupby([periodo, ubicacion], sort=False)
+            partes = {
+                "count": grupos[variables].count(),
+                "sum": grupos[variables].sum(),
+                "min": grupos[variables].min(),
+                "max": grupos[variables].max(),
+                "sumsq": grupos[cuadrados.columns].sum().set_axis(variables, axis=1),
+            }
+            cubo = pd.concat({k: v.stack() for k, v in partes.items()}, axis=1)
+            cubo.index.names = CLAVES
+            cubos[granularidad] = cubo[cubo["count"] > 0].sort_index()
+        return cubos
+
+    @staticmethod
+    def combinar(a: dict, b: dict) -> dict:
+        """Suma exacta de dos conjuntos de cubos (mismo esquema)."""
+        if not a:
+            return b
+        return {g: pd.concat([a[g], b[g]]).groupby(level=CLAVES).agg(_COMBINAR) if g in b else a[g] for g in a}
+
+    # ===============================
+    # 2. Persistencia y actualización
+    # ===============================
+    def _path(self, granularidad: str) -> Path:
+        return self.ruta / f"{granularidad}{EXTENSION}"
+
+    def _guardar(self):
+        self.ruta.mkdir(parents=True, exist_ok=True)
+        for granularidad, cubo in self.cubos.items():
+            path = self._path(granularidad)
+            tmp = path.with_name(path.name + ".tmp")
+            if EXTENSION == ".parquet":
+                cubo.reset_index().to_parquet(tmp, index=False)
+            else:
+                cubo.to_pickle(tmp)
+            os.replace(tmp, path)
+        # El estado se escribe al final: si algo falla antes, la próxima ejecución reconstruye
+        tmp = self.ruta / "estado.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, indent=2)
+        os.replace(tmp, self.ruta / "estado.json")
+
+    def _cargar(self) -> bool:
+        path_estado = self.ruta / "estado.json"
+        if not path_estado.exists() or not all(self._path(g).exists() for g in GRANULARIDADES):
+            return False
+        with open(path_estado, encoding="utf-8") as f:
+            self.estado = json.load(f)
+        if EXTENSION == ".parquet":
+            self.cubos = {g: pd.read_parquet(self._path(g)).set_index(CLAVES) for g in GRANULARIDADES}
+        else:
+            self.cubos = {g: pd.read_pickle(self._path(g)) for g in GRANULARIDADES}
+        return True
+
+    def _solo_anexado(self, archivos: list) -> bool:
+        """True si los archivos previos siguen intactos y el dataset solo creció."""
+        previos = [tuple(a) for a in self.estado.get("archivos", [])]
+        if not previos or self.estado.get("variables") != self.variables:
+            return False
+        if archivos[0][0].endswith(".csv"):
+            return previos[0][0] == archivos[0][0] and archivos[0][1] >= previos[0][1]
+        return len(archivos) > len(previos) and archivos[:len(previos)] == previos
+
+    def actualizar(self) -> "CubosAgregados":
+        """Pone los cubos al día con el dataset (incremental si solo hubo anexar())."""
+        with self._lock:
+            archivos = [list(a) for a in self.almacen.archivos(self.nombre)]
+            if not archivos:
+                raise FileNotFoundError(f"❌ No se encontró el dataset {self.nombre} en {self.almacen.ruta}")
+            if not self.cubos:
+                self._cargar()
+            if self.cubos and self.estado.get("archivos") == archivos:
+                return self
+
+            if self.cubos and self._solo_anexado([tuple(a) for a in archivos]):
+                marca_agua = pd.Timestamp(self.estado["marca_agua"])
+                df = self.almacen.cargar(self.nombre, desde=marca_agua.normalize())
+                df = df[(UnificadorDatos.marca_temporal(df) > marca_agua).to_numpy()]
+                print(f"ℹ️ Cubos de '{self.nombre}': {len(df)} filas nuevas desde {marca_agua}")
+                if len(df):
+                    self.cubos = self.combinar(self.cubos, self.agregar(df, self.variables))
+                    self.estado["marca_agua"] = max(marca_agua, UnificadorDatos.marca_temporal(df).max()).isoformat()
+                    self.estado["filas"] += len(df)
+            else:
+                # Reconstrucción por bloques: la memoria no depende del tamaño del dataset
+                self.cubos, marca, filas = {}, pd.NaT, 0
+                for bloque in self.almacen.iterar(self.nombre):
+                    self.cubos = self.combinar(self.cubos, self.agregar(bloque, self.variables))
+                    ultima = UnificadorDatos.marca_temporal(bloque).max()
+                    if pd.isna(marca) or ultima > marca:
+                        marca = ultima
+                    filas += len(bloque)
+                print(f"ℹ️ Cubos de '{self.nombre}': reconstrucción completa ({filas} filas)")
+                self.estado = {"marca_agua": None if pd.isna(marca) else marca.isoformat(), "filas": filas}
+
+            self.estado["archivos"] = archivos
+            self.estado["variables"] = self.variables
+            self._guardar()
+            return self
+
+    # ===============================
+    # 3. Consulta
+    # ===============================
+    def consulta(self, granularidad: str, variables: list[str] | None = None,
+                 ubicaciones: list[str] | None = None, por_ubicacion: bool = False) -> pd.DataFrame:
+        """
+        count, mean, std, min, max por periodo (y ubicación si por_ubicacion) y variable.
+        Con granularidad=None se agrega sobre todo el periodo (útil para promedios por ubicación).
+        """
+        cubo = self.cubos["mes" if granularidad is None else granularidad]
+        if variables is not None:
+            cubo = cubo[cubo.index.get_level_values("variable").isin(variables)]
+        if ubicaciones is not None:
+            cubo = cubo[cubo.index.get_level_values("ubicacion").isin(ubicaciones)]
+
+        niveles = ([] if granularidad is None else ["periodo"]) + (["ubicacion"] if por_ubicacion else []) \
+            + ["variable"]
+        if niveles != CLAVES:
+            cubo = cubo.groupby(level=niveles, sort=True).agg(_COMBINAR)
+
+        n = cubo["count"]
+        resultado = pd.DataFrame({
+            "count": n,
+            "mean": cubo["sum"] / n,
+            "std": np.sqrt(((cubo["sumsq"] - cubo["sum"] ** 2 / n) / (n - 1)).clip(lower=0)).where(n > 1),
+            "min": cubo["min"],
+            "max": cubo["max"],
+        })
+        return resultado.reset_index()
+
+    def serie(self, granularidad: str, variable: str, estadistico: str = "mean",
+              ubicaciones: list[str] | None = None) -> pd.Series:
+        """Serie de un estadístico indexada por periodo; los periodos sin datos quedan en NaN."""
+        tabla = self.consulta(granularidad, [variable], ubicaciones)
+        serie = tabla.set_index("periodo")[estadistico].rename(variable)
+        if granularidad in FRECUENCIA and len(serie):
+            serie = serie.reindex(pd.date_range(serie.index.min(), serie.index.max(),
+                                                freq=FRECUENCIA[granularidad]))
+        return serie
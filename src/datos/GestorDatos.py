@@ -1,7 +1,14 @@
 # src/datos/GestorDatos.py
+import json
 import pandas as pd
 import os
+import shutil
+from pathlib import Path
+from typing import Iterator
 from src.helpers.Utilidades import Utilidades
+from src.datos.AlmacenDatos import AlmacenDatos
+from src.datos.UnificadorDatos import UnificadorDatos
+from src.datos.UnificacionIncremental import UnificacionIncremental
 
 
 class GestorDatos:
@@ -10,13 +17,16 @@ class GestorDatos:
     - Cargar archivos CSV desde data/raw o data/processed
     - Limpiar cada dataset (normalización de nombres, fechas, valores)
     - Unificar clima, flujo vehicular y contaminantes en una sola tabla
+    - Guardar los procesados mediante AlmacenDatos (Parquet tipado o CSV)
     """
 
-    def __init__(self, ruta_raw: str = "data/raw", ruta_processed: str = "data/processed"):
+    def __init__(self, ruta_raw: str = "data/raw", ruta_processed: str = "data/processed",
+                 formato: str = "auto"):
         self.ruta_raw = ruta_raw
         self.ruta_processed = ruta_processed
         Utilidades.asegurar_directorio(self.ruta_raw)
         Utilidades.asegurar_directorio(self.ruta_processed)
+        self.almacen = AlmacenDatos(self.ruta_processed, formato=formato)
 
     # ===============================
     # 1. Limpieza general
@@ -27,7 +37,7 @@ class GestorDatos:
 
         # Normalizar ubicación si existe
         if "ubicacion" in df.columns:
-            df["ubicacion"] = df["ubicacion"].astype(str).apply(Utilidades.normalizar_texto)
+            df["ubicacion"] = Utilidades.normalizar_serie(df["ubicacion"])
 
         # Convertir fecha
         if "fecha" in df.columns:
@@ -37,15 +47,20 @@ class GestorDatos:
         if "hora" in df.columns:
             df["hora"] = pd.to_numeric(df["hora"], errors="coerce").fillna(0).astype(int)
 
+        # Filtros combinados en una sola máscara (una única copia del frame)
+        mascara = pd.Series(True, index=df.index)
+
         # Filtrar humedad
         if "humedad" in df.columns:
-            df = df[df["humedad"].between(0, 100)]
+            mascara &= df["humedad"].between(0, 100)
 
         # Filtrar contaminantes negativos
         for col in ["pm2_5", "pm10", "co", "no2", "o3"]:
             if col in df.columns:
-                df = df[df[col] >= 0]
+                mascara &= df[col] >= 0
 
+        if not mascara.all():
+            df = df[mascara]
         return df
 
     def guardar_csv(self, df: pd.DataFrame, nombre_archivo: str):
@@ -53,25 +68,47 @@ class GestorDatos:
         df.to_csv(path, index=False)
         print(f"✅ Archivo limpio guardado en {path}")
 
+    def guardar(self, df: pd.DataFrame, nombre_archivo: str):
+        """Guarda un procesado en el formato del almacén (parquet o csv)."""
+        return self.almacen.guardar(df, nombre_archivo)
+
     # ===============================
     # 2. Carga de archivos
     # ===============================
     def cargar_csv(self, nombre_archivo: str, procesar: bool = True) -> pd.DataFrame:
         """
-        Carga un CSV desde data/raw o data/processed.
+        Carga un CSV desde data/raw o, si no existe, el procesado más
+        reciente (parquet o csv) desde data/processed.
         Si procesar=True, aplica limpieza.
         """
         path_raw = os.path.join(self.ruta_raw, nombre_archivo)
-        path_proc = os.path.join(self.ruta_processed, nombre_archivo)
+        if os.path.exists(path_raw):
+            df = pd.read_csv(path_raw)
+        else:
+            df = self.almacen.cargar(nombre_archivo)
+        if procesar:
+            df = self.limpiar_dataframe(df)
+        return df
 
+    def _resolver_ruta(self, nombre_archivo: str) -> str:
+        path_raw = os.path.join(self.ruta_raw, nombre_archivo)
+        path_proc = os.path.join(self.ruta_processed, nombre_archivo)
         path = path_raw if os.path.exists(path_raw) else path_proc
         if not os.path.exists(path):
             raise FileNotFoundError(f"❌ No se encontró {nombre_archivo} en raw ni processed")
+        return path
 
-        df = pd.read_csv(path)
-        if procesar:
-            df = self.limpiar_dataframe(df)
-        return df
+    def iterar_csv(self, nombre_archivo: str, tamano_bloque: int = 100_000,
+                   procesar: bool = True) -> Iterator[pd.DataFrame]:
+        """
+        Lee un CSV por bloques de `tamano_bloque` filas.
+        Cada bloque se limpia con las mismas reglas que limpiar_dataframe,
+        por lo que la memoria queda acotada por el tamaño del bloque.
+        """
+        path = self._resolver_ruta(nombre_archivo)
+        with pd.read_csv(path, chunksize=tamano_bloque) as lector:
+            for bloque in lector:
+                yield self.limpiar_dataframe(bloque) if procesar else bloque
 
     # ===============================
     # 3. Procesamiento completo de un archivo
@@ -81,19 +118,140 @@ class GestorDatos:
         Carga, limpia y guarda un CSV desde data/raw hacia data/processed.
         Retorna el DataFrame limpio.
         """
-        df = self.cargar_csv(nombre_archivo)
-        df_limpio = self.limpiar_dataframe(df)
-        self.guardar_csv(df_limpio, nombre_archivo)
+        # cargar_csv ya aplica limpiar_dataframe: no se limpia dos veces
+        df_limpio = self.cargar_csv(nombre_archivo)
+        self.guardar(df_limpio, nombre_archivo)
         return df_limpio
 
+    def procesar_archivo_por_bloques(self, nombre_archivo: str, tamano_bloque: int = 100_000,
+                                     formato: str = "csv") -> int:
+        """
+        Versión en streaming de procesar_archivo para archivos grandes.
+        Lee, limpia y escribe bloque a bloque (formato "csv" o "parquet"),
+        sin materializar el archivo completo. Retorna el número de filas escritas.
+
+        La salida CSV es idéntica a la del camino en memoria siempre que
+        cada columna conserve el mismo tipo en todos los bloques.
+        """
+        if formato not in ("csv", "parquet"):
+            raise ValueError(f"❌ Formato no soportado: {formato}")
+        if formato == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+        if formato == "csv":
+            path = str(self.almacen.ruta_csv(nombre_archivo))
+            path_tmp = path + ".tmp"
+        else:
+            # Mismo layout que AlmacenDatos: <nombre>.parquet/part-00000.parquet
+            path = str(self.almacen.ruta_parquet(nombre_archivo))
+            dir_tmp = path + ".tmp"
+            Utilidades.asegurar_directorio(dir_tmp)
+            path_tmp = os.path.join(dir_tmp, "part-00000.parquet")
+
+        filas = 0
+        escritor = None
+        try:
+            for i, bloque in enumerate(self.iterar_csv(nombre_archivo, tamano_bloque)):
+                if formato == "csv":
+                    bloque.to_csv(path_tmp, index=False, mode="w" if i == 0 else "a", header=(i == 0))
+                else:
+                    tabla = pa.Table.from_pandas(Utilidades.aplicar_tipos(bloque), preserve_index=False)
+                    if escritor is None:
+                        escritor = pq.ParquetWriter(path_tmp, tabla.schema)
+                    escritor.write_table(tabla.cast(escritor.schema))
+                filas += len(bloque)
+        except BaseException:
+            # Un fallo a mitad del stream no deja el temporal a medio escribir en disco
+            if escritor is not None:
+                escritor.close()
+                escritor = None
+            if formato == "csv":
+                Path(path_tmp).unlink(missing_ok=True)
+            else:
+                shutil.rmtree(dir_tmp, ignore_errors=True)
+            raise
+        finally:
+            if escritor is not None:
+                escritor.close()
+
+        # Archivo temporal + reemplazo atómico: nunca queda un procesado a medias
+        if formato == "csv" and os.path.exists(path_tmp):
+            os.replace(path_tmp, path)
+        elif formato == "parquet" and os.path.exists(path_tmp):
+            AlmacenDatos.reemplazar_directorio(Path(dir_tmp), Path(path))
+        print(f"✅ {filas} filas procesadas por bloques en {path}")
+        return filas
+
+    def _path_estado_ingesta(self, nombre_archivo: str) -> Path:
+        return Path(self.ruta_processed) / ".ingesta" / f"{AlmacenDatos.nombre_dataset(nombre_archivo)}.json"
+
+    def registrar_ingesta(self, nombre_archivo: str, offset: int, columnas: list | None = None):
+        """
+        Guarda hasta qué byte del CSV de data/raw está ya en el procesado y los archivos
+        del procesado resultante, para que la próxima ingesta solo anexe lo nuevo.
+        """
+        path = Path(self.ruta_raw) / nombre_archivo
+        if columnas is None:
+            columnas = list(pd.read_csv(path, nrows=0).columns)
+        stat = path.stat()
+        estado = {"offset": offset, "tamano": stat.st_size, "mtime": stat.st_mtime_ns, "columnas": columnas,
+                  "archivos": [list(a) for a in self.almacen.archivos(AlmacenDatos.nombre_dataset(nombre_archivo))]}
+        path_estado = self._path_estado_ingesta(nombre_archivo)
+        Utilidades.asegurar_directorio(path_estado.parent)
+        tmp = path_estado.with_name(path_estado.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(estado, f, indent=2)
+        os.replace(tmp, path_estado)
+
+    def anexar_nuevas(self, nombre_archivo: str) -> int | None:
+        """
+        Ingesta incremental de un CSV de data/raw que crece por append: lee solo los bytes
+        posteriores a la última ingesta, los limpia y los anexa al procesado con
+        AlmacenDatos.anexar (los archivos previos no cambian, así CubosAgregados solo
+        agrega las horas nuevas). Retorna las filas anexadas, o None si hay que procesar
+        el archivo completo: sin estado, el CSV se achicó (fue reemplazado) o el procesado
+        se reescribió por otro camino.
+        """
+        path_estado = self._path_estado_ingesta(nombre_archivo)
+        if not path_estado.exists():
+            return None
+        with open(path_estado, encoding="utf-8") as f:
+            estado = json.load(f)
+
+        path = Path(self.ruta_raw) / nombre_archivo
+        dataset = AlmacenDatos.nombre_dataset(nombre_archivo)
+        stat = path.stat()
+        if stat.st_size < estado["offset"] or [list(a) for a in self.almacen.archivos(dataset)] != estado["archivos"]:
+            return None
+        if stat.st_size == estado["tamano"] and stat.st_mtime_ns == estado["mtime"]:
+            print(f"ℹ️ {nombre_archivo}: sin filas nuevas")
+            return 0
+
+        # limpiar_dataframe trabaja fila a fila: limpiar solo lo nuevo equivale a reprocesar todo
+        df, offset = UnificacionIncremental.leer_desde(path, estado["offset"], estado["columnas"])
+        df = self.limpiar_dataframe(df) if len(df) else df
+        if len(df):
+            self.almacen.anexar(df, dataset)
+        self.registrar_ingesta(nombre_archivo, offset, estado["columnas"])
+        return len(df)
+
     # ===============================
     # 4. Unificación de datasets
     # ===============================
-    def unificar(self, incluir_api: bool = True) -> pd.DataFrame:
+    def unificar(self, incluir_api: bool = True, tolerancia="0min", tolerancia_api="30min",
+                 incremental: bool = False) -> pd.DataFrame:
         """
-        Une flujo_vehicular + contaminantes + clima.
-        Opcionalmente incluye clima_historico y air_quality_clean si existen.
+        Une flujo_vehicular + contaminantes + clima por (fecha, hora) con UnificadorDatos.
+        Opcionalmente incluye clima_historico y air_quality_clean si existen,
+        alineados por hora (no solo por día) dentro de `tolerancia_api`.
+        Con incremental=True solo procesa y anexa las horas nuevas de data/raw
+        y retorna únicamente esas filas.
         """
+        if incremental:
+            unificador = UnificadorDatos(tolerancia=tolerancia, tolerancia_api=tolerancia_api)
+            return UnificacionIncremental(self, unificador, incluir_api=incluir_api).actualizar()
+
         try:
             df_flujo = self.cargar_csv("flujo_vehicular.csv")
             df_cont = self.cargar_csv("contaminantes.csv")
@@ -102,30 +260,22 @@ class GestorDatos:
             print("❌ Error cargando CSVs base:", e)
             return pd.DataFrame()
 
-        # Merge principal por fecha y hora
-        df_unificado = (
-            df_flujo.merge(df_cont, on=["fecha", "hora"], how="inner")
-                    .merge(df_clima, on=["fecha", "hora"], how="inner")
-        )
-
         # Si existen, incluir datasets de API
+        df_air, df_hist = None, None
         if incluir_api:
             try:
                 df_air = self.cargar_csv("air_quality_clean.csv")
-                if "time" in df_air.columns:
-                    df_air = df_air.rename(columns={"time": "fecha"})
-                df_unificado = df_unificado.merge(df_air, on="fecha", how="left")
             except FileNotFoundError:
                 print("ℹ️ No se encontró air_quality_clean.csv")
 
             try:
                 df_hist = self.cargar_csv("clima_historico.csv")
-                if "time" in df_hist.columns:
-                    df_hist = df_hist.rename(columns={"time": "fecha"})
-                df_unificado = df_unificado.merge(df_hist, on="fecha", how="left")
             except FileNotFoundError:
                 print("ℹ️ No se encontró clima_historico.csv")
 
+        unificador = UnificadorDatos(tolerancia=tolerancia, tolerancia_api=tolerancia_api)
+        df_unificado = unificador.unificar(df_flujo, df_cont, df_clima, df_air, df_hist)
+
         # Guardar tabla final
-        self.guardar_csv(df_unificado, "TablaUnificada.csv")
+        self.guardar(df_unificado, "TablaUnificada.csv")
         return df_unificado
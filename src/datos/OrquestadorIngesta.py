@@ -0,0 +1,112 @@
+# Clase OrquestadorIngesta: procesa muchos CSV fuente (archivos y estaciones) en paralelo.
+# src/datos/OrquestadorIngesta.py
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.datos.GestorDatos import GestorDatos
+
+
+def _procesar_en_worker(ruta_raw: str, ruta_processed: str, formato: str, nombre_archivo: str,
+                        umbral_bloques: int, tamano_bloque: int) -> dict:
+    """
+    Procesa un archivo en un proceso del pool (cada worker crea su propio GestorDatos).
+    Devuelve solo ruta y estadísticas: los datos se releen del almacén, sin serializar
+    DataFrames completos de vuelta al proceso principal.
+    """
+    inicio = time.perf_counter()
+    gd = GestorDatos(ruta_raw=ruta_raw, ruta_processed=ruta_processed, formato=formato)
+
+    path = os.path.join(ruta_raw, nombre_archivo)
+    # Si el CSV solo creció desde la última ingesta, se anexan las filas nuevas
+    filas = gd.anexar_nuevas(nombre_archivo)
+    if filas is None:
+        tamano = os.path.getsize(path)
+        if umbral_bloques and tamano > umbral_bloques:
+            # Archivo grande: streaming por bloques, sin materializarlo en memoria
+            filas = gd.procesar_archivo_por_bloques(nombre_archivo, tamano_bloque, formato=gd.almacen.formato)
+        else:
+            filas = len(gd.procesar_archivo(nombre_archivo))
+        gd.registrar_ingesta(nombre_archivo, offset=tamano)
+
+    dataset = gd.almacen.nombre_dataset(nombre_archivo)
+    destino = (gd.almacen.ruta_parquet(dataset) if gd.almacen.formato_vigente(dataset) == "parquet"
+               else gd.almacen.ruta_csv(dataset))
+    return {
+        "archivo": nombre_archivo,
+        "dataset": dataset,
+        "destino": str(destino),
+        "filas": filas,
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+class OrquestadorIngesta:
+    """
+    Ingesta de los CSV de data/raw:
+    - Acepta nombres o patrones glob (p.ej. "flujo_vehicular_*.csv" para muchas estaciones)
+    - Procesa cada archivo en un pool de procesos con `workers` configurable
+    - Incremental: si un CSV solo creció desde la última ingesta, se anexan sus filas nuevas
+      al procesado en vez de reescribirlo (GestorDatos.anexar_nuevas)
+    - Reporta filas y tiempo por archivo
+    - Los resultados son rutas y estadísticas; los datos se leen con AlmacenDatos.cargar/iterar
+    """
+
+    def __init__(self, ruta_raw: str = "data/raw", ruta_processed: str = "data/processed",
+                 workers: int | None = None, formato: str = "auto",
+                 umbral_bloques: int = 512 * 1024 ** 2, tamano_bloque: int = 100_000):
+        self.ruta_raw = ruta_raw
+        self.ruta_processed = ruta_processed
+        self.workers = workers or os.cpu_count() or 1
+        self.formato = formato
+        self.umbral_bloques = umbral_bloques
+        self.tamano_bloque = tamano_bloque
+
+    def resolver_archivos(self, patrones: list[str]) -> list[str]:
+        """Expande patrones glob dentro de data/raw y retorna nombres de archivo únicos."""
+        archivos = []
+        for patron in patrones:
+            coincidencias = sorted(glob.glob(os.path.join(self.ruta_raw, patron)))
+            if not coincidencias:
+                raise FileNotFoundError(f"❌ No se encontró {patron} en {self.ruta_raw}")
+            for path in coincidencias:
+                nombre = os.path.basename(path)
+                if nombre not in archivos:
+                    archivos.append(nombre)
+        return archivos
+
+    def procesar(self, patrones: list[str]) -> dict:
+        """
+        Procesa todos los archivos y retorna {archivo: resultado}, donde cada
+        resultado tiene dataset, destino (ruta del procesado), filas (procesadas o,
+        en una ingesta incremental, anexadas) y segundos.
+        Los archivos grandes (> umbral_bloques bytes) van por streaming.
+        """
+        archivos = self.resolver_archivos(patrones)
+        workers = min(self.workers, len(archivos))
+        args = (self.ruta_raw, self.ruta_processed, self.formato)
+        extra = (self.umbral_bloques, self.tamano_bloque)
+
+        inicio = time.perf_counter()
+        resultados = {}
+        if workers <= 1:
+            for nombre in archivos:
+                resultados[nombre] = _procesar_en_worker(*args, nombre, *extra)
+                self._reportar(resultados[nombre])
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futuros = {pool.submit(_procesar_en_worker, *args, nombre, *extra): nombre for nombre in archivos}
+                for futuro in as_completed(futuros):
+                    resultado = futuro.result()
+                    resultados[resultado["archivo"]] = resultado
+                    self._reportar(resultado)
+
+        print(f"⏱️ {len(archivos)} archivos procesados en {time.perf_counter() - inicio:.2f} s "
+              f"con {max(workers, 1)} worker(s)")
+        # Mismo orden que los patrones de entrada
+        return {nombre: resultados[nombre] for nombre in archivos}
+
+    @staticmethod
+    def _reportar(resultado: dict):
+        print(f"   • {resultado['archivo']}: {resultado['filas']} filas en {resultado['segundos']:.2f} s")
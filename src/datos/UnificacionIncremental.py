@@ -0,0 +1,195 @@
+# Clase UnificacionIncremental: agrega a TablaUnificada solo las horas nuevas de cada fuente.
+# src/datos/UnificacionIncremental.py
+import io
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from src.datos.AlmacenDatos import AlmacenDatos
+from src.datos.UnificadorDatos import UnificadorDatos
+
+
+class UnificacionIncremental:
+    """
+    Unificación incremental para ejecuciones frecuentes (p.ej. cron horario):
+    - Por cada CSV fuente en data/raw guarda offset en bytes, tamaño, mtime y
+      la marca de agua (último fecha+hora leído)
+    - Solo lee, limpia y une las filas agregadas desde la última ejecución
+    - Las filas base sin pareja (p.ej. clima aún no llegó para esa hora) y la
+      cola reciente de las otras fuentes quedan como pendientes para la próxima
+    - Anexa el resultado a TablaUnificada sin reescribir el histórico
+
+    Si ninguna fuente cambió, la ejecución solo hace un stat por archivo.
+    Se asume que las fuentes crecen por append; si un archivo se achica
+    (fue reemplazado), se reconstruye la tabla completa.
+    """
+
+    FUENTES = ("flujo_vehicular", "contaminantes", "clima")
+    FUENTES_API = ("air_quality_clean", "clima_historico")
+    COLUMNA_FILA = "__fila__"
+
+    def __init__(self, gestor, unificador: UnificadorDatos | None = None,
+                 nombre_tabla: str = "TablaUnificada", incluir_api: bool = True,
+                 retencion="24h"):
+        self.gestor = gestor
+        self.unificador = unificador or UnificadorDatos()
+        self.nombre_tabla = nombre_tabla
+        self.incluir_api = incluir_api
+        self.retencion = pd.Timedelta(retencion)
+
+        self.ruta_estado = Path(gestor.ruta_processed) / ".incremental"
+        self.path_estado = self.ruta_estado / f"{nombre_tabla}.json"
+        self.pendientes = AlmacenDatos(self.ruta_estado, formato=gestor.almacen.formato)
+
+    # ===============================
+    # 1. Estado
+    # ===============================
+    def cargar_estado(self) -> dict:
+        if not self.path_estado.exists():
+            return {}
+        with open(self.path_estado, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _guardar_estado(self, estado: dict):
+        tmp = self.path_estado.with_name(self.path_estado.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(estado, f, indent=2)
+        os.replace(tmp, self.path_estado)
+
+    def _path_fuente(self, fuente: str) -> Path:
+        return Path(self.gestor.ruta_raw) / f"{fuente}.csv"
+
+    # ===============================
+    # 2. Lectura de filas nuevas
+    # ===============================
+    @staticmethod
+    def leer_desde(path, offset: int, columnas: list | None = None) -> tuple[pd.DataFrame, int]:
+        """
+        Filas crudas de un CSV desde `offset` (bytes) hasta el último salto de línea completo,
+        y el offset donde termina lo leído. Con offset > 0 no hay cabecera: se usa `columnas`.
+        """
+        with open(path, "rb") as f:
+            f.seek(offset)
+            datos = f.read()
+        fin = datos.rfind(b"\n") + 1
+        datos = datos[:fin]
+
+        if offset == 0:
+            df = pd.read_csv(io.BytesIO(datos)) if datos else pd.DataFrame()
+        else:
+            df = pd.read_csv(io.BytesIO(datos), header=None, names=columnas) if datos.strip() \
+                else pd.DataFrame(columns=columnas)
+        return df, offset + fin
+
+    def _leer_nuevas(self, fuente: str, info: dict) -> tuple[pd.DataFrame, dict]:
+        """Lee desde el offset guardado hasta el último salto de línea completo."""
+        path = self._path_fuente(fuente)
+        offset = info.get("offset", 0)
+        df, fin = self.leer_desde(path, offset, info.get("columnas"))
+        columnas = list(df.columns) if offset == 0 else info["columnas"]
+
+        stat = path.stat()
+        nuevo = {"offset": fin, "tamano": stat.st_size, "mtime": stat.st_mtime_ns,
+                 "columnas": columnas, "marca_agua": info.get("marca_agua")}
+        if len(df):
+            df = self.gestor.limpiar_dataframe(df)
+            marca = UnificadorDatos.marca_temporal(df).max()
+            if pd.notna(marca) and (nuevo["marca_agua"] is None or marca > pd.Timestamp(nuevo["marca_agua"])):
+                nuevo["marca_agua"] = marca.isoformat()
+        return df, nuevo
+
+    def _sin_cambios(self, estado: dict) -> bool:
+        for fuente in self.FUENTES:
+            info = estado.get("fuentes", {}).get(fuente)
+            stat = self._path_fuente(fuente).stat()
+            if info is None or info["tamano"] != stat.st_size or info["mtime"] != stat.st_mtime_ns:
+                return False
+        return True
+
+    def _requiere_reconstruir(self, estado: dict) -> bool:
+        if not estado or not self.gestor.almacen.existe(self.nombre_tabla):
+            return True
+        for fuente in self.FUENTES:
+            info = estado.get("fuentes", {}).get(fuente)
+            if info is None or self._path_fuente(fuente).stat().st_size < info["offset"]:
+                return True
+        return False
+
+    # ===============================
+    # 3. Actualización
+    # ===============================
+    def actualizar(self) -> pd.DataFrame:
+        """
+        Procesa las filas nuevas y las anexa a la tabla unificada.
+        Retorna solo las filas agregadas en esta ejecución; si hubo reconstrucción
+        (`attrs["reconstruida"]`), son la tabla completa y reemplazan a las anteriores.
+        """
+        for fuente in self.FUENTES:
+            if not self._path_fuente(fuente).exists():
+                raise FileNotFoundError(f"❌ No se encontró {fuente}.csv en {self.gestor.ruta_raw}")
+
+        estado = self.cargar_estado()
+        reconstruir = self._requiere_reconstruir(estado)
+        if not reconstruir and self._sin_cambios(estado):
+            print("ℹ️ Sin datos nuevos: TablaUnificada ya está al día")
+            return pd.DataFrame()
+        if reconstruir:
+            print("ℹ️ Sin estado incremental válido: se reconstruye TablaUnificada completa")
+            estado = {}
+
+        # Filas nuevas + pendientes de la ejecución anterior
+        datos, fuentes_estado = {}, {}
+        for fuente in self.FUENTES:
+            info = {} if reconstruir else estado["fuentes"][fuente]
+            nuevas, fuentes_estado[fuente] = self._leer_nuevas(fuente, info)
+            if not reconstruir and self.pendientes.existe(fuente):
+                previas = self.pendientes.cargar(fuente)
+                if len(previas):
+                    nuevas = pd.concat([previas, nuevas], ignore_index=True) if len(nuevas) else previas
+            datos[fuente] = nuevas
+
+        base_nombre = self.FUENTES[0]
+        base = datos[base_nombre].reset_index(drop=True)
+        base[self.COLUMNA_FILA] = range(len(base))
+
+        # API: solo la ventana de tiempo que cubre las filas base candidatas
+        df_air, df_hist = None, None
+        if self.incluir_api and len(base):
+            desde = UnificadorDatos.marca_temporal(base).min() - self.unificador.tolerancia_api
+            df_air, df_hist = (self._cargar_api(n, desde) for n in self.FUENTES_API)
+
+        if len(base) and all(len(datos[f]) for f in self.FUENTES[1:]):
+            unido = self.unificador.unificar(base, datos["contaminantes"], datos["clima"], df_air, df_hist)
+        else:
+            unido = base.iloc[0:0]
+
+        # Pendientes: filas base sin pareja y cola reciente del resto. Todo lo posterior a la
+        # fuente más atrasada (menos la retención, para llegadas tardías) aún puede emparejarse.
+        emparejadas = set(unido[self.COLUMNA_FILA])
+        marcas = [info["marca_agua"] for info in fuentes_estado.values()]
+        corte = min(pd.Timestamp(m) for m in marcas) - self.retencion if all(marcas) else None
+        for fuente in self.FUENTES:
+            df = base[~base[self.COLUMNA_FILA].isin(emparejadas)] if fuente == base_nombre else datos[fuente]
+            if corte is not None and len(df):
+                limite = corte if fuente == base_nombre else corte - self.unificador.tolerancia
+                df = df[UnificadorDatos.marca_temporal(df) >= limite]
+            self.pendientes.guardar(df.drop(columns=self.COLUMNA_FILA, errors="ignore"), fuente)
+
+        nuevas_filas = unido.drop(columns=self.COLUMNA_FILA)
+        if reconstruir:
+            self.gestor.guardar(nuevas_filas, self.nombre_tabla)
+        elif len(nuevas_filas):
+            self.gestor.almacen.anexar(nuevas_filas, self.nombre_tabla)
+
+        # El estado se escribe al final: si algo falla antes, la próxima ejecución reintenta
+        self._guardar_estado({"fuentes": fuentes_estado})
+        print(f"✅ {len(nuevas_filas)} filas nuevas en {self.nombre_tabla}")
+        nuevas_filas.attrs["reconstruida"] = reconstruir
+        return nuevas_filas
+
+    def _cargar_api(self, nombre: str, desde) -> pd.DataFrame | None:
+        if not self.gestor.almacen.existe(nombre):
+            return None
+        return self.gestor.almacen.cargar(nombre, desde=desde)
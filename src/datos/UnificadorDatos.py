@@ -0,0 +1,118 @@
+# Clase UnificadorDatos: une flujo vehicular, contaminantes, clima y datos de API sobre un índice temporal ordenado.
+# src/datos/UnificadorDatos.py
+import pandas as pd
+
+
+class UnificadorDatos:
+    """
+    Motor de unificación por tiempo:
+    - Construye una marca temporal única (fecha + hora, o la columna time de la API)
+    - Ordena cada fuente una sola vez
+    - Une con alineación ordenada (merge_asof) y tolerancia configurable,
+      por ubicación cuando ambas fuentes la tienen
+
+    Cada fila de la tabla base recibe como máximo una fila de cada fuente,
+    así que el resultado nunca crece más que la base (sin productos cartesianos)
+    y el costo es lineal sobre datos ya ordenados.
+    """
+
+    COLUMNA_MARCA = "marca"
+
+    def __init__(self, tolerancia="0min", tolerancia_api="30min", direccion: str = "nearest"):
+        self.tolerancia = pd.Timedelta(tolerancia)
+        self.tolerancia_api = pd.Timedelta(tolerancia_api)
+        self.direccion = direccion
+
+    # ===============================
+    # 1. Índice temporal
+    # ===============================
+    @classmethod
+    def marca_temporal(cls, df: pd.DataFrame) -> pd.Series:
+        """Marca datetime64[ns] de cada fila: fecha + hora, o la columna time."""
+        if "fecha" in df.columns:
+            marca = cls._a_fecha(df["fecha"]).dt.normalize()
+            if "hora" in df.columns:
+                marca = marca + pd.to_timedelta(pd.to_numeric(df["hora"], errors="coerce"), unit="h")
+        elif "time" in df.columns:
+            marca = cls._a_fecha(df["time"])
+        else:
+            raise KeyError("❌ El DataFrame no tiene columnas fecha/hora ni time")
+        return marca.astype("datetime64[ns]")
+
+    @staticmethod
+    def _a_fecha(serie: pd.Series) -> pd.Series:
+        if pd.api.types.is_datetime64_dtype(serie.dtype):
+            return serie
+        return pd.to_datetime(serie, errors="coerce")
+
+    @classmethod
+    def _ordenar(cls, df: pd.DataFrame, marca: pd.Series) -> pd.DataFrame:
+        df = df.assign(**{cls.COLUMNA_MARCA: marca.to_numpy()})
+        df = df[df[cls.COLUMNA_MARCA].notna()]
+        if not df[cls.COLUMNA_MARCA].is_monotonic_increasing:
+            df = df.sort_values(cls.COLUMNA_MARCA, kind="stable")
+        return df.reset_index(drop=True)
+
+    # ===============================
+    # 2. Unión ordenada
+    # ===============================
+    def unir(self, base: pd.DataFrame, otro: pd.DataFrame, como: str = "inner",
+             tolerancia=None, sufijo: str = "_y") -> pd.DataFrame:
+        """
+        Une `otro` sobre `base` (ambos ordenados por marca) con merge_asof.
+        - como="inner": descarta filas de base sin coincidencia dentro de la tolerancia
+        - como="left": las conserva con nulos
+        Si ambas fuentes tienen ubicacion, la alineación es por ubicación.
+        """
+        if como not in ("inner", "left"):
+            raise ValueError(f"❌ Tipo de unión no soportado: {como}")
+        tolerancia = self.tolerancia if tolerancia is None else pd.Timedelta(tolerancia)
+        marca = self.COLUMNA_MARCA
+
+        otro = otro.drop(columns=[c for c in ("fecha", "hora", "time") if c in otro.columns])
+        por = "ubicacion" if "ubicacion" in base.columns and "ubicacion" in otro.columns else None
+
+        # Columnas repetidas que no son clave: se renombran con el sufijo
+        claves = {marca, por}
+        otro = otro.rename(columns={c: f"{c}{sufijo}" for c in otro.columns
+                                    if c in base.columns and c not in claves})
+
+        indicador = "__coincide__"
+        otro = otro.assign(**{indicador: True})
+        tipo_por = None
+        if por is not None:
+            # merge_asof con `by` exige el mismo tipo en ambas columnas
+            tipo_por = base[por].dtype
+            base = base.assign(**{por: base[por].astype(str)})
+            otro = otro.assign(**{por: otro[por].astype(str)})
+
+        unido = pd.merge_asof(
+            base, otro, on=marca, by=por,
+            tolerance=tolerancia, direction=self.direccion,
+        )
+        if como == "inner":
+            unido = unido[unido[indicador].notna()]
+        if tipo_por is not None:
+            unido[por] = unido[por].astype(tipo_por)
+        return unido.drop(columns=indicador).reset_index(drop=True)
+
+    def unificar(self, df_flujo: pd.DataFrame, df_cont: pd.DataFrame, df_clima: pd.DataFrame,
+                 df_air: pd.DataFrame | None = None, df_hist: pd.DataFrame | None = None) -> pd.DataFrame:
+        """
+        Une flujo_vehicular + contaminantes + clima (inner, tolerancia base)
+        y opcionalmente air_quality_clean / clima_historico (left, tolerancia_api).
+        Retorna la tabla ordenada por tiempo, con las columnas fecha y hora de la base.
+        """
+        fuentes = [df_flujo, df_cont, df_clima, df_air, df_hist]
+        fuentes = [None if df is None else self._ordenar(df, self.marca_temporal(df)) for df in fuentes]
+        base, cont, clima, air, hist = fuentes
+
+        unido = self.unir(base, cont, como="inner")
+        unido = self.unir(unido, clima, como="inner")
+        if air is not None:
+            unido = self.unir(unido, air, como="left", tolerancia=self.tolerancia_api, sufijo="_api")
+        if hist is not None:
+            unido = self.unir(unido, hist, como="left", tolerancia=self.tolerancia_api, sufijo="_api")
+
+        # fecha y hora de la tabla base ya describen la marca
+        return unido.drop(columns=self.COLUMNA_MARCA)
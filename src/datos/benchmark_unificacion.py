@@ -0,0 +1,96 @@
+# src/datos/benchmark_unificacion.py
+# Compara la unificación anterior (merges hash por fecha/hora y por fecha)
+# contra UnificadorDatos sobre un dataset sintético de varios años y estaciones.
+#
+# Uso: python -m src.datos.benchmark_unificacion --anios 1 --estaciones 3
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.datos.UnificadorDatos import UnificadorDatos
+
+
+# ---------- Datos sintéticos ----------
+def generar_datos(anios: int, estaciones: int, semilla: int = 42) -> dict:
+    rng = np.random.default_rng(semilla)
+    marcas = pd.date_range("2022-01-01", periods=anios * 365 * 24, freq="h")
+    ubicaciones = [f"estacion {i}" for i in range(estaciones)]
+
+    # Flujo y contaminantes: una fila por estación y hora
+    marca_est = np.tile(marcas.to_numpy(), estaciones)
+    ubic_est = np.repeat(ubicaciones, len(marcas))
+    n = len(marca_est)
+    fecha, hora = pd.DatetimeIndex(marca_est).normalize(), pd.DatetimeIndex(marca_est).hour
+
+    df_flujo = pd.DataFrame({"fecha": fecha, "hora": hora, "ubicacion": ubic_est,
+                             "flujo_vehicular": rng.integers(200, 3000, n)})
+    df_cont = pd.DataFrame({"fecha": fecha, "hora": hora, "ubicacion": ubic_est,
+                            "pm2_5": rng.gamma(2, 10, n), "pm10": rng.gamma(2, 15, n),
+                            "co": rng.gamma(2, 0.5, n), "no2": rng.gamma(2, 30, n), "o3": rng.gamma(2, 50, n)})
+
+    # Clima y API: una fila por hora para toda el área
+    m = len(marcas)
+    df_clima = pd.DataFrame({"fecha": marcas.normalize(), "hora": marcas.hour,
+                             "temperatura": rng.normal(22, 4, m), "humedad": rng.integers(40, 100, m),
+                             "viento": rng.gamma(2, 5, m), "precipitacion": rng.gamma(1, 2, m)})
+    df_air = pd.DataFrame({"time": marcas, "pm10": rng.gamma(2, 15, m), "pm2_5": rng.gamma(2, 10, m),
+                           "carbon_monoxide": rng.gamma(2, 150, m), "nitrogen_dioxide": rng.gamma(2, 8, m),
+                           "ozone": rng.gamma(2, 10, m)})
+    return {"flujo": df_flujo, "cont": df_cont, "clima": df_clima, "air": df_air}
+
+
+# ---------- Caminos a comparar ----------
+def unificar_anterior(datos: dict, incluir_api: bool) -> pd.DataFrame:
+    """Réplica de los merges que hacía GestorDatos.unificar antes del motor ordenado."""
+    df = (datos["flujo"].merge(datos["cont"], on=["fecha", "hora"], how="inner")
+                        .merge(datos["clima"], on=["fecha", "hora"], how="inner"))
+    if incluir_api:
+        df_air = datos["air"].rename(columns={"time": "fecha"})
+        df_air["fecha"] = df_air["fecha"].dt.normalize()
+        df = df.merge(df_air, on="fecha", how="left")
+    return df
+
+
+def unificar_nuevo(datos: dict, incluir_api: bool) -> pd.DataFrame:
+    return UnificadorDatos().unificar(datos["flujo"], datos["cont"], datos["clima"],
+                                      datos["air"] if incluir_api else None)
+
+
+def medir(funcion, *args):
+    """Tiempo (sin tracemalloc, que lo distorsiona) y pico de memoria (en una segunda ejecución)."""
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    segundos = time.perf_counter() - inicio
+    del resultado
+
+    tracemalloc.start()
+    resultado = funcion(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, pico / 1024 ** 2
+
+
+# ---------- Ejecutar por consola ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de unificación de datasets")
+    parser.add_argument("--anios", type=int, default=1)
+    parser.add_argument("--estaciones", type=int, default=3)
+    parser.add_argument("--sin-api", action="store_true", help="No incluir air_quality en la unión")
+    parser.add_argument("--solo-nuevo", action="store_true", help="Omitir el camino anterior (datasets grandes)")
+    args = parser.parse_args()
+
+    datos = generar_datos(args.anios, args.estaciones)
+    incluir_api = not args.sin_api
+    print(f"Filas base: flujo={len(datos['flujo']):,} cont={len(datos['cont']):,} "
+          f"clima={len(datos['clima']):,} air={len(datos['air']):,}")
+
+    caminos = [("UnificadorDatos", unificar_nuevo)]
+    if not args.solo_nuevo:
+        caminos.insert(0, ("merge anterior", unificar_anterior))
+
+    for nombre, funcion in caminos:
+        df, segundos, pico_mb = medir(funcion, datos, incluir_api)
+        print(f"{nombre:>16}: {len(df):>12,} filas | {segundos:8.2f} s | pico {pico_mb:10.1f} MB")
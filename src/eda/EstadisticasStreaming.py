@@ -0,0 +1,331 @@
+# Clase EstadisticasStreaming: estadísticas de una pasada por bloques para datasets que no caben en memoria.
+# src/eda/EstadisticasStreaming.py
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.dataset as ds
+except ImportError:  # pyarrow es opcional: sin él solo se leen CSV y base de datos
+    ds = None
+
+
+class SketchKLL:
+    """
+    Sketch KLL de cuantiles (Karnin-Lang-Liberty) con compactadores por nivel:
+    - Memoria O(k·log(n/k)) independiente del número de valores
+    - Error normalizado de rango ≈ 2.296 / k^0.9723 (≈1.3 % con k=200, 99 % de confianza)
+    - Los sketches se combinan (merge) sin perder la garantía
+    """
+
+    C = 2 / 3
+
+    def __init__(self, k: int = 200, semilla: int = 0):
+        self.k = k
+        self.niveles = [np.empty(0)]
+        self.n = 0
+        self._rng = np.random.default_rng(semilla)
+
+    @staticmethod
+    def error_rango(k: int) -> float:
+        return 2.296 / k ** 0.9723
+
+    def _capacidad(self, nivel: int) -> int:
+        return max(2, int(np.ceil(self.k * self.C ** (len(self.niveles) - 1 - nivel))))
+
+    def _compactar(self):
+        while True:
+            nivel = next((h for h, items in enumerate(self.niveles) if len(items) > self._capacidad(h)), None)
+            if nivel is None:
+                return
+            if nivel + 1 == len(self.niveles):
+                self.niveles.append(np.empty(0))
+            items = np.sort(self.niveles[nivel])
+            # Con largo impar el primer valor se queda en el nivel; del resto sube uno de cada dos
+            resto, items = items[:len(items) % 2], items[len(items) % 2:]
+            self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], items[self._rng.integers(2)::2]])
+            self.niveles[nivel] = resto
+
+    def actualizar(self, valores: np.ndarray):
+        valores = valores[~np.isnan(valores)]
+        if len(valores):
+            self.niveles[0] = np.concatenate([self.niveles[0], valores])
+            self.n += len(valores)
+            self._compactar()
+
+    def combinar(self, otro: "SketchKLL"):
+        for h, items in enumerate(otro.niveles):
+            if h == len(self.niveles):
+                self.niveles.append(np.empty(0))
+            self.niveles[h] = np.concatenate([self.niveles[h], items])
+        self.n += otro.n
+        self._compactar()
+
+    def cuantiles(self, qs) -> np.ndarray:
+        qs = np.atleast_1d(np.asarray(qs, dtype="float64"))
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        valores = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.niveles)])
+        orden = np.argsort(valores, kind="stable")
+        valores, acumulado = valores[orden], np.cumsum(pesos[orden])
+        posicion = np.searchsorted(acumulado, qs * acumulado[-1], side="left")
+        return valores[np.clip(posicion, 0, len(valores) - 1)]
+
+
+class HistogramaAdaptativo:
+    """
+    Histograma de `bins` celdas de igual ancho sin conocer el rango de antemano:
+    cuando llega un valor fuera del rango, el ancho se duplica fusionando celdas vecinas
+    (los conteos siguen siendo exactos; la resolución final es el ancho de celda).
+    """
+
+    def __init__(self, bins: int = 64):
+        self.bins = bins + bins % 2
+        self.inicio = None
+        self.ancho = None
+        self.conteos = np.zeros(self.bins, dtype="int64")
+
+    def _ampliar(self, izquierda: bool):
+        fusion = self.conteos.reshape(-1, 2).sum(axis=1)
+        vacio = np.zeros(self.bins // 2, dtype="int64")
+        self.conteos = np.concatenate([vacio, fusion] if izquierda else [fusion, vacio])
+        if izquierda:
+            self.inicio -= self.bins * self.ancho
+        self.ancho *= 2
+
+    def actualizar(self, valores: np.ndarray):
+        valores = valores[~np.isnan(valores)]
+        if not len(valores):
+            return
+        minimo, maximo = valores.min(), valores.max()
+        if self.inicio is None:
+            self.inicio = minimo
+            self.ancho = (maximo - minimo) / self.bins if maximo > minimo else 1.0
+            # Margen para que el máximo caiga dentro de la última celda
+            self.ancho *= 1 + 1e-9
+        while minimo < self.inicio:
+            self._ampliar(izquierda=True)
+        while maximo >= self.inicio + self.bins * self.ancho:
+            self._ampliar(izquierda=False)
+        indices = np.minimum(((valores - self.inicio) // self.ancho).astype("int64"), self.bins - 1)
+        self.conteos += np.bincount(indices, minlength=self.bins)
+
+    def bordes(self) -> np.ndarray:
+        if self.inicio is None:
+            return np.zeros(self.bins + 1)
+        return self.inicio + self.ancho * np.arange(self.bins + 1)
+
+
+class EstadisticasStreaming:
+    """
+    Motor de estadísticas de una sola pasada sobre bloques (CSV, Parquet o base de datos):
+    - Conteo, nulos, media y varianza por columna (Welford por bloque, combinados con Chan)
+    - Cuantiles y datos de boxplot con un sketch KLL por columna
+    - Histogramas de ancho fijo con rango adaptativo
+    - Matriz de covarianza/correlación por pares de observaciones completas (como pandas.corr)
+    - Conteo de valores de columnas categóricas y rango de columnas de fecha
+    La memoria depende del número de columnas y de k/bins, no del número de filas.
+    """
+
+    def __init__(self, k: int = 200, bins: int = 64, max_categorias: int = 10_000):
+        self.k = k
+        self.bins = bins
+        self.max_categorias = max_categorias
+        self.columnas = None
+        self.numericas = []
+        self.tipos = None
+        self.muestra = None
+        self.filas = 0
+        self.nulos = None
+        self.categorias = {}
+        self.fechas = {}
+        self.sketches = {}
+        self.histogramas = {}
+        self.minimos = None
+        self.maximos = None
+        # Co-momentos por par (i, j) sobre las filas donde ambas columnas tienen valor
+        self.n_par = None
+        self.media_par = None  # media de i en las filas válidas para (i, j)
+        self.m2_par = None     # suma de cuadrados centrada de i en esas filas
+        self.co_par = None     # co-momento centrado de (i, j)
+
+    # ===============================
+    # 1. Actualización por bloques
+    # ===============================
+    def _iniciar(self, bloque: pd.DataFrame):
+        self.columnas = list(bloque.columns)
+        self.tipos = bloque.dtypes
+        self.muestra = bloque.head()
+        self.numericas = list(bloque.select_dtypes(include="number").columns)
+        p = len(self.numericas)
+        self.nulos = pd.Series(0, index=self.columnas, dtype="int64")
+        self.n_par = np.zeros((p, p))
+        self.media_par = np.zeros((p, p))
+        self.m2_par = np.zeros((p, p))
+        self.co_par = np.zeros((p, p))
+        self.minimos = np.full(p, np.inf)
+        self.maximos = np.full(p, -np.inf)
+        for col in self.numericas:
+            self.sketches[col] = SketchKLL(self.k)
+            self.histogramas[col] = HistogramaAdaptativo(self.bins)
+
+    def _comomentos(self, X: np.ndarray):
+        """Estadísticos por pares del bloque y combinación (Chan) con los acumulados."""
+        valido = ~np.isnan(X)
+        # Centrar por la media del bloque antes de multiplicar evita la cancelación numérica
+        cuenta = valido.sum(axis=0)
+        centro = np.where(valido, X, 0.0).sum(axis=0) / np.maximum(cuenta, 1)
+        Z = np.where(valido, X - centro, 0.0)
+        V = valido.astype("float64")
+
+        n_b = V.T @ V                                         # filas con i y j válidos
+        with np.errstate(invalid="ignore", divide="ignore"):
+            media_b = np.where(n_b > 0, (Z.T @ V) / n_b, 0.0)   # media de i (centrada) en esas filas
+            sq_b = (Z ** 2).T @ V
+            m2_b = sq_b - n_b * media_b ** 2
+            co_b = Z.T @ Z - n_b * media_b * media_b.T
+        media_b = media_b + centro[:, None]
+
+        n = self.n_par + n_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = media_b - self.media_par
+            peso = np.where(n > 0, self.n_par * n_b / n, 0.0)
+            self.co_par = self.co_par + co_b + delta * delta.T * peso
+            self.m2_par = self.m2_par + m2_b + delta ** 2 * peso
+            self.media_par = np.where(n > 0, self.media_par + delta * np.where(n > 0, n_b / n, 0.0), 0.0)
+        self.n_par = n
+
+    def actualizar(self, bloque: pd.DataFrame) -> "EstadisticasStreaming":
+        if not len(bloque):
+            return self
+        if self.columnas is None:
+            self._iniciar(bloque)
+        bloque = bloque.reindex(columns=self.columnas)
+        self.filas += len(bloque)
+        self.nulos += bloque.isna().sum()
+
+        if self.numericas:
+            X = bloque[self.numericas].to_numpy(dtype="float64", na_value=np.nan)
+            self._comomentos(X)
+            with np.errstate(invalid="ignore"):
+                self.minimos = np.fmin(self.minimos, np.nanmin(X, axis=0, initial=np.inf))
+                self.maximos = np.fmax(self.maximos, np.nanmax(X, axis=0, initial=-np.inf))
+            for i, col in enumerate(self.numericas):
+                self.sketches[col].actualizar(X[:, i])
+                self.histogramas[col].actualizar(X[:, i])
+
+        for col in self.columnas:
+            if col in self.numericas:
+                continue
+            serie = bloque[col]
+            if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+                minimo, maximo = serie.min(), serie.max()
+                previo = self.fechas.get(col, (minimo, maximo))
+                self.fechas[col] = (min(previo[0], minimo), max(previo[1], maximo))
+            elif self.categorias.get(col, 0) is not None:
+                conteo = serie.value_counts()
+                conteo = conteo[conteo > 0]  # las categóricas listan también categorías sin filas
+                total = self.categorias[col].add(conteo, fill_value=0) if col in self.categorias else conteo
+                # Columnas de texto casi únicas (ids, texto libre) dejan de contarse
+                self.categorias[col] = total if len(total) <= self.max_categorias else None
+        return self
+
+    def consumir(self, bloques: Iterable[pd.DataFrame]) -> "EstadisticasStreaming":
+        for bloque in bloques:
+            self.actualizar(bloque)
+        return self
+
+    # ===============================
+    # 2. Fuentes
+    # ===============================
+    @staticmethod
+    def bloques_csv(path: str | Path, tamano_bloque: int = 200_000, **kwargs) -> Iterator[pd.DataFrame]:
+        with pd.read_csv(path, chunksize=tamano_bloque, **kwargs) as lector:
+            yield from lector
+
+    @staticmethod
+    def bloques_parquet(path: str | Path, tamano_bloque: int = 200_000,
+                        columnas: list[str] | None = None) -> Iterator[pd.DataFrame]:
+        if ds is None:
+            raise ImportError("❌ Leer Parquet requiere pyarrow")
+        for lote in ds.dataset(str(path), format="parquet").to_batches(columns=columnas, batch_size=tamano_bloque):
+            yield lote.to_pandas()
+
+    @staticmethod
+    def bloques_bd(gestor, query: str, params=None, tamano_bloque: int = 50_000) -> Iterator[pd.DataFrame]:
+        yield from gestor.consultar_por_bloques(query, params, tamano_bloque=tamano_bloque)
+
+    @classmethod
+    def desde_almacen(cls, almacen, nombre: str, tamano_bloque: int = 200_000, **kwargs) -> "EstadisticasStreaming":
+        """Recorre la copia vigente de un dataset de AlmacenDatos sin cargarlo completo."""
+        return cls(**kwargs).consumir(almacen.iterar(nombre, tamano_bloque=tamano_bloque))
+
+    # ===============================
+    # 3. Resultados
+    # ===============================
+    def errores(self) -> dict:
+        """Error declarado de las aproximaciones."""
+        return {
+            "cuantiles_error_rango": SketchKLL.error_rango(self.k),
+            "histograma_ancho_celda": {c: h.ancho for c, h in self.histogramas.items()},
+            "exactos": ["count", "mean", "std", "min", "max", "nulos", "correlacion", "histograma (conteos)"],
+        }
+
+    def _diagonal(self):
+        idx = np.arange(len(self.numericas))
+        return self.n_par[idx, idx], self.media_par[idx, idx], self.m2_par[idx, idx]
+
+    def describe(self) -> pd.DataFrame:
+        """Equivalente a DataFrame.describe(include="all"); los percentiles vienen del sketch KLL."""
+        n, media, m2 = self._diagonal()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.where(n > 1, np.sqrt(np.maximum(m2, 0) / (n - 1)), np.nan)
+        tabla = {}
+        for i, col in enumerate(self.numericas):
+            q = self.sketches[col].cuantiles([0.25, 0.5, 0.75])
+            tabla[col] = {"count": n[i], "mean": media[i] if n[i] else np.nan, "std": std[i],
+                          "min": self.minimos[i] if n[i] else np.nan, "25%": q[0], "50%": q[1], "75%": q[2],
+                          "max": self.maximos[i] if n[i] else np.nan}
+        for col, (minimo, maximo) in self.fechas.items():
+            tabla[col] = {"count": self.filas - self.nulos[col], "min": minimo, "max": maximo}
+        for col, conteo in self.categorias.items():
+            if conteo is None:
+                tabla[col] = {"count": self.filas - self.nulos[col]}
+            elif len(conteo):
+                tabla[col] = {"count": self.filas - self.nulos[col], "unique": len(conteo),
+                              "top": conteo.idxmax(), "freq": conteo.max()}
+        orden = ["count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max"]
+        resultado = pd.DataFrame(tabla)
+        return resultado.reindex([f for f in orden if f in resultado.index])[[c for c in self.columnas if c in tabla]]
+
+    def cuantiles(self, columna: str, qs) -> np.ndarray:
+        return self.sketches[columna].cuantiles(qs)
+
+    def histograma(self, columna: str) -> tuple[np.ndarray, np.ndarray]:
+        """(conteos, bordes) del histograma de la columna."""
+        h = self.histogramas[columna]
+        return h.conteos, h.bordes()
+
+    def estadisticas_caja(self, columna: str) -> dict:
+        """Entrada para Axes.bxp: cuartiles del sketch y bigotes a 1.5·IQR acotados por min/max."""
+        i = self.numericas.index(columna)
+        q1, mediana, q3 = self.cuantiles(columna, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        return {"label": columna, "med": mediana, "q1": q1, "q3": q3,
+                "whislo": max(self.minimos[i], q1 - 1.5 * iqr), "whishi": min(self.maximos[i], q3 + 1.5 * iqr),
+                "fliers": []}
+
+    def covarianza(self) -> pd.DataFrame:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = np.where(self.n_par > 1, self.co_par / (self.n_par - 1), np.nan)
+        return pd.DataFrame(cov, index=self.numericas, columns=self.numericas)
+
+    def correlacion(self) -> pd.DataFrame:
+        """Pearson por pares completos (mismo resultado que DataFrame.corr())."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = self.co_par / np.sqrt(self.m2_par * self.m2_par.T)
+        corr = np.where(self.n_par > 1, np.clip(corr, -1, 1), np.nan)
+        return pd.DataFrame(corr, index=self.numericas, columns=self.numericas)
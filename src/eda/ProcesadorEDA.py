@@ -1,55 +1,238 @@
+import io
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
 
+from src.datos.CubosAgregados import CubosAgregados
+from src.datos.UnificadorDatos import UnificadorDatos
+from src.eda.EstadisticasStreaming import EstadisticasStreaming
+from src.visualizacion.Submuestreo import Submuestreo, METODOS
+
+FRECUENCIAS = {"Horaria": "h", "Diaria": "D", "Semanal": "W", "Mensual": "MS"}
+# Frecuencia de analisis_temporal → granularidad de CubosAgregados ("h" se lee de las filas)
+GRANULARIDAD = {"D": "dia", "W": "semana", "MS": "mes"}
+
+
+# ===============================
+# Cálculos cacheados
+# ===============================
+# Los DataFrames van con "_" (Streamlit no los hashea); la clave es la huella del
+# archivo de origen, así que la caché se invalida sola cuando cambian los datos.
+def _png(fig) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=90)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _resumen(_df, clave):
+    if isinstance(_df, EstadisticasStreaming):
+        return {
+            "shape": (_df.filas, len(_df.columnas)),
+            "tipos": _df.tipos.astype(str),
+            "nulos": _df.nulos,
+            "head": _df.muestra,
+            "describe": _df.describe().astype(str),
+        }
+    describe = _df.describe(include="all")
+    # Columnas mixtas (Timestamp + números) no se pueden serializar a Arrow para st.dataframe
+    mixtas = describe.select_dtypes(include="object").columns
+    describe[mixtas] = describe[mixtas].astype(str)
+    return {
+        "shape": _df.shape,
+        "tipos": _df.dtypes.astype(str),
+        "nulos": _df.isnull().sum(),
+        "head": _df.head(),
+        "describe": describe,
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _histogramas(_df, clave, columnas: tuple, bins: int) -> bytes:
+    if isinstance(_df, EstadisticasStreaming):
+        # Conteos exactos sobre las celdas del histograma adaptativo (bins no aplica)
+        filas = -(-len(columnas) // 3)
+        fig, ejes = plt.subplots(filas, min(3, len(columnas)), figsize=(12, 4 * filas), squeeze=False)
+        for ax, columna in zip(ejes.flat, columnas):
+            conteos, bordes = _df.histograma(columna)
+            ax.stairs(conteos, bordes, fill=True)
+            ax.set_title(columna)
+        for ax in ejes.flat[len(columnas):]:
+            ax.set_visible(False)
+        fig.tight_layout()
+        return _png(fig)
+    ejes = _df[list(columnas)].hist(bins=bins, figsize=(12, 8))
+    return _png(ejes.flat[0].figure)
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _boxplot(_df, clave, columnas: tuple) -> bytes:
+    fig, ax = plt.subplots(figsize=(12, 6))
+    if isinstance(_df, EstadisticasStreaming):
+        # Cuartiles del sketch KLL; sin valores atípicos individuales (no se guardan filas)
+        ax.bxp([_df.estadisticas_caja(c) for c in columnas], showfliers=False)
+    else:
+        sns.boxplot(data=_df[list(columnas)], ax=ax)
+    ax.tick_params(axis="x", rotation=45)
+    return _png(fig)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _correlacion(_df, clave, columnas: tuple, metodo: str) -> bytes:
+    fig, ax = plt.subplots(figsize=(10, 8))
+    if isinstance(_df, EstadisticasStreaming):
+        matriz = _df.correlacion().loc[list(columnas), list(columnas)]
+    else:
+        matriz = _df[list(columnas)].corr(method=metodo)
+    sns.heatmap(matriz, annot=True, cmap="coolwarm", fmt=".2f", ax=ax)
+    return _png(fig)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _cubos_memoria(_df, clave, nombre) -> CubosAgregados:
+    return CubosAgregados.desde_dataframe(_df, nombre)
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _serie_horaria(_df, clave, variable: str) -> pd.Series:
+    # Promedio entre ubicaciones por fecha + hora, sin resample de la serie completa
+    return _df[variable].groupby(UnificadorDatos.marca_temporal(_df).to_numpy()).mean()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _serie(_cubos, _df, clave, variable: str, freq: str, titulo: str, presupuesto: int, metodo: str) -> bytes:
+    if freq in GRANULARIDAD:
+        serie = _cubos.serie(GRANULARIDAD[freq], variable)
+    else:
+        serie = _serie_horaria(_df, clave, variable)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    Submuestreo.linea(ax, serie, presupuesto, metodo)
+    ax.set_title(titulo)
+    fig.autofmt_xdate()
+    return _png(fig)
+
+
 class ProcesadorEDA:
-    def __init__(self, dfs: dict):
+    """
+    EDA básico en Streamlit. Cada gráfico es un fragmento con sus propios controles:
+    cambiar un control solo vuelve a ejecutar ese gráfico, y los cálculos se cachean
+    por (dataset, huella de datos, parámetros).
+    `huellas` = {nombre: huella} (p. ej. AlmacenDatos.huella); sin ella se usa un hash del contenido.
+    `cubos` = {nombre: CubosAgregados} materializados; las series temporales se leen de ellos
+    (si faltan, se calculan en memoria una vez por huella).
+    Los valores de `dfs` pueden ser DataFrames o EstadisticasStreaming (datasets que no caben en
+    memoria): en ese caso los cuartiles son aproximados (sketch KLL) y se indica el error declarado.
+    """
+
+    def __init__(self, dfs: dict, huellas: dict | None = None, cubos: dict | None = None):
         self.dfs = dfs
+        self.huellas = dict(huellas or {})
+        self.cubos = dict(cubos or {})
+
+    def _clave(self, nombre, df):
+        if nombre not in self.huellas and isinstance(df, EstadisticasStreaming):
+            self.huellas[nombre] = str(id(df))
+        if nombre not in self.huellas:
+            self.huellas[nombre] = str(pd.util.hash_pandas_object(df, index=False).sum())
+        return f"{nombre}:{self.huellas[nombre]}"
+
+    def _cubos(self, nombre, df) -> CubosAgregados:
+        return self.cubos.get(nombre) or _cubos_memoria(df, self._clave(nombre, df), nombre)
+
+    @staticmethod
+    def _numericas(df) -> list:
+        if isinstance(df, EstadisticasStreaming):
+            return list(df.numericas)
+        return list(df.select_dtypes(include="number").columns)
+
+    @staticmethod
+    def _columnas(df) -> list:
+        return list(df.columnas) if isinstance(df, EstadisticasStreaming) else list(df.columns)
+
+    @staticmethod
+    def _error_declarado(df, cuantiles: bool = True):
+        if isinstance(df, EstadisticasStreaming):
+            errores = df.errores()
+            texto = "Modo streaming: conteos, medias, desviaciones, mín/máx y correlaciones exactos"
+            if cuantiles:
+                texto += f"; cuartiles aproximados (error de rango ≤ {errores['cuantiles_error_rango']:.1%})"
+            st.caption(texto)
 
     def info_general_df(self, nombre, df):
+        resumen = _resumen(df, self._clave(nombre, df))
         st.subheader(f" Información general - {nombre}")
-        st.text(f"Shape: {df.shape}")
-        st.write("Tipos de datos:", df.dtypes)
-        st.write("Valores nulos:", df.isnull().sum())
-        st.dataframe(df.head())
+        st.text(f"Shape: {resumen['shape']}")
+        st.write("Tipos de datos:", resumen["tipos"])
+        st.write("Valores nulos:", resumen["nulos"])
+        st.dataframe(resumen["head"])
 
     def estadisticas_df(self, nombre, df):
         st.subheader(f" Estadísticas - {nombre}")
-        st.dataframe(df.describe(include="all"))
+        st.dataframe(_resumen(df, self._clave(nombre, df))["describe"])
+        self._error_declarado(df)
 
+    @st.fragment
     def histograma_df(self, nombre, df):
-        num_cols = df.select_dtypes(include="number").columns
+        num_cols = self._numericas(df)
         if len(num_cols) == 0: return
         st.subheader(f" Histogramas - {nombre}")
-        fig = df[num_cols].hist(bins=30, figsize=(12, 8))
-        st.pyplot(fig[0][0].figure)
+        columnas = st.multiselect("Variables", num_cols, default=num_cols, key=f"hist_cols_{nombre}")
+        streaming = isinstance(df, EstadisticasStreaming)
+        bins = df.bins if streaming else st.slider("Bins", 10, 100, 30, step=10, key=f"hist_bins_{nombre}")
+        if columnas:
+            st.image(_histogramas(df, self._clave(nombre, df), tuple(columnas), bins))
+            if streaming:
+                st.caption(f"Modo streaming: {bins} celdas de ancho adaptativo por variable, conteos exactos")
 
+    @st.fragment
     def boxplot_df(self, nombre, df):
-        num_cols = df.select_dtypes(include="number").columns
+        num_cols = self._numericas(df)
         if len(num_cols) == 0: return
         st.subheader(f" Boxplots - {nombre}")
-        fig, ax = plt.subplots(figsize=(12, 6))
-        sns.boxplot(data=df[num_cols], ax=ax)
-        plt.xticks(rotation=45)
-        st.pyplot(fig)
+        columnas = st.multiselect("Variables", num_cols, default=num_cols, key=f"box_cols_{nombre}")
+        if columnas:
+            st.image(_boxplot(df, self._clave(nombre, df), tuple(columnas)))
+            self._error_declarado(df)
 
+    @st.fragment
     def correlacion_df(self, nombre, df):
-        num_cols = df.select_dtypes(include="number").columns
+        num_cols = self._numericas(df)
         if len(num_cols) == 0: return
         st.subheader(f" Matriz de correlación - {nombre}")
-        fig, ax = plt.subplots(figsize=(10, 8))
-        sns.heatmap(df[num_cols].corr(), annot=True, cmap="coolwarm", fmt=".2f", ax=ax)
-        st.pyplot(fig)
+        # Spearman necesita los rangos de todas las filas: en modo streaming solo hay Pearson
+        metodos = ["pearson"] if isinstance(df, EstadisticasStreaming) else ["pearson", "spearman"]
+        metodo = st.radio("Método", metodos, horizontal=True, key=f"corr_metodo_{nombre}")
+        st.image(_correlacion(df, self._clave(nombre, df), tuple(num_cols), metodo))
+        self._error_declarado(df, cuantiles=False)
+
+    @st.fragment
+    def analisis_temporal(self, freq="D", fecha_col="fecha", variable="pm2_5"):
+        variables = sorted({c for df in self.dfs.values() if fecha_col in self._columnas(df)
+                            for c in self._numericas(df) if c != "hora"})
+        if not variables:
+            return
+        seccion = freq  # los controles de cada sección conservan su estado al cambiar la frecuencia
+        col1, col2, col3, col4 = st.columns(4)
+        variable = col1.selectbox("Variable", variables, index=variables.index(variable) if variable in variables else 0,
+                                  key=f"serie_var_{seccion}")
+        # La serie horaria se calcula de las filas: sin DataFrames solo quedan las de los cubos
+        etiquetas = [e for e, f in FRECUENCIAS.items()
+                     if f in GRANULARIDAD or all(isinstance(df, pd.DataFrame) for df in self.dfs.values())]
+        etiqueta = col2.selectbox("Frecuencia", etiquetas, key=f"serie_freq_{seccion}",
+                                  index=[FRECUENCIAS[e] for e in etiquetas].index(freq)
+                                  if freq in [FRECUENCIAS[e] for e in etiquetas] else 0)
+        freq = FRECUENCIAS[etiqueta]
+        # Presupuesto de puntos por gráfico: series más largas se submuestrean (LTTB o min-max)
+        presupuesto = col3.select_slider("Puntos máx.", [500, 1000, 2000, 5000, 10000], value=2000,
+                                         key=f"serie_puntos_{seccion}")
+        metodo = col4.selectbox("Submuestreo", METODOS, key=f"serie_metodo_{seccion}")
 
-    def analisis_temporal(self, freq="D", fecha_col="fecha", variable="PM2.5"):
         st.subheader(f" Serie temporal {variable} ({freq})")
         for nombre, df in self.dfs.items():
-            if fecha_col not in df.columns or variable not in df.columns:
+            if fecha_col not in self._columnas(df) or variable not in self._columnas(df):
                 continue
-            df[fecha_col] = pd.to_datetime(df[fecha_col], errors="coerce")
-            serie = df.set_index(fecha_col)[variable].resample(freq).mean()
-            fig, ax = plt.subplots(figsize=(12, 6))
-            serie.plot(ax=ax)
-            ax.set_title(f"{variable} - {nombre} ({freq})")
-            st.pyplot(fig)
+            st.image(_serie(self._cubos(nombre, df), df, self._clave(nombre, df), variable, freq,
+                            f"{variable} - {nombre} ({freq})", presupuesto, metodo))
@@ -5,14 +5,33 @@
 # src/helpers/Utilidades.py
 import os
 import unidecode
+import numpy as np
 import pandas as pd
+from functools import lru_cache
 from pathlib import Path
 
 
+# Tipos fijos por nombre de columna para los datasets procesados
+COLUMNAS_FECHA = ("fecha", "time")
+TIPOS_COLUMNAS = {
+    "hora": "int8",
+    "ubicacion": "category",
+    "flujo_vehicular": "int32",
+    # Contaminantes (locales y de la API)
+    "pm2_5": "float32", "pm10": "float32", "co": "float32", "no2": "float32", "o3": "float32",
+    "carbon_monoxide": "float32", "nitrogen_dioxide": "float32", "ozone": "float32",
+    # Clima (local y de la API)
+    "temperatura": "float32", "humedad": "float32", "viento": "float32", "precipitacion": "float32",
+    "temperature_2m": "float32", "relative_humidity_2m": "float32",
+    "precipitation": "float32", "wind_speed_10m": "float32",
+}
+
+
 class Utilidades:
     """
     Funciones auxiliares reutilizables para el proyecto:
     - Normalización de texto y columnas
+    - Tipos de datos fijos
     - Manejo de rutas y archivos
     - Funciones con fechas
     """
@@ -20,10 +39,41 @@ class Utilidades:
     # ===============================
     # TEXTOS Y COLUMNAS
     # ===============================
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalizar_texto_cache(texto: str) -> str:
+        return unidecode.unidecode(texto).strip().lower()
+
     @staticmethod
     def normalizar_texto(texto: str) -> str:
         """Quita tildes, pasa a minúsculas y elimina espacios extras"""
-        return unidecode.unidecode(str(texto)).strip().lower()
+        return Utilidades._normalizar_texto_cache(str(texto))
+
+    @staticmethod
+    def normalizar_serie(serie: pd.Series) -> pd.Series:
+        """
+        Versión vectorizada de normalizar_texto para una columna completa.
+        Solo normaliza los valores distintos (con caché LRU compartida) y
+        reconstruye la columna como categórica a partir de los códigos,
+        así el costo depende del número de valores únicos y no de filas.
+        """
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos = serie.cat.codes.to_numpy()
+            unicos = serie.cat.categories.to_numpy()
+            if (codigos < 0).any():
+                # Igual que astype(str): los nulos se vuelven "nan"
+                codigos = np.where(codigos < 0, len(unicos), codigos)
+                unicos = np.append(unicos, np.nan)
+        else:
+            codigos, unicos = pd.factorize(serie, use_na_sentinel=False)
+
+        normalizados = [Utilidades.normalizar_texto(u) for u in unicos]
+        categorias, inverso = np.unique(np.array(normalizados, dtype=object), return_inverse=True)
+        return pd.Series(
+            pd.Categorical.from_codes(inverso[codigos], categories=categorias),
+            index=serie.index,
+            name=serie.name,
+        )
 
     @staticmethod
     def normalizar_columnas(df: pd.DataFrame) -> pd.DataFrame:
@@ -32,6 +82,36 @@ class Utilidades:
         df.columns = [Utilidades.normalizar_texto(col) for col in df.columns]
         return df
 
+    # ===============================
+    # TIPOS DE DATOS
+    # ===============================
+    @staticmethod
+    def aplicar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aplica los tipos fijos de TIPOS_COLUMNAS (y datetime64[ns] a fecha/time)
+        a las columnas presentes. Las columnas desconocidas se dejan igual.
+        """
+        tipos = {}
+        for col in df.columns:
+            if col in COLUMNAS_FECHA:
+                if str(df[col].dtype) != "datetime64[ns]":
+                    tipos[col] = "datetime64[ns]"
+            elif col in TIPOS_COLUMNAS and str(df[col].dtype) != TIPOS_COLUMNAS[col]:
+                tipos[col] = TIPOS_COLUMNAS[col]
+        if not tipos:
+            return df
+
+        df = df.copy()
+        for col, tipo in tipos.items():
+            if col in COLUMNAS_FECHA:
+                df[col] = pd.to_datetime(df[col], errors="coerce").astype(tipo)
+            elif tipo.startswith("int") and df[col].isna().any():
+                # Enteros con nulos no caben en int8/int32: se dejan como float32
+                df[col] = df[col].astype("float32")
+            else:
+                df[col] = df[col].astype(tipo)
+        return df
+
     # ===============================
     # RUTAS Y ARCHIVOS
     # ===============================
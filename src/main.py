@@ -1,9 +1,24 @@
 import os
 from src.api.ClienteAPI import ClienteAPI
 from src.datos.GestorDatos import GestorDatos
+from src.datos.CubosAgregados import CubosAgregados
+from src.datos.OrquestadorIngesta import OrquestadorIngesta
+from src.datos.UnificadorDatos import UnificadorDatos
 from src.basedatos.GestorBaseDatos import GestorBaseDatos
 from src.modelos.ModeloML import entrenar_modelo
 
+# Dataset procesado → tabla en la base de datos
+TABLAS = {"flujo_vehicular": "FlujoVehicular", "contaminantes": "Contaminantes", "clima": "Clima"}
+
+
+def filas_nuevas(almacen, nombre, marca_agua):
+    """Bloques del dataset con filas posteriores a `marca_agua` (todas si la tabla está vacía)."""
+    for bloque in almacen.iterar(nombre):
+        if marca_agua is not None:
+            bloque = bloque[(UnificadorDatos.marca_temporal(bloque) > marca_agua).to_numpy()]
+        if len(bloque):
+            yield bloque
+
 
 def main():
     # ------------------- RUTAS -------------------
@@ -18,11 +33,11 @@ def main():
     print("\n🔹 Paso 1: Descargando datos de APIs...")
     api = ClienteAPI()
     try:
-        df_air = api.descargar_air_quality("2024-08-15", "2024-08-22")
-        api.guardar_csv(df_air, "air_quality_clean.csv")
+        df_air = api.descargar_air_quality_estaciones("2024-08-15", "2024-08-22")
+        api.guardar(df_air, "air_quality_clean.csv")
 
-        df_clima_hist = api.descargar_clima_historico("2024-08-15", "2024-08-22")
-        api.guardar_csv(df_clima_hist, "clima_historico.csv")
+        df_clima_hist = api.descargar_clima_historico_estaciones("2024-08-15", "2024-08-22")
+        api.guardar(df_clima_hist, "clima_historico.csv")
     except Exception as e:
         print(f"⚠️ Error al descargar desde API: {e}")
         print("Continuando solo con archivos locales...")
@@ -31,9 +46,15 @@ def main():
     print("\n🔹 Paso 2: Procesando CSVs locales...")
     gd = GestorDatos(ruta_raw=raw_dir, ruta_processed=processed_dir)
 
-    df_flujo = gd.procesar_archivo("flujo_vehicular.csv")
-    df_contaminantes = gd.procesar_archivo("contaminantes.csv")
-    df_clima = gd.procesar_archivo("clima.csv")
+    # Archivos independientes: se procesan en paralelo (un proceso por archivo)
+    orquestador = OrquestadorIngesta(ruta_raw=raw_dir, ruta_processed=processed_dir)
+    # Los workers solo devuelven rutas y conteos; los datos se releen del almacén por bloques.
+    # Los CSV que solo crecieron se ingieren de forma incremental (se anexan las filas nuevas)
+    orquestador.procesar([f"{nombre}.csv" for nombre in TABLAS])
+
+    # Cubos de agregados para la app (incrementales: solo procesan las horas nuevas)
+    for nombre in TABLAS:
+        CubosAgregados(gd.almacen, nombre).actualizar()
 
     # ------------------- 3. CONEXIÓN A SQL SERVER -------------------
     print("\n🔹 Paso 3: Conexión a SQL Server...")
@@ -45,29 +66,34 @@ def main():
 
     # ------------------- 4. CREAR TABLAS -------------------
     print("\n🔹 Paso 4: Creando tablas...")
-    gestor_db.crear_tabla_desde_dataframe(df_flujo, "FlujoVehicular")
-    gestor_db.crear_tabla_desde_dataframe(df_contaminantes, "Contaminantes")
-    gestor_db.crear_tabla_desde_dataframe(df_clima, "Clima")
+    for nombre, tabla in TABLAS.items():
+        # El esquema sale del primer bloque: no hace falta cargar el dataset completo
+        gestor_db.crear_tabla_desde_dataframe(next(gd.almacen.iterar(nombre, tamano_bloque=1_000)), tabla)
 
     # ------------------- 5. INSERTAR DATOS -------------------
-    print("\n🔹 Paso 5: Insertando datos...")
-    gestor_db.insertar_dataframe(df_flujo, "FlujoVehicular")
-    gestor_db.insertar_dataframe(df_contaminantes, "Contaminantes")
-    gestor_db.insertar_dataframe(df_clima, "Clima")
+    print("\n🔹 Paso 5: Insertando datos (solo horas nuevas)...")
+    for nombre, tabla in TABLAS.items():
+        # Las fuentes crecen por horas: lo posterior a la última fecha + hora de la tabla es nuevo
+        marca_agua = gestor_db.marca_agua(tabla)
+        if marca_agua is not None:
+            print(f"ℹ️ '{tabla}' ya tiene datos hasta {marca_agua}")
+        gestor_db.insertar_dataframe(filas_nuevas(gd.almacen, nombre, marca_agua), tabla)
 
     # ------------------- 6. CREAR TABLA UNIFICADA -------------------
-    print("\n🔹 Paso 6: Creando Tabla Unificada...")
-    df_unificado = df_flujo.merge(df_contaminantes, on=["fecha", "hora"]) \
-                           .merge(df_clima, on=["fecha", "hora"])
-
-    gestor_db.crear_tabla_desde_dataframe(df_unificado, "TablaUnificada")
-    gestor_db.insertar_dataframe(df_unificado, "TablaUnificada")
+    print("\n🔹 Paso 6: Actualizando Tabla Unificada (solo horas nuevas)...")
+    df_nuevas = gd.unificar(incluir_api=False, incremental=True)
+
+    # Si la unificación se reconstruyó (primera ejecución, estado perdido o fuente reemplazada)
+    # trae la tabla completa: se vacía la de la base para no duplicar lo ya insertado
+    reconstruida = df_nuevas.attrs.get("reconstruida", False)
+    if reconstruida or not df_nuevas.empty:
+        gestor_db.crear_tabla_desde_dataframe(df_nuevas, "TablaUnificada")
+        if reconstruida:
+            gestor_db.vaciar_tabla("TablaUnificada")
+        gestor_db.insertar_dataframe(df_nuevas, "TablaUnificada")
+        print("✅ Inserción completada en la base de datos ContaminacionAire.")
 
     output_path = os.path.join(processed_dir, "TablaUnificada.csv")
-    df_unificado.to_csv(output_path, index=False)
-
-    print(f"✅ Archivo 'TablaUnificada.csv' guardado en {output_path}")
-    print("✅ Inserción completada en la base de datos ContaminacionAire.")
 
     # ------------------- 7. ENTRENAR MODELO -------------------
     print("\n🔹 Paso 7: Entrenando modelo...")
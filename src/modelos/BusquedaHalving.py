@@ -0,0 +1,192 @@
+# Clase BusquedaHalving: búsqueda de hiperparámetros por successive halving con presupuesto y estado reanudable.
+# src/modelos/BusquedaHalving.py
+import hashlib
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import ParameterSampler
+
+from src.modelos.TorneoModelos import METRICA_PRINCIPAL, calcular_metricas, fijar_n_jobs
+
+# Espacios de búsqueda sobre los candidatos de ModeloML (nombres de parámetro del Pipeline)
+ESPACIOS = {
+    "KNN": {"model__n_neighbors": [3, 5, 7, 11, 15, 25, 40], "model__weights": ["uniform", "distance"]},
+    "Árbol": {"max_depth": [4, 6, 8, 12, 16, None], "min_samples_leaf": [1, 5, 20, 50]},
+    "RandomForest": {"max_depth": [8, 12, 16, None], "min_samples_leaf": [1, 3, 10],
+                     "max_features": [1.0, "sqrt", 0.5]},
+}
+
+
+def _evaluar_config(clave: str, modelo, params: dict, tarea: str, X_train, y_train, X_val, y_val,
+                    arboles: int | None, n_jobs: int) -> dict:
+    """Entrena una configuración con el recurso asignado y retorna su métrica de validación."""
+    modelo = clone(modelo).set_params(**params)
+    if arboles is not None:
+        modelo.set_params(n_estimators=arboles)
+    fijar_n_jobs(modelo, n_jobs)
+    inicio = time.perf_counter()
+    modelo.fit(X_train, y_train)
+    pred = modelo.predict(X_val)
+    return {"clave": clave, "puntaje": calcular_metricas(tarea, y_val, pred)[METRICA_PRINCIPAL[tarea]],
+            "segundos": time.perf_counter() - inicio}
+
+
+class BusquedaHalving:
+    """
+    Successive halving sobre los Pipelines de ModeloML:
+    - Muestrea `n_configuraciones` por modelo de ESPACIOS y las evalúa todas con poco recurso
+    - En cada ronda conserva la mejor 1/`factor` y multiplica el recurso por `factor`
+    - Recurso "filas" (filas más recientes del entrenamiento) o "arboles" (n_estimators
+      en los ensambles; el resto de modelos escala por filas)
+    - Presupuesto de tiempo total (`presupuesto_s`): al agotarse devuelve lo mejor hasta ese momento
+    - Evaluaciones en paralelo y estado JSON en disco tras cada lote: una búsqueda
+      interrumpida con los mismos datos y espacio se reanuda sin repetir evaluaciones
+    """
+
+    def __init__(self, tarea: str = "regresion", n_configuraciones: int = 8, factor: int = 3,
+                 recurso: str = "filas", min_filas: int = 500, max_arboles: int = 200,
+                 presupuesto_s: float | None = 300, workers: int | None = None,
+                 ruta_estado: str | Path | None = None, espacios: dict | None = None, semilla: int = 42):
+        if recurso not in ("filas", "arboles"):
+            raise ValueError(f"❌ Recurso no soportado: {recurso}")
+        self.tarea = tarea
+        self.n_configuraciones = n_configuraciones
+        self.factor = factor
+        self.recurso = recurso
+        self.min_filas = min_filas
+        self.max_arboles = max_arboles
+        self.presupuesto_s = presupuesto_s
+        self.workers = workers or os.cpu_count() or 1
+        self.ruta_estado = Path(ruta_estado) if ruta_estado else None
+        self.espacios = espacios or ESPACIOS
+        self.semilla = semilla
+
+    # ===============================
+    # 1. Estado
+    # ===============================
+    def _firma(self, X, y) -> str:
+        h = hashlib.sha1(np.ascontiguousarray(X))
+        h.update(np.asarray(y).astype(str).astype("U").tobytes())
+        h.update(json.dumps([self.tarea, self.n_configuraciones, self.factor, self.recurso, self.min_filas,
+                             self.max_arboles, self.semilla, self.espacios], sort_keys=True, default=str).encode())
+        return h.hexdigest()
+
+    def _cargar_estado(self, firma: str) -> dict:
+        if self.ruta_estado and self.ruta_estado.exists():
+            with open(self.ruta_estado, encoding="utf-8") as f:
+                estado = json.load(f)
+            if estado.get("firma") == firma:
+                print(f"ℹ️ Reanudando búsqueda: {len(estado['evaluaciones'])} evaluaciones previas")
+                return estado
+        return {"firma": firma, "evaluaciones": {}}
+
+    def _guardar_estado(self, estado: dict):
+        if not self.ruta_estado:
+            return
+        self.ruta_estado.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.ruta_estado.with_name(self.ruta_estado.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(estado, f, indent=2, default=str)
+        os.replace(tmp, self.ruta_estado)
+
+    # ===============================
+    # 2. Búsqueda
+    # ===============================
+    def _configuraciones(self, modelos: dict) -> list[dict]:
+        configs = []
+        for nombre, modelo in modelos.items():
+            espacio = self.espacios.get(nombre)
+            if not espacio:
+                configs.append({"id": f"{nombre}#0", "modelo": nombre, "params": {}})
+                continue
+            total = math.prod(len(v) for v in espacio.values())
+            muestras = ParameterSampler(espacio, n_iter=min(self.n_configuraciones, total), random_state=self.semilla)
+            configs += [{"id": f"{nombre}#{i}", "modelo": nombre, "params": p} for i, p in enumerate(muestras)]
+        return configs
+
+    def _recurso(self, modelo, fraccion: float, n: int) -> tuple[int, int | None]:
+        """(filas, árboles) de una ronda; árboles=None deja el n_estimators del modelo."""
+        usa_arboles = self.recurso == "arboles" and "n_estimators" in modelo.get_params()
+        if usa_arboles:
+            return n, max(10, int(round(self.max_arboles * fraccion)))
+        return min(n, max(self.min_filas, int(n * fraccion))), None
+
+    def buscar(self, modelos: dict, X_train, y_train, X_val, y_val) -> dict:
+        """
+        Ejecuta la búsqueda y retorna {nombre_modelo: {"params", "puntaje", "recurso"}} con la
+        mejor configuración de cada modelo en el mayor recurso que alcanzó.
+        """
+        inicio = time.perf_counter()
+        X_train, X_val = np.asarray(X_train, dtype="float64"), np.asarray(X_val, dtype="float64")
+        y_train, y_val = np.asarray(y_train), np.asarray(y_val)
+        estado = self._cargar_estado(self._firma(X_train, y_train))
+        evaluaciones = estado["evaluaciones"]
+        vivos = self._configuraciones(modelos)
+        por_id = {c["id"]: c for c in vivos}
+        n = len(X_train)
+        rondas = max(1, math.ceil(math.log(len(vivos), self.factor))) if len(vivos) > 1 else 1
+        n_jobs_interno = max(1, (os.cpu_count() or 1) // max(1, min(self.workers, len(vivos))))
+        agotado = False
+
+        for ronda in range(rondas):
+            fraccion = self.factor ** (ronda - rondas + 1)
+            pendientes = []
+            for c in vivos:
+                filas, arboles = self._recurso(modelos[c["modelo"]], fraccion, n)
+                clave = f"{c['id']}|{filas}|{arboles}"
+                c["clave"] = clave
+                if clave not in evaluaciones:
+                    pendientes.append((clave, modelos[c["modelo"]], c["params"], self.tarea,
+                                       X_train[-filas:], y_train[-filas:], X_val, y_val, arboles, n_jobs_interno))
+
+            # Lotes del tamaño del pool: el estado se guarda y el presupuesto se revisa entre lotes
+            for i in range(0, len(pendientes), self.workers):
+                if self.presupuesto_s is not None and time.perf_counter() - inicio > self.presupuesto_s:
+                    agotado = True
+                    break
+                lote = pendientes[i:i + self.workers]
+                if len(lote) == 1 or self.workers == 1:
+                    salidas = [_evaluar_config(*t) for t in lote]
+                else:
+                    salidas = Parallel(n_jobs=len(lote), backend="loky")(delayed(_evaluar_config)(*t) for t in lote)
+                for s in salidas:
+                    evaluaciones[s["clave"]] = {"puntaje": s["puntaje"], "segundos": s["segundos"], "ronda": ronda}
+                self._guardar_estado(estado)
+
+            evaluados = [c for c in vivos if c["clave"] in evaluaciones]
+            evaluados.sort(key=lambda c: evaluaciones[c["clave"]]["puntaje"], reverse=True)
+            print(f"🔹 Ronda {ronda + 1}/{rondas}: {len(evaluados)} configuraciones con recurso "
+                  f"{fraccion:.0%}, mejor {evaluaciones[evaluados[0]['clave']]['puntaje']:.4f}"
+                  if evaluados else f"🔹 Ronda {ronda + 1}/{rondas}: sin evaluaciones")
+            if agotado or ronda == rondas - 1:
+                break
+            vivos = evaluados[:max(1, len(evaluados) // self.factor)]
+
+        if agotado:
+            print(f"⚠️ Presupuesto de {self.presupuesto_s:g} s agotado: se usa lo mejor evaluado")
+        print(f"⏱️ Búsqueda terminada en {time.perf_counter() - inicio:.2f} s")
+        return self._mejores(evaluaciones, por_id)
+
+    @staticmethod
+    def _mejores(evaluaciones: dict, por_id: dict) -> dict:
+        """Mejor configuración por modelo: mayor recurso alcanzado y, dentro de él, mayor puntaje."""
+        mejores = {}
+        for clave, ev in evaluaciones.items():
+            id_config = clave.split("|")[0]
+            if id_config not in por_id:
+                continue
+            config = por_id[id_config]
+            orden = (ev["ronda"], ev["puntaje"])
+            actual = mejores.get(config["modelo"])
+            if actual is None or orden > actual["_orden"]:
+                mejores[config["modelo"]] = {"params": config["params"], "puntaje": ev["puntaje"],
+                                             "recurso": clave.split("|", 1)[1], "_orden": orden}
+        for m in mejores.values():
+            m.pop("_orden")
+        return mejores
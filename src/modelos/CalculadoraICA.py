@@ -0,0 +1,135 @@
+# Clase CalculadoraICA: índice y categoría de calidad del aire vectorizados sobre tablas de cortes.
+# src/modelos/CalculadoraICA.py
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ===============================
+# Estándares
+# ===============================
+# Cada contaminante tiene una fila por categoría: (C_bajo, C_alto, I_bajo, I_alto).
+# El subíndice se interpola linealmente dentro de la fila (fórmula EPA) y la
+# categoría es la de la fila; "decimales" trunca la concentración antes de buscar.
+ESTANDARES = {
+    # Cortes históricos del proyecto (PM2.5 <= 12 / 35.4 / 55.4), sin truncar
+    "basico": {
+        "categorias": ["Buena", "Moderada", "Mala", "Muy Mala"],
+        "contaminantes": {
+            "pm2_5": {"decimales": None, "cortes": [
+                (0.0, 12.0, 0, 50), (12.0, 35.4, 50, 100), (35.4, 55.4, 100, 150), (55.4, 150.4, 150, 200)]},
+        },
+    },
+    # EPA AQI (revisión 2024 de PM2.5). PM en µg/m³, NO2 y O3 en ppb, CO en ppm.
+    # O3 usa la tabla de 8 h hasta 200 ppb y la de 1 h por encima.
+    "epa": {
+        "categorias": ["Buena", "Moderada", "Dañina a grupos sensibles", "Dañina", "Muy dañina", "Peligrosa"],
+        "contaminantes": {
+            "pm2_5": {"decimales": 1, "cortes": [
+                (0.0, 9.0, 0, 50), (9.1, 35.4, 51, 100), (35.5, 55.4, 101, 150),
+                (55.5, 125.4, 151, 200), (125.5, 225.4, 201, 300), (225.5, 325.4, 301, 500)]},
+            "pm10": {"decimales": 0, "cortes": [
+                (0, 54, 0, 50), (55, 154, 51, 100), (155, 254, 101, 150),
+                (255, 354, 151, 200), (355, 424, 201, 300), (425, 604, 301, 500)]},
+            "no2": {"decimales": 0, "cortes": [
+                (0, 53, 0, 50), (54, 100, 51, 100), (101, 360, 101, 150),
+                (361, 649, 151, 200), (650, 1249, 201, 300), (1250, 2049, 301, 500)]},
+            "o3": {"decimales": 0, "cortes": [
+                (0, 54, 0, 50), (55, 70, 51, 100), (71, 85, 101, 150),
+                (86, 105, 151, 200), (106, 404, 201, 300), (405, 604, 301, 500)]},
+            "co": {"decimales": 1, "cortes": [
+                (0.0, 4.4, 0, 50), (4.5, 9.4, 51, 100), (9.5, 12.4, 101, 150),
+                (12.5, 15.4, 151, 200), (15.5, 30.4, 201, 300), (30.5, 50.4, 301, 500)]},
+        },
+    },
+}
+
+# µg/m³ → ppb/ppm a 25 °C (Open-Meteo entrega gases en µg/m³)
+FACTORES_UG_M3 = {"no2": 1 / 1.88, "o3": 1 / 1.96, "co": 1 / 1145.0}
+
+
+class CalculadoraICA:
+    """
+    Calcula el índice de calidad del aire (ICA) de forma vectorizada:
+    - Subíndice por contaminante con np.searchsorted + interpolación lineal sobre la tabla de cortes
+    - Índice general = máximo de los subíndices; categoría = la del contaminante dominante
+    - Estándares incluidos: "basico" (solo PM2.5) y "epa"; tablas nacionales vía dict o JSON
+    - Valores faltantes dan índice y categoría nulos; por encima del último corte se satura
+    """
+
+    def __init__(self, estandar="basico", factores: dict | None = None):
+        tabla = ESTANDARES[estandar] if isinstance(estandar, str) else estandar
+        self.categorias = list(tabla["categorias"])
+        self.factores = factores or {}
+        self.contaminantes = {}
+        for nombre, spec in tabla["contaminantes"].items():
+            cortes = np.asarray(spec["cortes"], dtype="float64")
+            if cortes.shape != (len(self.categorias), 4):
+                raise ValueError(f"❌ La tabla de {nombre} debe tener una fila (C_bajo, C_alto, I_bajo, I_alto) "
+                                 f"por categoría ({len(self.categorias)})")
+            self.contaminantes[nombre] = (spec.get("decimales"), cortes)
+        self.dtype_categoria = pd.CategoricalDtype(self.categorias, ordered=True)
+
+    @classmethod
+    def desde_json(cls, path, factores: dict | None = None) -> "CalculadoraICA":
+        """Carga una tabla nacional con el mismo formato que ESTANDARES."""
+        with open(Path(path), encoding="utf-8") as f:
+            return cls(json.load(f), factores=factores)
+
+    # ===============================
+    # 1. Subíndices
+    # ===============================
+    def subindice(self, nombre: str, valores) -> tuple[np.ndarray, np.ndarray]:
+        """Retorna (subíndice float64, fila/categoría int8 con -1 para nulos) de un contaminante."""
+        decimales, cortes = self.contaminantes[nombre]
+        c = np.asarray(valores, dtype="float64") * self.factores.get(nombre, 1.0)
+        if decimales is not None:
+            escala = 10.0 ** decimales
+            c = np.floor(c * escala + 1e-9) / escala
+
+        # Fuera de la tabla se satura en el primer/último corte; NaN se propaga al índice
+        c = np.clip(c, cortes[0, 0], cortes[-1, 1])
+        fila = np.searchsorted(cortes[:, 1], c, side="left").astype("int8")
+        nulos = np.isnan(c)
+        fila[nulos] = -1
+        pendiente = (cortes[:, 3] - cortes[:, 2]) / (cortes[:, 1] - cortes[:, 0])
+        indice = pendiente[fila] * (c - cortes[fila, 0]) + cortes[fila, 2]
+        return indice, fila
+
+    # ===============================
+    # 2. Índice general
+    # ===============================
+    def calcular(self, df: pd.DataFrame, subindices: bool = False) -> pd.DataFrame:
+        """
+        Retorna un DataFrame alineado a df con "ica" (float32), "ica_categoria"
+        (categórica ordenada) y "contaminante_dominante"; con subindices=True
+        agrega "ica_<contaminante>". Usa los contaminantes del estándar presentes en df.
+        """
+        nombres = [n for n in self.contaminantes if n in df.columns]
+        if not nombres:
+            raise KeyError(f"❌ df no tiene ninguna columna de {list(self.contaminantes)}")
+
+        indices, filas = zip(*(self.subindice(n, df[n].to_numpy(dtype="float64", na_value=np.nan))
+                               for n in nombres))
+        indices, filas = np.column_stack(indices), np.column_stack(filas)
+
+        sin_datos = np.isnan(indices).all(axis=1)
+        dominante = np.argmax(np.where(np.isnan(indices), -np.inf, indices), axis=1)
+        posiciones = np.arange(len(df))
+        codigos = np.where(sin_datos, -1, filas[posiciones, dominante])
+
+        resultado = pd.DataFrame({
+            "ica": np.where(sin_datos, np.nan, indices[posiciones, dominante]).astype("float32"),
+            "ica_categoria": pd.Categorical.from_codes(codigos, dtype=self.dtype_categoria),
+            "contaminante_dominante": pd.Categorical.from_codes(np.where(sin_datos, -1, dominante),
+                                                                categories=nombres),
+        }, index=df.index)
+        if subindices:
+            for j, nombre in enumerate(nombres):
+                resultado[f"ica_{nombre}"] = indices[:, j].astype("float32")
+        return resultado
+
+    def categorizar(self, df: pd.DataFrame) -> pd.Series:
+        """Solo la categoría ICA (para etiquetar datos de entrenamiento o predicciones)."""
+        return self.calcular(df)["ica_categoria"]
@@ -0,0 +1,186 @@
+# Clase ExportadorModelos: artefactos compactos de modelos con metadatos de tamaño, carga y latencia.
+# src/modelos/ExportadorModelos.py
+import copy
+import json
+import os
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from src.modelos.TorneoModelos import METRICA_PRINCIPAL, calcular_metricas
+
+
+def _estimador_final(modelo):
+    """Último paso si es Pipeline, o el propio modelo."""
+    return modelo.steps[-1][1] if hasattr(modelo, "steps") else modelo
+
+
+class ExportadorModelos:
+    """
+    Exporta el modelo ganador a models/:
+    - Formato "mmap" (sin compresión; joblib.load(mmap_mode="r") no copia los arreglos de los
+      árboles a memoria) o "comprimido" (zlib, menor tamaño en disco, carga más lenta)
+    - Variantes reducidas de ensambles (los primeros k árboles) que se aceptan solo si la
+      métrica de holdout cae menos de `tolerancia` respecto al modelo completo
+    - Metadatos en <nombre>.json: tamaño, tiempo de carga, latencia de una fila y de un lote,
+      métrica y si la variante está dentro de la tolerancia
+    - elegir()/cargar() retornan la variante más precisa que cumple un presupuesto de latencia
+    """
+
+    ARBOLES_VARIANTES = (50, 25, 10)
+
+    def __init__(self, model_dir: str | Path = "models", formato: str = "mmap", tolerancia: float = 0.01,
+                 repeticiones: int = 20, tamano_lote: int = 1000):
+        if formato not in ("mmap", "comprimido"):
+            raise ValueError(f"❌ Formato no soportado: {formato}")
+        self.model_dir = Path(model_dir)
+        self.formato = formato
+        self.tolerancia = tolerancia
+        self.repeticiones = repeticiones
+        self.tamano_lote = tamano_lote
+
+    # ===============================
+    # 1. Variantes
+    # ===============================
+    def variantes(self, modelo) -> dict:
+        """{"completo": modelo, "arboles<k>": modelo con los primeros k árboles, ...}"""
+        resultado = {"completo": modelo}
+        final = _estimador_final(modelo)
+        arboles = getattr(final, "estimators_", None)
+        if not isinstance(arboles, list):
+            return resultado
+        for k in self.ARBOLES_VARIANTES:
+            if k >= len(arboles):
+                continue
+            variante = copy.copy(modelo)
+            reducido = copy.copy(final)
+            reducido.estimators_ = arboles[:k]
+            reducido.n_estimators = k
+            if hasattr(variante, "steps"):
+                variante.steps = variante.steps[:-1] + [(variante.steps[-1][0], reducido)]
+            else:
+                variante = reducido
+            resultado[f"arboles{k}"] = variante
+        return resultado
+
+    # ===============================
+    # 2. Medición
+    # ===============================
+    def _guardar_artefacto(self, modelo, path: Path):
+        tmp = path.with_name(path.name + ".tmp")
+        joblib.dump(modelo, tmp, compress=("zlib", 3) if self.formato == "comprimido" else 0)
+        os.replace(tmp, path)
+
+    def _cargar_artefacto(self, path: Path, formato: str):
+        return joblib.load(path, mmap_mode="r" if formato == "mmap" else None)
+
+    def _medir(self, path: Path, X) -> dict:
+        inicio = time.perf_counter()
+        modelo = self._cargar_artefacto(path, self.formato)
+        carga_s = time.perf_counter() - inicio
+
+        fila = X.iloc[[0]] if hasattr(X, "iloc") else X[:1]
+        lote = X.iloc[:self.tamano_lote] if hasattr(X, "iloc") else X[:self.tamano_lote]
+        modelo.predict(fila)  # calentamiento
+        tiempos_fila, tiempos_lote = [], []
+        for _ in range(self.repeticiones):
+            inicio = time.perf_counter()
+            modelo.predict(fila)
+            tiempos_fila.append(time.perf_counter() - inicio)
+        for _ in range(max(3, self.repeticiones // 5)):
+            inicio = time.perf_counter()
+            modelo.predict(lote)
+            tiempos_lote.append(time.perf_counter() - inicio)
+
+        return {
+            "tamano_bytes": path.stat().st_size,
+            "carga_s": carga_s,
+            "latencia_fila_ms": float(np.median(tiempos_fila) * 1000),
+            "latencia_lote_ms": float(np.median(tiempos_lote) * 1000),
+            "filas_lote": len(lote),
+        }
+
+    # ===============================
+    # 3. Exportación
+    # ===============================
+    def exportar(self, modelo, nombre: str, X_eval, y_eval=None, tarea: str | None = None,
+                 reducir: bool = True) -> dict:
+        """
+        Guarda <nombre>.pkl (modelo completo) y, con reducir=True, las variantes
+        <nombre>.<variante>.pkl. Retorna y escribe los metadatos <nombre>.json.
+        """
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        candidatos = self.variantes(modelo) if reducir else {"completo": modelo}
+        metrica = METRICA_PRINCIPAL.get(tarea) if y_eval is not None else None
+
+        metadatos = {"nombre": nombre, "formato": self.formato, "tarea": tarea, "metrica": metrica,
+                     "tolerancia": self.tolerancia, "variantes": {}}
+        base = None
+        for variante, m in candidatos.items():
+            archivo = f"{nombre}.pkl" if variante == "completo" else f"{nombre}.{variante}.pkl"
+            info = {"archivo": archivo}
+            if metrica:
+                info["valor_metrica"] = float(calcular_metricas(tarea, y_eval, m.predict(X_eval))[metrica])
+                base = info["valor_metrica"] if base is None else base
+                info["dentro_tolerancia"] = info["valor_metrica"] >= base - self.tolerancia
+                if not info["dentro_tolerancia"]:
+                    print(f"ℹ️ Variante {variante} descartada: {metrica} {info['valor_metrica']:.4f} "
+                          f"vs {base:.4f} del modelo completo")
+                    continue
+            path = self.model_dir / archivo
+            self._guardar_artefacto(m, path)
+            info.update(self._medir(path, X_eval))
+            metadatos["variantes"][variante] = info
+
+        # Variantes de exportaciones previas que ya no aplican
+        for path in self.model_dir.glob(f"{nombre}.*.pkl"):
+            if path.name.split(".")[1] not in metadatos["variantes"]:
+                path.unlink()
+
+        path_meta = self.model_dir / f"{nombre}.json"
+        tmp = path_meta.with_name(path_meta.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(metadatos, f, indent=2)
+        os.replace(tmp, path_meta)
+
+        for variante, info in metadatos["variantes"].items():
+            print(f"   • {info['archivo']}: {info['tamano_bytes'] / 1024 ** 2:.1f} MB, "
+                  f"carga {info['carga_s']:.3f} s, fila {info['latencia_fila_ms']:.2f} ms, "
+                  f"lote {info['latencia_lote_ms']:.1f} ms")
+        return metadatos
+
+    # ===============================
+    # 4. Selección y carga
+    # ===============================
+    def metadatos(self, nombre: str) -> dict | None:
+        path = self.model_dir / f"{nombre}.json"
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def elegir(self, nombre: str, presupuesto_ms: float | None = None, por: str = "fila") -> str:
+        """
+        Archivo de la variante más precisa cuya latencia ("fila" o "lote") cabe en el presupuesto;
+        si ninguna cabe, la más rápida. Sin metadatos retorna <nombre>.pkl.
+        """
+        meta = self.metadatos(nombre)
+        if not meta or not meta["variantes"]:
+            return f"{nombre}.pkl"
+        variantes = list(meta["variantes"].values())
+        if presupuesto_ms is None:
+            return meta["variantes"].get("completo", variantes[0])["archivo"]
+
+        clave = f"latencia_{por}_ms"
+        caben = [v for v in variantes if v[clave] <= presupuesto_ms]
+        if not caben:
+            return min(variantes, key=lambda v: v[clave])["archivo"]
+        return max(caben, key=lambda v: (v.get("valor_metrica", 0.0), -v[clave]))["archivo"]
+
+    def cargar(self, nombre: str, presupuesto_ms: float | None = None, por: str = "fila"):
+        """Carga la variante elegida (con mmap si el artefacto se exportó sin compresión)."""
+        meta = self.metadatos(nombre)
+        formato = meta["formato"] if meta else "comprimido"
+        return self._cargar_artefacto(self.model_dir / self.elegir(nombre, presupuesto_ms, por), formato)
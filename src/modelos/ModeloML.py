@@ -1,12 +1,12 @@
 # src/modelos/ModeloML.py
 import os
+import shutil
+import time
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import joblib
 
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score, accuracy_score, f1_score
 
 # Modelos
 from sklearn.linear_model import LinearRegression, LogisticRegression
@@ -18,6 +18,16 @@ from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 
+from src.datos.AlmacenDatos import AlmacenDatos
+from src.modelos.CalculadoraICA import CalculadoraICA
+from src.modelos.TorneoModelos import TorneoModelos
+from src.modelos.ValidacionTemporal import ValidacionTemporal
+from src.modelos.BusquedaHalving import BusquedaHalving
+from src.modelos.RegistroModelos import RegistroModelos, huella_datos
+from src.datos.UnificadorDatos import UnificadorDatos
+
+COLUMNAS_X = ["hora", "flujo_vehicular", "temperatura", "humedad", "viento", "pm10", "co", "no2", "o3"]
+
 
 # ---------- Utilidades ----------
 def _resolve_csv_path(csv_path=None) -> Path:
@@ -27,21 +37,120 @@ def _resolve_csv_path(csv_path=None) -> Path:
     return Path(__file__).resolve().parents[2] / "data" / "processed" / "TablaUnificada.csv"
 
 
-def _pm25_to_ica(pm25: float) -> str:
-    """Convierte PM2.5 en categoría ICA."""
-    if pm25 <= 12: return "Buena"
-    elif pm25 <= 35.4: return "Moderada"
-    elif pm25 <= 55.4: return "Mala"
-    else: return "Muy Mala"
+def _cargar_tabla(csv_path=None, ordenar=False) -> pd.DataFrame:
+    """
+    Carga la tabla de entrenamiento (CSV o Parquet, la copia más reciente)
+    leyendo solo las columnas que usan los modelos.
+    Con ordenar=True agrega fecha y la ordena en el tiempo (para validación temporal).
+    """
+    path = _resolve_csv_path(csv_path)
+    almacen = AlmacenDatos(path.parent)
+    columnas = COLUMNAS_X + ["pm2_5"]
+    if not ordenar:
+        return almacen.cargar(path.name, columnas=columnas)
+
+    disponibles = almacen.columnas(path.name)
+    extra = [c for c in ("fecha", "time") if c in disponibles][:1]
+    df = almacen.cargar(path.name, columnas=columnas + extra)
+    if extra:
+        orden = np.argsort(UnificadorDatos.marca_temporal(df).to_numpy(), kind="stable")
+        df = df.iloc[orden].reset_index(drop=True)
+    else:
+        print("⚠️ La tabla no tiene fecha: se asume que ya está en orden temporal")
+    return df
+
+
+def _pm25_to_ica(pm25, estandar="basico") -> pd.Series:
+    """Convierte PM2.5 (escalar, arreglo o Series) en categoría ICA, vectorizado."""
+    serie = pm25 if isinstance(pm25, pd.Series) else pd.Series(np.atleast_1d(pm25), dtype="float64")
+    return CalculadoraICA(estandar).categorizar(serie.to_frame("pm2_5"))
+
+
+def _ajustar_hiperparametros(tarea, modelos, X, y, validacion, workers, presupuesto_s):
+    """
+    Successive halving sobre los candidatos y fija en cada Pipeline su mejor configuración.
+    Solo usa la parte de entrenamiento (la misma partición que después evalúa el torneo
+    en holdout, o el 80 % más antiguo en temporal); el último 20 % de ella valida.
+    """
+    if validacion == "holdout":
+        estratos = y if tarea == "clasificacion" else None
+        X, _, y, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=estratos)
+    else:
+        X, y = X.iloc[:int(len(X) * 0.8)], y.iloc[:int(len(y) * 0.8)]
+    corte = int(len(X) * 0.8)
+
+    ruta_estado = Path(__file__).resolve().parents[2] / "models" / "busqueda" / f"{tarea}.json"
+    busqueda = BusquedaHalving(tarea, presupuesto_s=presupuesto_s, workers=workers, ruta_estado=ruta_estado)
+    mejores = busqueda.buscar(modelos, X.iloc[:corte], y.iloc[:corte], X.iloc[corte:], y.iloc[corte:])
+    for nombre, mejor in mejores.items():
+        modelos[nombre].set_params(**mejor["params"])
+        print(f"🛠️ {nombre}: {mejor['params'] or 'parámetros por defecto'} ({mejor['puntaje']:.4f})")
+    return modelos
+
+
+def _seleccionar_modelo(tarea, modelos, X, y, workers, peso_latencia, validacion, n_folds):
+    """
+    Elige el mejor candidato y retorna (nombre, modelo entrenado, resultados, (X_eval, y_eval)).
+    - "holdout": split aleatorio 80/20 (estratificado en clasificación); evalúa en el 20 %
+    - "temporal": TimeSeriesSplit sobre X/y ya ordenados en el tiempo; el mejor
+      según el promedio de los folds se reentrena con todo salvo el bloque del último
+      fold, que queda como X_eval (las métricas del registro y la validación de las
+      variantes exportadas se miden fuera de muestra)
+    """
+    torneo = TorneoModelos(tarea, workers=workers, peso_latencia=peso_latencia)
+    if validacion == "holdout":
+        estratos = y if tarea == "clasificacion" else None
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=estratos)
+        competidores = torneo.competir(modelos, X_train, y_train, X_test, y_test)
+        nombre, mejor = torneo.seleccionar(competidores)
+        return nombre, mejor, {n: r["metricas"] for n, r in competidores.items()}, (X_test, y_test)
+
+    if validacion != "temporal":
+        raise ValueError(f"❌ Validación no soportada: {validacion}")
+    validador = ValidacionTemporal(tarea, n_folds=n_folds, workers=workers)
+    por_fold = validador.evaluar(modelos, X, y)
+    print("📋 Métricas por fold:\n", por_fold.to_string(index=False))
+    promedios = (por_fold.drop(columns=["fold", "n_train", "n_test"])
+                 .groupby("modelo", sort=False).mean(numeric_only=True))
+    candidatos = {n: {"modelo": modelos[n], "metricas": promedios.loc[n].to_dict()} for n in promedios.index}
+    nombre, mejor = torneo.seleccionar(candidatos)
+    corte = len(X) - len(X) // (n_folds + 1)
+    mejor.fit(X.iloc[:corte], y.iloc[:corte])
+    return nombre, mejor, {n: c["metricas"] for n, c in candidatos.items()}, (X.iloc[corte:], y.iloc[corte:])
+
+
+def _guardar_modelo(nombre_archivo, tarea, nombre_mejor, mejor, resultados, X, y, X_eval, y_eval, inicio):
+    """
+    Registra una nueva versión en models/registry (y la promueve) y mantiene la copia
+    heredada models/<nombre_archivo>.pkl para quien aún la lea directamente.
+    """
+    model_dir = Path(__file__).resolve().parents[2] / "models"
+    registro = RegistroModelos(model_dir / "registry")
+    metricas = resultados[nombre_mejor]
+    rendimiento = ("fit_s", "predict_s", "latencia_ms_1000", "memoria_pico_mb")
+    version = registro.registrar(
+        nombre_archivo, mejor, X_eval, y_eval, tarea=tarea, features=list(X.columns),
+        metricas={k: v for k, v in metricas.items() if k not in rendimiento},
+        huella=huella_datos(pd.concat([X, y.rename("objetivo")], axis=1)),
+        tiempos={"entrenamiento_s": time.perf_counter() - inicio,
+                 **{k: v for k, v in metricas.items() if k in rendimiento}},
+        extra={"modelo": nombre_mejor, "filas": len(X), "filas_eval": len(X_eval), "resultados": resultados},
+    )
+
+    modelo_path = model_dir / f"{nombre_archivo}.pkl"
+    tmp = modelo_path.with_name(modelo_path.name + ".tmp")
+    shutil.copyfile(model_dir / "registry" / nombre_archivo / version / "modelo.pkl", tmp)
+    os.replace(tmp, modelo_path)
+    return modelo_path
 
 
 # ---------- Entrenamiento ----------
-def entrenar_regresion(df: pd.DataFrame):
-    X = df[["hora","flujo_vehicular","temperatura","humedad","viento","pm10","co","no2","o3"]]
+def entrenar_regresion(df: pd.DataFrame, workers=None, peso_latencia=0.0, validacion="holdout", n_folds=5,
+                       buscar=False, presupuesto_s=300):
+    inicio = time.perf_counter()
+    X = df[COLUMNAS_X]
     y = df["pm2_5"]
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
     modelos = {
         "Lineal": Pipeline([
             ("scaler", StandardScaler()),
@@ -55,33 +164,27 @@ def entrenar_regresion(df: pd.DataFrame):
         "RandomForest": RandomForestRegressor(random_state=42),
     }
 
-    resultados = {}
-    mejor, mejor_score = None, -np.inf
-    for nombre, modelo in modelos.items():
-        modelo.fit(X_train, y_train)
-        pred = modelo.predict(X_test)
-        mse, r2 = mean_squared_error(y_test, pred), r2_score(y_test, pred)
-        resultados[nombre] = {"MSE": mse, "R2": r2}
-        if r2 > mejor_score:
-            mejor, mejor_score = modelo, r2
-
-    # Guardar modelo en carpeta raíz /models
-    project_root = Path(__file__).resolve().parents[2]
-    model_dir = project_root / "models"
-    model_dir.mkdir(parents=True, exist_ok=True)
-    modelo_path = model_dir / "modelo_regresion.pkl"
-
-    joblib.dump(mejor, modelo_path)
-    print("📊 Resultados regresión:", resultados)
-    print(f"✅ Mejor regresor guardado en {modelo_path}")
+    if buscar:
+        modelos = _ajustar_hiperparametros("regresion", modelos, X, y, validacion, workers, presupuesto_s)
 
+    nombre_mejor, mejor, resultados, (X_eval, y_eval) = _seleccionar_modelo("regresion", modelos, X, y, workers,
+                                                                            peso_latencia, validacion, n_folds)
+
+    # Registrar versión (artefactos, métricas, huella y tiempos) y copia en carpeta raíz /models
+    modelo_path = _guardar_modelo("modelo_regresion", "regresion", nombre_mejor, mejor, resultados, X, y,
+                                  X_eval, y_eval, inicio)
+    print("📊 Resultados regresión:", resultados)
+    print(f"✅ Mejor regresor ({nombre_mejor}) guardado en {modelo_path}")
 
-def entrenar_clasificacion(df: pd.DataFrame):
-    df["ica_categoria"] = df["pm2_5"].apply(_pm25_to_ica)
-    X = df[["hora","flujo_vehicular","temperatura","humedad","viento","pm10","co","no2","o3"]]
-    y = df["ica_categoria"]
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+def entrenar_clasificacion(df: pd.DataFrame, estandar="basico", workers=None, peso_latencia=0.0,
+                           validacion="holdout", n_folds=5, buscar=False, presupuesto_s=300):
+    inicio = time.perf_counter()
+    # Etiquetas en una sola pasada vectorizada, sin modificar el df recibido
+    y = _pm25_to_ica(df["pm2_5"], estandar)
+    validas = y.notna().to_numpy()
+    X = df.loc[validas, COLUMNAS_X]
+    y = y[validas].astype(str)
 
     modelos = {
         "Logística": Pipeline([
@@ -96,39 +199,36 @@ def entrenar_clasificacion(df: pd.DataFrame):
         "RandomForest": RandomForestClassifier(random_state=42),
     }
 
-    resultados = {}
-    mejor, mejor_score = None, -np.inf
-    for nombre, modelo in modelos.items():
-        modelo.fit(X_train, y_train)
-        pred = modelo.predict(X_test)
-        acc, f1 = accuracy_score(y_test, pred), f1_score(y_test, pred, average="macro")
-        resultados[nombre] = {"Accuracy": acc, "F1": f1}
-        if acc > mejor_score:
-            mejor, mejor_score = modelo, acc
-
-    # Guardar modelo en carpeta raíz /models
-    project_root = Path(__file__).resolve().parents[2]
-    model_dir = project_root / "models"
-    model_dir.mkdir(parents=True, exist_ok=True)
-    modelo_path = model_dir / "modelo_clasificacion.pkl"
-
-    joblib.dump(mejor, modelo_path)
+    if buscar:
+        modelos = _ajustar_hiperparametros("clasificacion", modelos, X, y, validacion, workers, presupuesto_s)
+
+    nombre_mejor, mejor, resultados, (X_eval, y_eval) = _seleccionar_modelo("clasificacion", modelos, X, y, workers,
+                                                                            peso_latencia, validacion, n_folds)
+
+    # Registrar versión (artefactos, métricas, huella y tiempos) y copia en carpeta raíz /models
+    modelo_path = _guardar_modelo("modelo_clasificacion", "clasificacion", nombre_mejor, mejor, resultados, X, y,
+                                  X_eval, y_eval, inicio)
     print("📊 Resultados clasificación:", resultados)
-    print(f"✅ Mejor clasificador guardado en {modelo_path}")
+    print(f"✅ Mejor clasificador ({nombre_mejor}) guardado en {modelo_path}")
 
 
 # ---------- API principal ----------
-def entrenar_modelo(csv_path=None, tarea="regresion"):
-    df = pd.read_csv(_resolve_csv_path(csv_path))
+def entrenar_modelo(csv_path=None, tarea="regresion", workers=None, peso_latencia=0.0,
+                    validacion="holdout", n_folds=5, buscar=False, presupuesto_s=300):
+    df = _cargar_tabla(csv_path, ordenar=validacion == "temporal")
+    opciones = {"workers": workers, "peso_latencia": peso_latencia, "validacion": validacion, "n_folds": n_folds,
+                "buscar": buscar, "presupuesto_s": presupuesto_s}
 
     if tarea in ("regresion","ambos"):
-        entrenar_regresion(df)
+        entrenar_regresion(df, **opciones)
     if tarea in ("clasificacion","ambos"):
-        entrenar_clasificacion(df)
+        entrenar_clasificacion(df, **opciones)
 
 
 # ---------- Ejecutar por consola ----------
 if __name__ == "__main__":
     import sys
     tarea = sys.argv[1] if len(sys.argv) > 1 else "regresion"
-    entrenar_modelo(tarea=tarea)
+    validacion = sys.argv[2] if len(sys.argv) > 2 else "holdout"
+    buscar = "--buscar" in sys.argv
+    entrenar_modelo(tarea=tarea, validacion=validacion, buscar=buscar)
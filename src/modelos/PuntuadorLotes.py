@@ -0,0 +1,169 @@
+# Clase PuntuadorLotes: predicciones por lotes sobre archivos grandes de features (CSV o Parquet).
+# src/modelos/PuntuadorLotes.py
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src.modelos.RegistroModelos import RegistroModelos
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow es opcional: sin él solo se aceptan CSV
+    pa = ds = pq = None
+
+# Columnas de la entrada que se copian a la salida para identificar cada fila
+COLUMNAS_CLAVE = ("fecha", "hora", "time", "ubicacion")
+# Modelo del registro → columna de predicción
+SALIDAS = {"modelo_regresion": "pm2_5_pred", "modelo_clasificacion": "ica_categoria_pred"}
+
+_MODELOS = {}
+
+
+def _iniciar_worker(ruta_registro: str, versiones: dict, presupuesto_ms):
+    """Carga cada modelo una sola vez por proceso, en la versión resuelta por el proceso principal."""
+    registro = RegistroModelos(ruta_registro)
+    for nombre, version in versiones.items():
+        _MODELOS[nombre] = registro.cargar(nombre, version=version, presupuesto_ms=presupuesto_ms, por="lote")
+
+
+def _puntuar_bloque(bloque: pd.DataFrame, features: dict, claves: list[str]) -> pd.DataFrame:
+    salida = bloque[claves].copy()
+    for nombre, (modelo, _) in _MODELOS.items():
+        X = bloque[features[nombre]]
+        salida[SALIDAS.get(nombre, f"{nombre}_pred")] = modelo.predict(X)
+    return salida
+
+
+class PuntuadorLotes:
+    """
+    Puntuación masiva con los modelos vigentes del registro:
+    - Lee la entrada por bloques (CSV con chunksize, Parquet archivo o directorio con pyarrow)
+      leyendo solo las features y las columnas clave
+    - La versión vigente de cada modelo se resuelve una vez al empezar: todos los workers
+      cargan esa misma versión aunque se promueva otra durante la corrida
+    - Las features salen de los metadatos de esa versión; si a la entrada le falta
+      alguna, se rechaza antes de puntuar (no se rellenan con ceros)
+    - Regresión y clasificación se calculan en la misma pasada, en un pool de procesos
+      donde cada worker carga los modelos una sola vez
+    - Escribe la salida incrementalmente y en el orden de entrada (CSV o Parquet según
+      la extensión); se publica con un rename al terminar
+    """
+
+    def __init__(self, ruta_registro: str | Path = "models/registry", modelos=tuple(SALIDAS),
+                 workers: int | None = None, tamano_bloque: int = 200_000, presupuesto_ms: float | None = None):
+        self.ruta_registro = str(ruta_registro)
+        self.modelos = tuple(modelos)
+        self.workers = workers or os.cpu_count() or 1
+        self.tamano_bloque = tamano_bloque
+        self.presupuesto_ms = presupuesto_ms
+
+    # ===============================
+    # 1. Entrada / salida
+    # ===============================
+    def _versiones(self) -> tuple[dict, dict]:
+        """({nombre: versión vigente}, {nombre: features de esa versión}), resueltos una sola vez."""
+        registro = RegistroModelos(self.ruta_registro)
+        versiones, features = {}, {}
+        for nombre in self.modelos:
+            versiones[nombre] = registro.actual(nombre)
+            meta = registro.metadatos(nombre, versiones[nombre])
+            if meta is None:
+                _, meta = registro.cargar(nombre)  # modelo heredado sin registro
+            features[nombre] = list(meta["features"])
+        return versiones, features
+
+    @staticmethod
+    def _es_parquet(entrada: Path) -> bool:
+        return entrada.suffix == ".parquet" or entrada.is_dir()
+
+    def _esquema(self, entrada: Path) -> list[str]:
+        """Columnas de la entrada sin leer los datos."""
+        if self._es_parquet(entrada):
+            if ds is None:
+                raise ImportError("❌ Leer Parquet requiere pyarrow")
+            return list(ds.dataset(str(entrada), format="parquet").schema.names)
+        return list(pd.read_csv(entrada, nrows=0).columns)
+
+    def _bloques(self, entrada: Path, presentes: list[str]):
+        if self._es_parquet(entrada):
+            dataset = ds.dataset(str(entrada), format="parquet")
+            for lote in dataset.to_batches(columns=presentes, batch_size=self.tamano_bloque):
+                yield lote.to_pandas()
+        else:
+            yield from pd.read_csv(entrada, usecols=presentes, chunksize=self.tamano_bloque)
+
+    @staticmethod
+    def _escribir(salida: Path, df: pd.DataFrame, estado: dict):
+        if salida.suffix == ".parquet":
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if estado.get("writer") is None:
+                estado["writer"] = pq.ParquetWriter(str(estado["tmp"]), tabla.schema)
+            estado["writer"].write_table(tabla.cast(estado["writer"].schema))
+        else:
+            df.to_csv(estado["tmp"], mode="a", header=not estado.get("filas"), index=False)
+        estado["filas"] = estado.get("filas", 0) + len(df)
+
+    # ===============================
+    # 2. Puntuación
+    # ===============================
+    def puntuar(self, entrada: str | Path, salida: str | Path) -> int:
+        """Puntúa `entrada` completa y escribe `salida`. Retorna el número de filas."""
+        entrada, salida = Path(entrada), Path(salida)
+        versiones, features = self._versiones()
+        todas = list(dict.fromkeys(f for cols in features.values() for f in cols))
+        esquema = self._esquema(entrada)
+        faltantes = {nombre: [f for f in cols if f not in esquema] for nombre, cols in features.items()}
+        faltantes = {nombre: cols for nombre, cols in faltantes.items() if cols}
+        if faltantes:
+            raise ValueError(f"❌ A {entrada.name} le faltan features requeridas por los modelos: {faltantes}")
+        presentes = [c for c in COLUMNAS_CLAVE if c not in todas and c in esquema] + todas
+
+        salida.parent.mkdir(parents=True, exist_ok=True)
+        estado = {"tmp": salida.with_name(salida.name + ".tmp"), "filas": 0}
+        estado["tmp"].unlink(missing_ok=True)
+        inicio = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_iniciar_worker,
+                                 initargs=(self.ruta_registro, versiones, self.presupuesto_ms)) as pool:
+            en_vuelo = deque()
+            for bloque in self._bloques(entrada, presentes):
+                claves = [c for c in COLUMNAS_CLAVE if c in bloque.columns]
+                en_vuelo.append(pool.submit(_puntuar_bloque, bloque, features, claves))
+                # Como máximo 2 bloques por worker en memoria; se escriben en orden
+                while len(en_vuelo) >= 2 * self.workers:
+                    self._escribir(salida, en_vuelo.popleft().result(), estado)
+            while en_vuelo:
+                self._escribir(salida, en_vuelo.popleft().result(), estado)
+
+        if estado.get("writer") is not None:
+            estado["writer"].close()
+        if estado["filas"]:
+            os.replace(estado["tmp"], salida)
+        segundos = time.perf_counter() - inicio
+        print(f"✅ {estado['filas']} filas puntuadas en {segundos:.2f} s "
+              f"({estado['filas'] / max(segundos, 1e-9):,.0f} filas/s) → {salida}")
+        return estado["filas"]
+
+
+# ---------- Ejecutar por consola ----------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Predicciones por lotes con los modelos vigentes del registro")
+    parser.add_argument("entrada", help="CSV, archivo Parquet o directorio Parquet con las features")
+    parser.add_argument("salida", help="Archivo de salida (.csv o .parquet)")
+    parser.add_argument("--registro", default="models/registry")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--bloque", type=int, default=200_000, help="Filas por bloque")
+    parser.add_argument("--presupuesto-ms", type=float, default=None,
+                        help="Latencia máxima por lote para elegir variante del modelo")
+    args = parser.parse_args()
+
+    PuntuadorLotes(args.registro, workers=args.workers, tamano_bloque=args.bloque,
+                   presupuesto_ms=args.presupuesto_ms).puntuar(args.entrada, args.salida)
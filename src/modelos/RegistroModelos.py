@@ -0,0 +1,177 @@
+# Clase RegistroModelos: registro local de versiones de modelos con promoción atómica y recarga en caliente.
+# src/modelos/RegistroModelos.py
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from src.modelos.ExportadorModelos import ExportadorModelos
+
+
+def huella_datos(df: pd.DataFrame) -> str:
+    """Huella de los datos de entrenamiento (contenido, columnas y orden de filas)."""
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    h.update(json.dumps(list(map(str, df.columns))).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _escribir_json(path: Path, datos: dict):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2, default=str)
+    os.replace(tmp, path)
+
+
+class RegistroModelos:
+    """
+    Registro de modelos basado en archivos:
+
+        models/registry/<nombre>/<version>/modelo.pkl (+ variantes y modelo.json de latencias)
+        models/registry/<nombre>/<version>/version.json  (features, métricas, huella, tiempos)
+        models/registry/<nombre>/current.json            (puntero a la versión vigente)
+
+    - Las versiones no se sobrescriben; se ordenan por fecha de creación
+    - promover() reemplaza current.json con os.replace (atómico para los lectores)
+    - Sin versiones registradas, cargar() usa el archivo heredado models/<nombre>.pkl
+    """
+
+    def __init__(self, ruta: str | Path = "models/registry"):
+        self.ruta = Path(ruta)
+
+    def _dir(self, nombre: str, version: str | None = None) -> Path:
+        return self.ruta / nombre if version is None else self.ruta / nombre / version
+
+    def path_actual(self, nombre: str) -> Path:
+        return self._dir(nombre) / "current.json"
+
+    # ===============================
+    # 1. Registro y promoción
+    # ===============================
+    def registrar(self, nombre: str, modelo, X_eval, y_eval=None, tarea: str | None = None,
+                  features: list[str] | None = None, metricas: dict | None = None, huella: str | None = None,
+                  tiempos: dict | None = None, extra: dict | None = None, promover: bool = True) -> str:
+        """Guarda una nueva versión (artefactos + metadatos) y opcionalmente la promueve."""
+        version = f"{datetime.now():%Y%m%dT%H%M%S%f}-{os.getpid()}"
+        destino = self._dir(nombre, version)
+        tmp = destino.with_name(destino.name + ".tmp")
+        tmp.mkdir(parents=True, exist_ok=False)
+
+        artefactos = ExportadorModelos(tmp).exportar(modelo, "modelo", X_eval, y_eval, tarea=tarea)
+        _escribir_json(tmp / "version.json", {
+            "nombre": nombre,
+            "version": version,
+            "creado": datetime.now().isoformat(timespec="seconds"),
+            "tarea": tarea,
+            "features": list(features if features is not None else getattr(modelo, "feature_names_in_", [])),
+            "metricas": metricas or {},
+            "huella_datos": huella,
+            "tiempos": tiempos or {},
+            "variantes": list(artefactos["variantes"]),
+            **(extra or {}),
+        })
+        os.replace(tmp, destino)  # la versión aparece completa o no aparece
+
+        print(f"✅ {nombre} versión {version} registrada en {destino}")
+        if promover:
+            self.promover(nombre, version)
+        return version
+
+    def promover(self, nombre: str, version: str):
+        if not (self._dir(nombre, version) / "version.json").exists():
+            raise FileNotFoundError(f"❌ No existe la versión {version} de {nombre}")
+        _escribir_json(self.path_actual(nombre), {"version": version, "promovido": datetime.now().isoformat()})
+        print(f"🔹 {nombre}: versión vigente → {version}")
+
+    # ===============================
+    # 2. Consulta
+    # ===============================
+    def versiones(self, nombre: str) -> list[str]:
+        base = self._dir(nombre)
+        if not base.exists():
+            return []
+        return sorted(p.name for p in base.iterdir() if (p / "version.json").exists())
+
+    def actual(self, nombre: str) -> str | None:
+        path = self.path_actual(nombre)
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["version"]
+
+    def metadatos(self, nombre: str, version: str | None = None) -> dict | None:
+        version = version or self.actual(nombre)
+        if version is None:
+            return None
+        with open(self._dir(nombre, version) / "version.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def cargar(self, nombre: str, version: str | None = None, presupuesto_ms: float | None = None,
+               por: str = "fila"):
+        """Retorna (modelo, metadatos) de la versión indicada o vigente (variante según presupuesto)."""
+        version = version or self.actual(nombre)
+        if version is None:
+            heredado = self.ruta.parent / f"{nombre}.pkl"
+            if not heredado.exists():
+                raise FileNotFoundError(f"❌ No hay versiones de {nombre} ni {heredado}")
+            modelo = joblib.load(heredado)
+            return modelo, {"nombre": nombre, "version": None,
+                            "features": list(getattr(modelo, "feature_names_in_", []))}
+        modelo = ExportadorModelos(self._dir(nombre, version)).cargar("modelo", presupuesto_ms, por)
+        return modelo, self.metadatos(nombre, version)
+
+
+class CargadorModelos:
+    """
+    Acceso a la versión vigente para procesos de larga duración (app, servicio):
+    - modelo() revisa current.json con un stat (cada `intervalo_s` como máximo)
+    - Solo vuelve a leer el artefacto cuando el puntero apunta a otra versión
+    - Thread-safe
+    """
+
+    def __init__(self, registro: RegistroModelos, nombre: str, presupuesto_ms: float | None = None,
+                 intervalo_s: float = 1.0):
+        self.registro = registro
+        self.nombre = nombre
+        self.presupuesto_ms = presupuesto_ms
+        self.intervalo_s = intervalo_s
+        self._lock = threading.Lock()
+        self._firma_puntero = None
+        self._revisado = 0.0
+        self._version = None
+        self._modelo = None
+        self._metadatos = None
+        self.recargas = 0
+
+    def _firma(self):
+        try:
+            stat = self.registro.path_actual(self.nombre).stat()
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def modelo(self):
+        """Retorna (modelo, metadatos) vigentes, recargando solo si cambió la versión."""
+        with self._lock:
+            ahora = time.monotonic()
+            if self._modelo is None or ahora - self._revisado >= self.intervalo_s:
+                self._revisado = ahora
+                firma = self._firma()
+                if self._modelo is None or firma != self._firma_puntero:
+                    self._firma_puntero = firma
+                    version = self.registro.actual(self.nombre)
+                    if self._modelo is None or version != self._version:
+                        self._modelo, self._metadatos = self.registro.cargar(self.nombre, version,
+                                                                             self.presupuesto_ms)
+                        self._version = version
+                        self.recargas += 1
+            return self._modelo, self._metadatos
+
+    @property
+    def version(self) -> str | None:
+        return self._version
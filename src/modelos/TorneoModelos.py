@@ -0,0 +1,143 @@
+# Clase TorneoModelos: entrena modelos candidatos en paralelo y registra métricas, tiempos y memoria.
+# src/modelos/TorneoModelos.py
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import mean_squared_error, r2_score, accuracy_score, f1_score
+from sklearn.pipeline import Pipeline
+
+try:
+    import resource  # solo Unix: sin él (p.ej. Windows) no hay pico de RSS
+except ImportError:
+    resource = None
+
+# Métrica usada para elegir el mejor modelo por tarea (mayor es mejor)
+METRICA_PRINCIPAL = {"regresion": "R2", "clasificacion": "Accuracy"}
+
+
+def calcular_metricas(tarea: str, y_true, pred) -> dict:
+    if tarea == "regresion":
+        return {"MSE": mean_squared_error(y_true, pred), "R2": r2_score(y_true, pred)}
+    return {"Accuracy": accuracy_score(y_true, pred), "F1": f1_score(y_true, pred, average="macro")}
+
+
+def fijar_n_jobs(modelo, n_jobs: int):
+    """Fija n_jobs en el modelo (o en los pasos del Pipeline) que lo soporten."""
+    pasos = modelo.steps if isinstance(modelo, Pipeline) else [(None, modelo)]
+    for nombre, paso in pasos:
+        # LogisticRegression ignora n_jobs desde sklearn 1.8 (y avisa si se fija)
+        if "n_jobs" in paso.get_params(deep=False) and not isinstance(paso, LogisticRegression):
+            modelo.set_params(**{f"{nombre}__n_jobs" if nombre else "n_jobs": n_jobs})
+    return modelo
+
+
+def _pico_rss_mb() -> float | None:
+    """Pico de memoria residente del proceso hasta ahora (ru_maxrss: KB en Linux, bytes en macOS)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 ** 2 if sys.platform == "darwin" else pico / 1024
+
+
+def _evaluar_candidato(nombre: str, modelo, tarea: str, X_train, y_train, X_test, y_test, n_jobs: int,
+                       medir_memoria: bool = False) -> dict:
+    """
+    Entrena y evalúa un candidato dentro de un worker, con tiempos sin tracemalloc (que los distorsiona).
+    Memoria sin reentrenar: cuánto creció el pico de RSS del worker durante fit + predict
+    (0 si el proceso ya había llegado a ese pico con un candidato anterior).
+    Con medir_memoria=True, el pico exacto de tracemalloc en una segunda pasada sobre un clon.
+    """
+    fijar_n_jobs(modelo, n_jobs)
+    rss_previo = _pico_rss_mb()
+    inicio = time.perf_counter()
+    modelo.fit(X_train, y_train)
+    fit_s = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    pred = modelo.predict(X_test)
+    predict_s = time.perf_counter() - inicio
+
+    if medir_memoria:
+        copia = clone(modelo)
+        tracemalloc.start()
+        try:
+            copia.fit(X_train, y_train).predict(X_test)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        memoria_mb = pico / 1024 ** 2
+    else:
+        rss = _pico_rss_mb()
+        memoria_mb = None if rss is None else rss - rss_previo
+
+    return {
+        "nombre": nombre,
+        "modelo": modelo,
+        "metricas": {
+            **calcular_metricas(tarea, y_test, pred),
+            "fit_s": fit_s,
+            "predict_s": predict_s,
+            "latencia_ms_1000": predict_s / max(len(X_test), 1) * 1e6,
+            "memoria_pico_mb": memoria_mb,
+        },
+    }
+
+
+class TorneoModelos:
+    """
+    Torneo de modelos candidatos:
+    - Cada candidato se entrena en su propio proceso (joblib/loky)
+    - Paralelismo anidado controlado: los modelos con n_jobs (p.ej. RandomForest)
+      reciben los núcleos restantes, sin sobre-suscribir la CPU
+    - Registra MSE/R2 o Accuracy/F1 junto a fit_s, predict_s, latencia por 1000 filas
+      y pico de memoria: crecimiento del RSS del worker (sin reentrenar) o, con
+      medir_memoria=True, tracemalloc en una pasada aparte (duplica el entrenamiento)
+    - Selección: métrica principal menos `peso_latencia` × latencia relativa al más lento
+    """
+
+    def __init__(self, tarea: str = "regresion", workers: int | None = None, peso_latencia: float = 0.0,
+                 medir_memoria: bool = False):
+        if tarea not in METRICA_PRINCIPAL:
+            raise ValueError(f"❌ Tarea no soportada: {tarea}")
+        self.tarea = tarea
+        self.workers = workers or os.cpu_count() or 1
+        self.peso_latencia = peso_latencia
+        self.medir_memoria = medir_memoria
+
+    def competir(self, modelos: dict, X_train, y_train, X_test, y_test) -> dict:
+        """Entrena todos los candidatos y retorna {nombre: {"modelo", "metricas"}} en el orden de entrada."""
+        nucleos = os.cpu_count() or 1
+        workers = max(1, min(self.workers, len(modelos)))
+        n_jobs_interno = max(1, nucleos // workers)
+
+        inicio = time.perf_counter()
+        args = [(nombre, modelo, self.tarea, X_train, y_train, X_test, y_test, n_jobs_interno, self.medir_memoria)
+                for nombre, modelo in modelos.items()]
+        if workers == 1:
+            salidas = [_evaluar_candidato(*a) for a in args]
+        else:
+            salidas = Parallel(n_jobs=workers, backend="loky")(delayed(_evaluar_candidato)(*a) for a in args)
+
+        print(f"⏱️ {len(modelos)} modelos entrenados en {time.perf_counter() - inicio:.2f} s "
+              f"({workers} proceso(s) × {n_jobs_interno} núcleo(s) por modelo)")
+        return {s["nombre"]: {"modelo": s["modelo"], "metricas": s["metricas"]} for s in salidas}
+
+    def puntajes(self, resultados: dict) -> dict:
+        """Puntaje de selección por candidato (métrica principal penalizada por latencia)."""
+        metrica = METRICA_PRINCIPAL[self.tarea]
+        latencias = np.array([r["metricas"]["predict_s"] for r in resultados.values()])
+        lenta = latencias.max() if len(latencias) and latencias.max() > 0 else 1.0
+        return {nombre: r["metricas"][metrica] - self.peso_latencia * r["metricas"]["predict_s"] / lenta
+                for nombre, r in resultados.items()}
+
+    def seleccionar(self, resultados: dict) -> tuple[str, object]:
+        """Retorna (nombre, modelo) del candidato con mayor puntaje; en empate gana el primero."""
+        puntajes = self.puntajes(resultados)
+        nombre = max(puntajes, key=lambda n: (puntajes[n], -list(puntajes).index(n)))
+        return nombre, resultados[nombre]["modelo"]
@@ -0,0 +1,123 @@
+# Clase ValidacionTemporal: validación cruzada de origen móvil con preprocesado compartido entre modelos.
+# src/modelos/ValidacionTemporal.py
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.modelos.TorneoModelos import calcular_metricas, fijar_n_jobs
+
+
+def _evaluar_fold(nombre: str, estimador, tarea: str, fold: int, X_train, y_train, X_test, y_test,
+                  n_jobs: int) -> dict:
+    """Entrena y evalúa un candidato en un fold (ya escalado si el modelo lo requiere)."""
+    fijar_n_jobs(estimador, n_jobs)
+    inicio = time.perf_counter()
+    estimador.fit(X_train, y_train)
+    fit_s = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    pred = estimador.predict(X_test)
+    predict_s = time.perf_counter() - inicio
+
+    return {"modelo": nombre, "fold": fold, "n_train": len(X_train), "n_test": len(X_test),
+            **calcular_metricas(tarea, y_test, pred), "fit_s": fit_s, "predict_s": predict_s}
+
+
+class ValidacionTemporal:
+    """
+    Validación de origen móvil (TimeSeriesSplit) para datos horarios ordenados en el tiempo:
+    - Cada fold entrena con el pasado y evalúa con el bloque siguiente (sin fuga temporal);
+      `gap` deja horas de separación y `ventana_max` limita el entrenamiento a una ventana móvil
+    - Índices de folds y StandardScaler ajustado por fold se calculan una vez y se reutilizan
+      en todos los candidatos (y en llamadas siguientes con los mismos datos)
+    - Los pares (modelo, fold) se ejecutan en paralelo
+    - Retorna métricas y tiempos por fold
+    """
+
+    def __init__(self, tarea: str = "regresion", n_folds: int = 5, gap: int = 0,
+                 ventana_max: int | None = None, workers: int | None = None):
+        self.tarea = tarea
+        self.n_folds = n_folds
+        self.gap = gap
+        self.ventana_max = ventana_max
+        self.workers = workers or os.cpu_count() or 1
+        self._cache = {}
+
+    # ===============================
+    # 1. Folds y preprocesado (en caché)
+    # ===============================
+    @staticmethod
+    def huella(X: np.ndarray) -> str:
+        return hashlib.sha1(np.ascontiguousarray(X)).hexdigest()
+
+    def preparar(self, X: np.ndarray) -> dict:
+        """
+        Retorna {"folds": [(train, test)], "escalados": [(X_train_esc, X_test_esc)], "segundos"}
+        para X, calculándolo solo la primera vez.
+        """
+        clave = (self.huella(X), X.shape, self.n_folds, self.gap, self.ventana_max)
+        if clave not in self._cache:
+            inicio = time.perf_counter()
+            divisor = TimeSeriesSplit(n_splits=self.n_folds, gap=self.gap, max_train_size=self.ventana_max)
+            folds = list(divisor.split(X))
+            escalados = []
+            for train, test in folds:
+                scaler = StandardScaler().fit(X[train])
+                escalados.append((scaler.transform(X[train]), scaler.transform(X[test])))
+            self._cache[clave] = {"folds": folds, "escalados": escalados,
+                                  "segundos": time.perf_counter() - inicio}
+        return self._cache[clave]
+
+    @staticmethod
+    def _separar_escalado(modelo) -> tuple[bool, object]:
+        """Si el modelo es Pipeline(StandardScaler por defecto, ...) retorna (True, resto del pipeline)."""
+        if isinstance(modelo, Pipeline) and len(modelo.steps) > 1:
+            primero = modelo.steps[0][1]
+            if type(primero) is StandardScaler and primero.get_params() == StandardScaler().get_params():
+                resto = modelo.steps[1:]
+                return True, clone(resto[0][1] if len(resto) == 1 else Pipeline(resto))
+        return False, clone(modelo)
+
+    # ===============================
+    # 2. Evaluación
+    # ===============================
+    def evaluar(self, modelos: dict, X, y) -> pd.DataFrame:
+        """Evalúa todos los candidatos en todos los folds y retorna una fila por (modelo, fold)."""
+        X = np.asarray(X, dtype="float64")
+        y = np.asarray(y)
+        preparado = self.preparar(X)
+        folds, escalados = preparado["folds"], preparado["escalados"]
+
+        tareas = []
+        for nombre, modelo in modelos.items():
+            escala, estimador = self._separar_escalado(modelo)
+            for i, (train, test) in enumerate(folds):
+                X_train, X_test = escalados[i] if escala else (X[train], X[test])
+                tareas.append((nombre, clone(estimador), self.tarea, i, X_train, y[train], X_test, y[test]))
+
+        workers = max(1, min(self.workers, len(tareas)))
+        n_jobs_interno = max(1, (os.cpu_count() or 1) // workers)
+        inicio = time.perf_counter()
+        if workers == 1:
+            filas = [_evaluar_fold(*t, n_jobs_interno) for t in tareas]
+        else:
+            filas = Parallel(n_jobs=workers, backend="loky")(delayed(_evaluar_fold)(*t, n_jobs_interno)
+                                                              for t in tareas)
+
+        print(f"⏱️ {len(modelos)} modelos × {len(folds)} folds en {time.perf_counter() - inicio:.2f} s "
+              f"(preprocesado compartido: {preparado['segundos']:.2f} s)")
+        return pd.DataFrame(filas)
+
+    @staticmethod
+    def resumen(por_fold: pd.DataFrame) -> pd.DataFrame:
+        """Promedio y desviación de cada métrica/tiempo por modelo (en el orden de evaluación)."""
+        columnas = [c for c in por_fold.columns if c not in ("modelo", "fold", "n_train", "n_test")]
+        return por_fold.groupby("modelo", sort=False)[columnas].agg(["mean", "std"])
@@ -1,53 +1,34 @@
 # src/modelos/test_modelo.py
-import joblib
 from pathlib import Path
 import pandas as pd
 
-# Ruta al directorio de modelos
+from src.modelos.RegistroModelos import RegistroModelos
+
+# Ruta al directorio de modelos (versión vigente del registro; si no hay, el .pkl heredado)
 project_root = Path(__file__).resolve().parents[2]
 model_dir = project_root / "models"
+registro = RegistroModelos(model_dir / "registry")
 
 
-def probar_modelo(path, ejemplo, tipo):
-    if path.exists():
-        modelo = joblib.load(path)
-
-        # Ajustar columnas automáticamente
-        if hasattr(modelo, "feature_names_in_"):
-            for col in modelo.feature_names_in_:
-                if col not in ejemplo.columns:
-                    ejemplo[col] = 0.0
-            # reordenar columnas en el mismo orden del entrenamiento
-            ejemplo = ejemplo[modelo.feature_names_in_]
-
-        pred = modelo.predict(ejemplo)
-        print(f" {tipo} → Predicción: {pred[0]}")
-    else:
-        print(f"️ No se encontró el modelo: {path.name}")
+def probar_modelo(nombre, ejemplo, tipo):
+    try:
+        modelo, meta = registro.cargar(nombre)
+    except FileNotFoundError:
+        print(f"️ No se encontró el modelo: {nombre}")
+        return
 
+    # Ajustar columnas automáticamente (faltantes en 0 y en el mismo orden del entrenamiento)
+    if meta.get("features"):
+        ejemplo = ejemplo.reindex(columns=meta["features"], fill_value=0.0)
 
-# ===========================
-# 1. Probar modelo CALIDAD DEL AIRE
-# ===========================
-modelo_calidad_aire = model_dir / "modelo_calidad_aire.pkl"
-ejemplo_calidad_aire = pd.DataFrame([{
-    "hora": 12,
-    "flujo_vehicular": 1800,
-    "temperatura": 26.0,
-    "humedad": 70,
-    "viento": 7.0,
-    "pm10": 50.0,
-    "co": 1.0,
-    "no2": 80,
-    "o3": 100
-}])
-probar_modelo(modelo_calidad_aire, ejemplo_calidad_aire, "Calidad del Aire")
+    pred = modelo.predict(ejemplo)
+    print(f" {tipo} (versión {meta.get('version') or 'heredada'}) → Predicción: {pred[0]}")
 
 
 # ===========================
-# 2. Probar REGRESIÓN (pm2_5)
+# 1. Probar REGRESIÓN (pm2_5)
 # ===========================
-modelo_regresion = model_dir / "modelo_regresion.pkl"
+modelo_regresion = "modelo_regresion"
 ejemplo_reg = pd.DataFrame([{
     "hora": 8,
     "flujo_vehicular": 1500,
@@ -63,9 +44,9 @@ probar_modelo(modelo_regresion, ejemplo_reg, "Regresión (PM2.5)")
 
 
 # ===========================
-# 3. Probar CLASIFICACIÓN (ICA)
+# 2. Probar CLASIFICACIÓN (ICA)
 # ===========================
-modelo_clasificacion = model_dir / "modelo_clasificacion.pkl"
+modelo_clasificacion = "modelo_clasificacion"
 ejemplo_clf = pd.DataFrame([{
     "hora": 5,  #Se puede cambiar la hora para ver el comportamiento por ejemplo a las 18 es mala pero a las 5 es moderada
     "flujo_vehicular": 2200,
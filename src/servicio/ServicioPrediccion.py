@@ -0,0 +1,273 @@
+# Clase ServicioPrediccion: servicio HTTP asyncio de predicciones con micro-lotes.
+# src/servicio/ServicioPrediccion.py
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.modelos.RegistroModelos import RegistroModelos, CargadorModelos
+
+SALIDAS = {"modelo_regresion": "pm2_5_pred", "modelo_clasificacion": "ica_categoria_pred"}
+
+
+class MicroLotes:
+    """
+    Agrupa solicitudes concurrentes en una sola llamada a predict por modelo:
+    - El primer pedido en cola abre una ventana de `espera_ms`; se despacha al
+      llenarse `max_filas` o al cerrar la ventana
+    - Las filas se copian a un buffer NumPy preasignado (sin DataFrames por solicitud)
+    - predict corre en un hilo aparte para no bloquear el event loop
+    - Un pedido inválido falla solo él; el resto del lote recibe su predicción
+    """
+
+    def __init__(self, cargadores: dict, max_filas: int = 512, espera_ms: float = 2.0):
+        self.cargadores = cargadores
+        self.max_filas = max_filas
+        self.espera_s = espera_ms / 1000
+        self.cola = asyncio.Queue()
+        self.features = None
+        self.indices = {}
+        self.buffer = None
+        self.lotes = 0
+        self.filas_lote = 0
+
+    def _preparar(self) -> dict:
+        """Modelos vigentes; reasigna buffer e índices de columnas solo si cambian las features."""
+        vigentes = {nombre: c.modelo() for nombre, c in self.cargadores.items()}
+        features = list(dict.fromkeys(f for _, meta in vigentes.values() for f in meta["features"]))
+        if features != self.features:
+            self.features = features
+            self.buffer = np.zeros((self.max_filas, len(features)), dtype="float64")
+            self.indices = {}
+        posicion = {f: i for i, f in enumerate(self.features)}
+        for nombre, (_, meta) in vigentes.items():
+            idx = np.array([posicion[f] for f in meta["features"]])
+            if nombre not in self.indices or not np.array_equal(idx, self.indices[nombre][1]):
+                identidad = np.array_equal(idx, np.arange(len(self.features)))
+                self.indices[nombre] = (None if identidad else idx, idx)
+        return vigentes
+
+    def _predecir(self, pedidos: list) -> list:
+        vigentes = self._preparar()
+        n, tramos = 0, []
+        for filas, _ in pedidos:
+            inicio = n
+            try:
+                for fila in filas:
+                    self.buffer[n] = [fila[f] for f in self.features]
+                    n += 1
+                tramos.append((inicio, n))
+            except KeyError as e:
+                # Features nuevas de una versión recién promovida que no se validaron al recibir
+                n = inicio
+                tramos.append(ValueError(f"Fila inválida: falta la feature {e}"))
+            except (TypeError, ValueError) as e:
+                n = inicio
+                tramos.append(ValueError(f"Fila inválida: {e}"))
+        if n == 0:
+            return tramos
+        X = self.buffer[:n]
+
+        columnas = {}
+        for nombre, (modelo, meta) in vigentes.items():
+            idx = self.indices[nombre][0]
+            # DataFrame sin copia con los nombres de entrenamiento (evita el aviso de sklearn)
+            entrada = pd.DataFrame(X if idx is None else X[:, idx], columns=meta["features"], copy=False)
+            columnas[SALIDAS.get(nombre, f"{nombre}_pred")] = modelo.predict(entrada).tolist()
+
+        respuestas = [t if isinstance(t, Exception) else {k: v[t[0]:t[1]] for k, v in columnas.items()}
+                      for t in tramos]
+        self.lotes += 1
+        self.filas_lote += n
+        return respuestas
+
+    async def predecir(self, filas: list[dict]) -> dict:
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((filas, futuro))
+        return await futuro
+
+    async def ejecutar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pedidos = [await self.cola.get()]
+            filas = len(pedidos[0][0])
+            limite = loop.time() + self.espera_s
+            while filas < self.max_filas:
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    siguiente = await asyncio.wait_for(self.cola.get(), restante)
+                except asyncio.TimeoutError:
+                    break
+                if filas + len(siguiente[0]) > self.max_filas:
+                    self.cola.put_nowait(siguiente)  # no cabe: va en el próximo lote
+                    break
+                pedidos.append(siguiente)
+                filas += len(siguiente[0])
+
+            try:
+                respuestas = await asyncio.to_thread(self._predecir, pedidos)
+                for (_, futuro), r in zip(pedidos, respuestas):
+                    if futuro.done():  # el cliente se desconectó y el pedido se canceló
+                        continue
+                    if isinstance(r, Exception):
+                        futuro.set_exception(r)
+                    else:
+                        futuro.set_result(r)
+            except Exception as e:
+                for _, futuro in pedidos:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+
+
+class ServicioPrediccion:
+    """
+    Servicio HTTP/1.1 (asyncio, sin dependencias) con los modelos vigentes del registro:
+    - POST /predecir  cuerpo: una fila {"hora": 8, ...}, una lista de filas o {"filas": [...]}
+    - GET  /metricas  solicitudes, filas, lotes, tamaño medio de lote, latencia p50/p99 y throughput
+    - GET  /salud     versiones cargadas
+    Los modelos se cargan una vez y se recargan solo al promover otra versión.
+    Solicitudes con más de `max_filas` filas se rechazan (413) para no romper el buffer.
+    """
+
+    def __init__(self, ruta_registro: str = "models/registry", modelos=tuple(SALIDAS),
+                 host: str = "127.0.0.1", puerto: int = 8000, max_filas: int = 512, espera_ms: float = 2.0):
+        registro = RegistroModelos(ruta_registro)
+        self.cargadores = {nombre: CargadorModelos(registro, nombre) for nombre in modelos}
+        self.host = host
+        self.puerto = puerto
+        self.micro = MicroLotes(self.cargadores, max_filas=max_filas, espera_ms=espera_ms)
+        self.latencias = deque(maxlen=10_000)
+        self.solicitudes = 0
+        self.filas = 0
+        self.errores = 0
+        self.inicio = time.monotonic()
+
+    # ===============================
+    # 1. Rutas
+    # ===============================
+    def _validar(self, filas: list) -> list[dict]:
+        """Features de cada fila convertidas a float; un ValueError aquí es un 400 solo para este pedido."""
+        validas = []
+        for i, fila in enumerate(filas):
+            if not isinstance(fila, dict):
+                raise ValueError(f"La fila {i} no es un objeto JSON")
+            faltantes = [f for f in self.micro.features or [] if f not in fila]
+            if faltantes:
+                # Igual que PuntuadorLotes: una feature ausente se rechaza, no se rellena con 0
+                raise ValueError(f"Fila {i}: faltan features del modelo {faltantes}")
+            convertida = {}
+            for f in self.micro.features or []:
+                try:
+                    valor = float(fila[f])
+                except (TypeError, ValueError):
+                    raise ValueError(f"Fila {i}: '{f}' debe ser numérico (recibido {fila[f]!r})") from None
+                if not math.isfinite(valor):
+                    raise ValueError(f"Fila {i}: '{f}' debe ser finito (recibido {fila[f]!r})")
+                convertida[f] = valor
+            validas.append(convertida)
+        return validas
+
+    async def _predecir(self, cuerpo: bytes) -> tuple[int, dict]:
+        inicio = time.perf_counter()
+        datos = json.loads(cuerpo or b"{}")
+        filas = datos.get("filas", [datos]) if isinstance(datos, dict) else datos
+        if not isinstance(filas, list) or not filas or len(filas) > self.micro.max_filas:
+            return 413 if isinstance(filas, list) and filas else 400, \
+                {"error": f"Se esperan entre 1 y {self.micro.max_filas} filas"}
+        filas = self._validar(filas)
+        respuesta = await self.micro.predecir(filas)
+        self.latencias.append(time.perf_counter() - inicio)
+        self.solicitudes += 1
+        self.filas += len(filas)
+        return 200, respuesta
+
+    def metricas(self) -> dict:
+        lat = np.array(self.latencias) * 1000 if self.latencias else np.zeros(1)
+        segundos = time.monotonic() - self.inicio
+        return {
+            "solicitudes": self.solicitudes,
+            "filas": self.filas,
+            "errores": self.errores,
+            "lotes": self.micro.lotes,
+            "filas_por_lote": self.micro.filas_lote / self.micro.lotes if self.micro.lotes else 0.0,
+            "latencia_p50_ms": float(np.percentile(lat, 50)),
+            "latencia_p99_ms": float(np.percentile(lat, 99)),
+            "solicitudes_por_s": self.solicitudes / segundos if segundos else 0.0,
+            "filas_por_s": self.filas / segundos if segundos else 0.0,
+        }
+
+    async def _despachar(self, metodo: str, ruta: str, cuerpo: bytes) -> tuple[int, dict]:
+        if metodo == "POST" and ruta == "/predecir":
+            return await self._predecir(cuerpo)
+        if metodo == "GET" and ruta == "/metricas":
+            return 200, self.metricas()
+        if metodo == "GET" and ruta == "/salud":
+            return 200, {nombre: c.version for nombre, c in self.cargadores.items()}
+        return 404, {"error": f"Ruta no encontrada: {metodo} {ruta}"}
+
+    # ===============================
+    # 2. HTTP
+    # ===============================
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        try:
+            while True:  # keep-alive: varias solicitudes por conexión
+                linea = await lector.readline()
+                if not linea:
+                    break
+                metodo, ruta, _ = linea.decode("latin-1").split(" ", 2)
+                cabeceras = {}
+                while (linea := await lector.readline()) not in (b"\r\n", b"\n", b""):
+                    clave, _, valor = linea.decode("latin-1").partition(":")
+                    cabeceras[clave.strip().lower()] = valor.strip()
+                cuerpo = await lector.readexactly(int(cabeceras.get("content-length", 0)))
+
+                try:
+                    estado, respuesta = await self._despachar(metodo, ruta.split("?")[0], cuerpo)
+                except Exception as e:
+                    self.errores += 1
+                    estado, respuesta = 500 if not isinstance(e, ValueError) else 400, {"error": str(e)}
+
+                datos = json.dumps(respuesta).encode("utf-8")
+                cerrar = cabeceras.get("connection", "").lower() == "close"
+                escritor.write(f"HTTP/1.1 {estado} {'OK' if estado == 200 else 'Error'}\r\n"
+                               f"Content-Type: application/json\r\nContent-Length: {len(datos)}\r\n"
+                               f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n".encode("latin-1") + datos)
+                await escritor.drain()
+                if cerrar:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            escritor.close()
+
+    async def iniciar(self):
+        self.micro._preparar()  # carga inicial (modelos y features) antes de aceptar tráfico
+        asyncio.create_task(self.micro.ejecutar())
+        servidor = await asyncio.start_server(self._atender, self.host, self.puerto)
+        print(f"✅ Servicio de predicción en http://{self.host}:{self.puerto} "
+              f"(micro-lotes de hasta {self.micro.max_filas} filas, ventana {self.micro.espera_s * 1000:g} ms)")
+        async with servidor:
+            await servidor.serve_forever()
+
+
+# ---------- Ejecutar por consola ----------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servicio HTTP de predicción con micro-lotes")
+    parser.add_argument("--registro", default="models/registry")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--max-filas", type=int, default=512)
+    parser.add_argument("--espera-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    servicio = ServicioPrediccion(args.registro, host=args.host, puerto=args.puerto,
+                                  max_filas=args.max_filas, espera_ms=args.espera_ms)
+    asyncio.run(servicio.iniciar())
@@ -0,0 +1,100 @@
+# Prueba de carga del servicio de predicción en localhost.
+# src/servicio/prueba_carga.py
+#
+# Uso (con el servicio corriendo):
+#   python -m src.servicio.ServicioPrediccion --puerto 8000
+#   python -m src.servicio.prueba_carga --puerto 8000 --concurrencia 64 --solicitudes 5000
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+
+def _fila_aleatoria(features: list[str]) -> dict:
+    fila = {f: random.uniform(0, 50) for f in features}
+    for f in ("hora", "dia", "mes"):
+        if f in fila:
+            fila[f] = random.randint(1, 23 if f == "hora" else 12 if f == "mes" else 28)
+    return fila
+
+
+async def _solicitud(lector, escritor, metodo: str, ruta: str, cuerpo: bytes = b"") -> dict:
+    escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("latin-1") + cuerpo)
+    await escritor.drain()
+    estado = (await lector.readline()).split(b" ", 2)[1]
+    largo = 0
+    while (linea := await lector.readline()) not in (b"\r\n", b""):
+        clave, _, valor = linea.decode("latin-1").partition(":")
+        if clave.strip().lower() == "content-length":
+            largo = int(valor)
+    datos = json.loads(await lector.readexactly(largo))
+    if estado != b"200":
+        raise RuntimeError(f"❌ HTTP {estado.decode()}: {datos}")
+    return datos
+
+
+async def _cliente(host: str, puerto: int, cuerpos: list[bytes], latencias: list[float]):
+    lector, escritor = await asyncio.open_connection(host, puerto)  # una conexión keep-alive por cliente
+    try:
+        for cuerpo in cuerpos:
+            inicio = time.perf_counter()
+            await _solicitud(lector, escritor, "POST", "/predecir", cuerpo)
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        escritor.close()
+
+
+async def prueba_carga(host: str = "127.0.0.1", puerto: int = 8000, concurrencia: int = 32,
+                       solicitudes: int = 2000, filas_por_solicitud: int = 1, features: list[str] | None = None) -> dict:
+    if features is None:
+        from src.modelos.ModeloML import COLUMNAS_X
+        from src.modelos.RegistroModelos import RegistroModelos
+        # Sin metadatos en el registro: las mismas features con las que entrena ModeloML
+        meta = RegistroModelos().metadatos("modelo_regresion")
+        features = meta["features"] if meta else COLUMNAS_X
+
+    cuerpos = [json.dumps({"filas": [_fila_aleatoria(features) for _ in range(filas_por_solicitud)]}).encode()
+               for _ in range(solicitudes)]
+    latencias = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(host, puerto, cuerpos[i::concurrencia], latencias)
+                           for i in range(concurrencia)))
+    segundos = time.perf_counter() - inicio
+
+    lat = np.array(latencias) * 1000
+    resultado = {
+        "solicitudes": len(latencias),
+        "segundos": segundos,
+        "solicitudes_por_s": len(latencias) / segundos,
+        "filas_por_s": len(latencias) * filas_por_solicitud / segundos,
+        "latencia_p50_ms": float(np.percentile(lat, 50)),
+        "latencia_p99_ms": float(np.percentile(lat, 99)),
+    }
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    resultado["servidor"] = await _solicitud(lector, escritor, "GET", "/metricas")
+    escritor.close()
+    return resultado
+
+
+# ---------- Ejecutar por consola ----------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de predicción")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--concurrencia", type=int, default=32)
+    parser.add_argument("--solicitudes", type=int, default=2000)
+    parser.add_argument("--filas", type=int, default=1, help="Filas por solicitud")
+    args = parser.parse_args()
+
+    r = asyncio.run(prueba_carga(args.host, args.puerto, args.concurrencia, args.solicitudes, args.filas))
+    print(f"📊 Cliente: {r['solicitudes']} solicitudes en {r['segundos']:.2f} s → "
+          f"{r['solicitudes_por_s']:,.0f} req/s, {r['filas_por_s']:,.0f} filas/s | "
+          f"p50 {r['latencia_p50_ms']:.2f} ms, p99 {r['latencia_p99_ms']:.2f} ms")
+    s = r["servidor"]
+    print(f"📊 Servidor: {s['lotes']} lotes ({s['filas_por_lote']:.1f} filas/lote) | "
+          f"p50 {s['latencia_p50_ms']:.2f} ms, p99 {s['latencia_p99_ms']:.2f} ms, errores {s['errores']}")
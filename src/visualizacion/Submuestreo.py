@@ -0,0 +1,124 @@
+# Clase Submuestreo: reduce series y nubes de puntos grandes antes de graficarlas.
+# src/visualizacion/Submuestreo.py
+import numpy as np
+import pandas as pd
+
+METODOS = ("lttb", "minmax")
+
+
+class Submuestreo:
+    """
+    Submuestreo perceptual para gráficos con millones de puntos:
+    - lttb(): Largest-Triangle-Three-Buckets; conserva la forma (picos, valles, tendencias)
+      con `presupuesto` puntos
+    - minmax(): mínimo y máximo de cada bucket (un bucket ≈ un píxel); conserva exactamente
+      la envolvente que dibujaría la serie completa
+    - linea() / densidad(): dibujan en un Axes de matplotlib respetando el presupuesto; bajo el
+      presupuesto se grafica la serie o la dispersión completas
+    Los NaN se descartan antes de submuestrear.
+    """
+
+    # ===============================
+    # 1. Series
+    # ===============================
+    @staticmethod
+    def _limpiar(x, y) -> tuple[np.ndarray, np.ndarray]:
+        x, y = np.asarray(x), np.asarray(y, dtype="float64")
+        validos = ~np.isnan(y)
+        return x[validos], y[validos]
+
+    @staticmethod
+    def _numerico(x: np.ndarray) -> np.ndarray:
+        return x.astype("int64").astype("float64") if np.issubdtype(x.dtype, np.datetime64) else x.astype("float64")
+
+    @staticmethod
+    def lttb(x, y, presupuesto: int) -> np.ndarray:
+        """Índices (sobre x/y sin NaN) de los `presupuesto` puntos elegidos por LTTB."""
+        n = len(y)
+        if presupuesto >= n or presupuesto < 3:
+            return np.arange(n)
+        xf = Submuestreo._numerico(x)
+        # Primer y último punto fijos; el resto en presupuesto-2 buckets de igual tamaño
+        bordes = np.linspace(1, n - 1, presupuesto - 1).astype("int64")
+        medias_x = np.add.reduceat(xf[1:n - 1], bordes[:-1] - 1) / np.diff(bordes)
+        medias_y = np.add.reduceat(y[1:n - 1], bordes[:-1] - 1) / np.diff(bordes)
+
+        elegidos = np.empty(presupuesto, dtype="int64")
+        elegidos[0], elegidos[-1] = 0, n - 1
+        a = 0
+        for i in range(presupuesto - 2):
+            inicio, fin = bordes[i], bordes[i + 1]
+            # Tercer vértice: promedio del bucket siguiente (o el último punto)
+            cx, cy = (medias_x[i + 1], medias_y[i + 1]) if i + 1 < presupuesto - 2 else (xf[-1], y[-1])
+            area = np.abs((xf[a] - cx) * (y[inicio:fin] - y[a]) - (xf[a] - xf[inicio:fin]) * (cy - y[a]))
+            a = inicio + int(np.argmax(area))
+            elegidos[i + 1] = a
+        return elegidos
+
+    @staticmethod
+    def minmax(y, presupuesto: int) -> np.ndarray:
+        """Índices del mínimo y máximo de cada uno de presupuesto/2 buckets, en orden."""
+        n = len(y)
+        if presupuesto >= n or presupuesto < 2:
+            return np.arange(n)
+        buckets = max(1, presupuesto // 2)
+        bordes = np.linspace(0, n, buckets + 1).astype("int64")
+        largo = np.diff(bordes)
+        # Buckets de tamaño casi constante: se rellenan con NaN para vectorizar argmin/argmax
+        ancho = int(largo.max())
+        matriz = np.full((buckets, ancho), np.nan)
+        filas = np.repeat(np.arange(buckets), largo)
+        columnas = np.arange(n) - np.repeat(bordes[:-1], largo)
+        matriz[filas, columnas] = y
+        indices = np.concatenate([bordes[:-1] + np.nanargmin(matriz, axis=1),
+                                  bordes[:-1] + np.nanargmax(matriz, axis=1)])
+        return np.unique(indices)
+
+    @staticmethod
+    def reducir(serie: pd.Series, presupuesto: int = 2000, metodo: str = "lttb") -> pd.Series:
+        """Serie con a lo sumo `presupuesto` puntos (índice = eje x)."""
+        if metodo not in METODOS:
+            raise ValueError(f"❌ Método de submuestreo no soportado: {metodo}")
+        serie = serie.dropna()
+        if len(serie) <= presupuesto:
+            return serie
+        x, y = serie.index.to_numpy(), serie.to_numpy(dtype="float64")
+        indices = Submuestreo.lttb(x, y, presupuesto) if metodo == "lttb" else Submuestreo.minmax(y, presupuesto)
+        return serie.iloc[indices]
+
+    # ===============================
+    # 2. Dibujo
+    # ===============================
+    @staticmethod
+    def linea(ax, serie: pd.Series, presupuesto: int = 2000, metodo: str = "lttb", **kwargs):
+        """Grafica la serie reducida; anota cuántos puntos se dibujaron si hubo submuestreo."""
+        reducida = Submuestreo.reducir(serie, presupuesto, metodo)
+        ax.plot(reducida.index, reducida.to_numpy(), **kwargs)
+        total = int(serie.notna().sum())
+        if len(reducida) < total:
+            ax.annotate(f"{len(reducida):,} de {total:,} puntos ({metodo})", xy=(1, 0), xycoords="axes fraction",
+                        ha="right", va="bottom", fontsize=8, color="gray")
+        return reducida
+
+    @staticmethod
+    def densidad(ax, x, y, presupuesto: int = 5000, tipo: str = "hexbin", **kwargs):
+        """
+        Dispersión completa si hay a lo sumo `presupuesto` pares; si no, densidad
+        (hexbin o histograma 2-D, escala logarítmica) con ~presupuesto celdas.
+        """
+        x, y = np.asarray(x, dtype="float64"), np.asarray(y, dtype="float64")
+        validos = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[validos], y[validos]
+        if len(x) <= presupuesto:
+            return ax.scatter(x, y, alpha=kwargs.pop("alpha", 0.6), **kwargs)
+
+        celdas = max(10, int(np.sqrt(presupuesto)))
+        if tipo == "hexbin":
+            malla = ax.hexbin(x, y, gridsize=celdas, bins="log", mincnt=1, cmap=kwargs.pop("cmap", "viridis"), **kwargs)
+        elif tipo == "hist2d":
+            from matplotlib.colors import LogNorm
+            malla = ax.hist2d(x, y, bins=celdas, norm=LogNorm(), cmap=kwargs.pop("cmap", "viridis"), **kwargs)[3]
+        else:
+            raise ValueError(f"❌ Tipo de densidad no soportado: {tipo}")
+        ax.figure.colorbar(malla, ax=ax, label="Puntos por celda")
+        return malla
@@ -4,18 +4,56 @@ import seaborn as sns
 import streamlit as st
 import pandas as pd
 
+from src.datos.CubosAgregados import CubosAgregados
+from src.datos.UnificadorDatos import UnificadorDatos
+from src.visualizacion.Submuestreo import Submuestreo
+
+
+@st.cache_resource(show_spinner="Unificando datasets...", max_entries=4)
+def tabla_unificada(_df_flujo, _df_cont, _df_clima, version: str) -> pd.DataFrame:
+    """
+    Tabla alineada por (fecha, hora[, ubicacion]) con UnificadorDatos: cada fila de flujo recibe
+    a lo sumo una fila de contaminantes y de clima, sin productos cartesianos por día.
+    Se construye una vez por `version` de datos y se comparte (sin copias) entre gráficos y páginas;
+    quien la use no debe modificarla.
+    """
+    return UnificadorDatos().unificar(_df_flujo, _df_cont, _df_clima)
+
+
 class Visualizador:
-    def __init__(self, df_cont, df_flujo, df_clima):
+    def __init__(self, df_cont, df_flujo, df_clima, cubos: dict | None = None, presupuesto_puntos: int = 5000,
+                 version: str | None = None):
         self.df_cont = df_cont
         self.df_flujo = df_flujo
         self.df_clima = df_clima
+        # Versión de los datos (p. ej. huellas de AlmacenDatos) para la caché de la tabla unificada;
+        # sin ella se usa un hash del contenido
+        self.version = version
+        # Dispersiones con más pares que esto se dibujan como densidad (hexbin)
+        self.presupuesto_puntos = presupuesto_puntos
+        # {"contaminantes"/"flujo_vehicular"/"clima": CubosAgregados}; los que falten se
+        # calculan en memoria desde el DataFrame la primera vez que se necesitan
+        self.cubos = dict(cubos or {})
+
+    def _cubos(self, nombre) -> CubosAgregados:
+        if nombre not in self.cubos:
+            df = {"contaminantes": self.df_cont, "flujo_vehicular": self.df_flujo, "clima": self.df_clima}[nombre]
+            self.cubos[nombre] = CubosAgregados.desde_dataframe(df, nombre)
+        return self.cubos[nombre]
+
+    def unificada(self) -> pd.DataFrame:
+        if self.version is None:
+            self.version = "|".join(str(pd.util.hash_pandas_object(df, index=False).sum())
+                                    for df in (self.df_flujo, self.df_cont, self.df_clima))
+        return tabla_unificada(self.df_flujo, self.df_cont, self.df_clima, self.version)
 
     # ==============================
     # 1. PM2.5 promedio por hora del día
     # ==============================
     def consumo_hora_dia(self):
         if "hora" in self.df_cont.columns and "pm2_5" in self.df_cont.columns:
-            promedio = self.df_cont.groupby("hora")["pm2_5"].mean()
+            promedio = (self._cubos("contaminantes").consulta("hora_dia", ["pm2_5"])
+                        .set_index("periodo")["mean"].rename_axis("hora"))
             fig, ax = plt.subplots(figsize=(10, 6))
             promedio.plot(kind="bar", ax=ax, color="skyblue")
             ax.set_title("Promedio de PM2.5 por hora del día")
@@ -28,12 +66,10 @@ class Visualizador:
     # ==============================
     def demanda_condiciones(self):
         if "temperatura" in self.df_clima.columns and "pm2_5" in self.df_cont.columns:
+            # Pares de la misma hora (y ubicación), no de la misma posición en cada tabla
+            pares = self.unificada()[["temperatura", "pm2_5"]].dropna()
             fig, ax = plt.subplots(figsize=(8, 6))
-            sns.scatterplot(
-                x=self.df_clima["temperatura"],
-                y=self.df_cont["pm2_5"],
-                alpha=0.6, ax=ax
-            )
+            Submuestreo.densidad(ax, pares["temperatura"], pares["pm2_5"], self.presupuesto_puntos)
             ax.set_title("Relación entre Temperatura y PM2.5")
             ax.set_xlabel("Temperatura (°C)")
             ax.set_ylabel("PM2.5 (µg/m³)")
@@ -44,9 +80,7 @@ class Visualizador:
     # ==============================
     def correlaciones_clima(self):
         try:
-            df = self.df_cont.merge(self.df_flujo, on="fecha", how="inner").merge(
-                self.df_clima, on="fecha", how="inner"
-            )
+            df = self.unificada()
             num_cols = df.select_dtypes(include="number").columns
             fig, ax = plt.subplots(figsize=(12, 8))
             sns.heatmap(df[num_cols].corr(), annot=False, cmap="viridis", ax=ax)
@@ -60,7 +94,9 @@ class Visualizador:
     # ==============================
     def flujo_por_ubicacion(self):
         if "ubicacion" in self.df_flujo.columns and "flujo_vehicular" in self.df_flujo.columns:
-            promedio_ubicacion = self.df_flujo.groupby("ubicacion")["flujo_vehicular"].mean()
+            promedio_ubicacion = (self._cubos("flujo_vehicular")
+                                  .consulta(None, ["flujo_vehicular"], por_ubicacion=True)
+                                  .set_index("ubicacion")["mean"])
 
             fig, ax = plt.subplots(figsize=(8, 6))
             promedio_ubicacion.sort_values().plot(kind="barh", ax=ax, color="salmon")
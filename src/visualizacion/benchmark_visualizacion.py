@@ -0,0 +1,80 @@
+# src/visualizacion/benchmark_visualizacion.py
+# Compara las uniones que hacía Visualizador (merge solo por fecha para correlaciones y
+# emparejamiento por posición para la dispersión) contra la tabla unificada alineada por
+# (fecha, hora, ubicacion) que ahora comparten todos los gráficos.
+#
+# Uso: python -m src.visualizacion.benchmark_visualizacion --dias 30 --estaciones 3
+import argparse
+import time
+
+import pandas as pd
+
+from src.datos.UnificadorDatos import UnificadorDatos
+from src.datos.benchmark_unificacion import generar_datos, medir
+
+
+# ---------- Datos sintéticos ----------
+def recortar(datos: dict, dias: int) -> dict:
+    """Primeros `dias` días del dataset sintético de benchmark_unificacion."""
+    limite = pd.Timestamp("2022-01-01") + pd.Timedelta(days=dias)
+    return {"flujo": datos["flujo"][datos["flujo"]["fecha"] < limite],
+            "cont": datos["cont"][datos["cont"]["fecha"] < limite],
+            "clima": datos["clima"][datos["clima"]["fecha"] < limite]}
+
+
+def filas_merge_por_fecha(datos: dict) -> int:
+    """Filas que produciría el merge solo por fecha (producto de filas por día)."""
+    conteos = [datos[n].groupby("fecha").size() for n in ("cont", "flujo", "clima")]
+    return int((conteos[0] * conteos[1] * conteos[2]).sum())
+
+
+# ---------- Caminos a comparar ----------
+def graficos_anterior(datos: dict) -> dict:
+    """Réplica de demanda_condiciones + correlaciones_clima antes de la tabla unificada."""
+    pares = pd.concat([datos["clima"]["temperatura"], datos["cont"]["pm2_5"]], axis=1).dropna()
+    df = datos["cont"].merge(datos["flujo"], on="fecha", how="inner").merge(datos["clima"], on="fecha", how="inner")
+    return {"pares": pares, "correlacion": df.select_dtypes(include="number").corr(), "filas": len(df)}
+
+
+def graficos_nuevo(datos: dict, unificada: pd.DataFrame | None = None) -> dict:
+    """Ambos gráficos desde una sola tabla unificada (la caché de Visualizador la reutiliza)."""
+    if unificada is None:
+        unificada = UnificadorDatos().unificar(datos["flujo"], datos["cont"], datos["clima"])
+    return {"pares": unificada[["temperatura", "pm2_5"]].dropna(),
+            "correlacion": unificada.select_dtypes(include="number").corr(), "filas": len(unificada)}
+
+
+def pares_correctos(datos: dict, pares: pd.DataFrame) -> str:
+    """Pares (temperatura, pm2_5) de la misma hora, sobre el total de lecturas de pm2_5."""
+    marca_clima = UnificadorDatos.marca_temporal(datos["clima"]).reindex(pares.index)
+    marca_cont = UnificadorDatos.marca_temporal(datos["cont"]).reindex(pares.index)
+    return f"{int((marca_clima == marca_cont).sum()):,} de {int(datos['cont']['pm2_5'].notna().sum()):,}"
+
+
+# ---------- Ejecutar por consola ----------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de uniones de Visualizador")
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--estaciones", type=int, default=3)
+    parser.add_argument("--solo-nuevo", action="store_true", help="Omitir el camino anterior (datasets grandes)")
+    args = parser.parse_args()
+
+    datos = recortar(generar_datos(-(-args.dias // 365), args.estaciones), args.dias)
+    print(f"Filas base: flujo={len(datos['flujo']):,} cont={len(datos['cont']):,} clima={len(datos['clima']):,}")
+    print(f"Merge solo por fecha: {filas_merge_por_fecha(datos):,} filas")
+
+    if not args.solo_nuevo:
+        resultado, segundos, pico_mb = medir(graficos_anterior, datos)
+        print(f"{'anterior':>22}: {resultado['filas']:>12,} filas | {segundos:8.2f} s | pico {pico_mb:10.1f} MB"
+              f" | pares correctos {pares_correctos(datos, resultado['pares'])}")
+        del resultado
+
+    resultado, segundos, pico_mb = medir(graficos_nuevo, datos)
+    print(f"{'tabla unificada':>22}: {resultado['filas']:>12,} filas | {segundos:8.2f} s | pico {pico_mb:10.1f} MB"
+          f" | pares {len(resultado['pares']):,}")
+
+    # Con la tabla ya en caché, cada gráfico solo selecciona columnas
+    unificada = UnificadorDatos().unificar(datos["flujo"], datos["cont"], datos["clima"])
+    inicio = time.perf_counter()
+    resultado = graficos_nuevo(datos, unificada)
+    print(f"{'tabla en caché':>22}: {resultado['filas']:>12,} filas | {time.perf_counter() - inicio:8.2f} s")
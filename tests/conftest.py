@@ -0,0 +1,88 @@
+# tests/conftest.py
+# Servidor HTTP local que imita las APIs de Open-Meteo para probar DescargadorAPI/ClienteAPI sin red.
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class ServidorStub:
+    """
+    Estado del servidor de prueba:
+    - `fallos`: códigos HTTP a responder (en orden) antes de contestar bien
+    - `retry_after`: cabecera Retry-After de las respuestas 429
+    - `demora`: segundos que tarda cada respuesta (para medir concurrencia)
+    - `solicitudes`: (instante, parámetros) de cada solicitud recibida
+    - `max_simultaneas`: máximo de solicitudes atendidas a la vez
+    """
+
+    def __init__(self):
+        self.fallos = []
+        self.retry_after = None
+        self.demora = 0.0
+        self.solicitudes = []
+        self.activas = 0
+        self.max_simultaneas = 0
+        self.lock = threading.Lock()
+        self.url = None
+
+    @staticmethod
+    def respuesta(params: dict):
+        """Datos horarios del rango pedido; una lista si se piden varias coordenadas."""
+        inicio = datetime.fromisoformat(params["start_date"])
+        fin = datetime.fromisoformat(params["end_date"]) + timedelta(days=1)
+        horas = [(inicio + timedelta(hours=h)).strftime("%Y-%m-%dT%H:%M")
+                 for h in range(int((fin - inicio).total_seconds() // 3600))]
+        variables = params["hourly"].split(",")
+        latitudes = params["latitude"].split(",")
+        cuerpos = [{"latitude": float(lat),
+                    "hourly": {"time": horas, **{v: [float(i)] * len(horas) for i, v in enumerate(variables)}}}
+                   for lat in latitudes]
+        return cuerpos if len(cuerpos) > 1 else cuerpos[0]
+
+
+@pytest.fixture
+def servidor():
+    estado = ServidorStub()
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            with estado.lock:
+                estado.solicitudes.append((time.monotonic(), params))
+                estado.activas += 1
+                estado.max_simultaneas = max(estado.max_simultaneas, estado.activas)
+                codigo = estado.fallos.pop(0) if estado.fallos else 200
+            try:
+                if estado.demora:
+                    time.sleep(estado.demora)
+                cuerpo = json.dumps(estado.respuesta(params) if codigo == 200 else {"error": True}).encode()
+                self.send_response(codigo)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                if codigo == 429 and estado.retry_after is not None:
+                    self.send_header("Retry-After", estado.retry_after)
+                self.end_headers()
+                self.wfile.write(cuerpo)
+            finally:
+                with estado.lock:
+                    estado.activas -= 1
+
+        def log_message(self, *args):
+            pass
+
+    http = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    hilo = threading.Thread(target=http.serve_forever, daemon=True)
+    hilo.start()
+    estado.url = f"http://127.0.0.1:{http.server_address[1]}"
+    yield estado
+    http.shutdown()
+    http.server_close()
@@ -0,0 +1,156 @@
+# tests/test_descargador_api.py
+# DescargadorAPI y ClienteAPI contra el servidor local de conftest.py (sin red).
+import time
+
+import pytest
+import requests
+
+from src.api.ClienteAPI import ClienteAPI
+from src.api.DescargadorAPI import DescargadorAPI
+
+
+def _descargador(tmp_path, **kwargs) -> DescargadorAPI:
+    opciones = {"workers": 4, "dias_por_bloque": 31, "solicitudes_por_segundo": 0,
+                "espera_base": 0.01, "ruta_cache": tmp_path / "cache"}
+    return DescargadorAPI(**{**opciones, **kwargs})
+
+
+def _cliente(tmp_path, servidor, descargador) -> ClienteAPI:
+    return ClienteAPI(base_dir=tmp_path / "processed", descargador=descargador,
+                      url_air_quality=f"{servidor.url}/v1/air-quality", url_archivo=f"{servidor.url}/v1/archive")
+
+
+# ===============================
+# 1. División en bloques
+# ===============================
+def test_dividir_rango_cubre_el_rango_sin_huecos():
+    bloques = DescargadorAPI.dividir_rango("2024-01-01", "2024-03-15", 31)
+    assert bloques == [("2024-01-01", "2024-01-31"), ("2024-02-01", "2024-03-02"), ("2024-03-03", "2024-03-15")]
+    assert DescargadorAPI.dividir_rango("2024-01-01", "2024-01-01", 31) == [("2024-01-01", "2024-01-01")]
+
+
+def test_descarga_por_bloques_une_las_respuestas(tmp_path, servidor):
+    cliente = _cliente(tmp_path, servidor, _descargador(tmp_path))
+    df = cliente.descargar_air_quality("2024-01-01", "2024-03-15")
+
+    rangos = sorted((p["start_date"], p["end_date"]) for _, p in servidor.solicitudes)
+    assert rangos == DescargadorAPI.dividir_rango("2024-01-01", "2024-03-15", 31)
+    assert len(df) == 75 * 24 and df["time"].is_monotonic_increasing and df["time"].is_unique
+
+
+def test_estaciones_en_solicitudes_multicoordenada(tmp_path, servidor):
+    cliente = _cliente(tmp_path, servidor, _descargador(tmp_path))
+    estaciones = ["san pedro", "zapote", "ruta 27"]
+    df = cliente.descargar_clima_historico_estaciones("2024-01-01", "2024-02-10", estaciones, tamano_lote=2)
+
+    # 2 lotes de coordenadas × 2 bloques de fechas
+    assert len(servidor.solicitudes) == 4
+    assert sorted(len(p["latitude"].split(",")) for _, p in servidor.solicitudes) == [1, 1, 2, 2]
+    assert set(df["ubicacion"]) == set(estaciones)
+    assert (df.groupby("ubicacion", observed=True).size() == 41 * 24).all()
+
+
+# ===============================
+# 2. Reintentos
+# ===============================
+@pytest.mark.parametrize("fallos", [[503], [500, 502, 504], [429, 429]])
+def test_reintenta_errores_transitorios(tmp_path, servidor, fallos):
+    servidor.fallos = list(fallos)
+    servidor.retry_after = "0"
+    datos = _descargador(tmp_path).obtener_json(f"{servidor.url}/v1/archive", {
+        "latitude": "9.9", "longitude": "-84.0", "hourly": "temperature_2m",
+        "start_date": "2024-01-01", "end_date": "2024-01-01"})
+
+    assert len(servidor.solicitudes) == len(fallos) + 1
+    assert len(datos["hourly"]["time"]) == 24
+
+
+def test_backoff_exponencial_y_retry_after(tmp_path, servidor, monkeypatch):
+    esperas = []
+    monkeypatch.setattr("src.api.DescargadorAPI.time.sleep", esperas.append)
+    monkeypatch.setattr("src.api.DescargadorAPI.random.uniform", lambda a, b: 0.0)
+    servidor.fallos = [503, 503, 503, 429]
+    servidor.retry_after = "7"
+    _descargador(tmp_path, espera_base=1.0).obtener_json(f"{servidor.url}/v1/archive", {
+        "latitude": "9.9", "longitude": "-84.0", "hourly": "temperature_2m",
+        "start_date": "2024-01-01", "end_date": "2024-01-01"})
+
+    assert esperas == [1.0, 2.0, 4.0, 7.0]
+
+
+def test_se_rinde_tras_agotar_reintentos(tmp_path, servidor):
+    servidor.fallos = [500] * 10
+    with pytest.raises(requests.HTTPError):
+        _descargador(tmp_path, reintentos=2).obtener_json(f"{servidor.url}/v1/archive", {
+            "latitude": "9.9", "longitude": "-84.0", "hourly": "temperature_2m",
+            "start_date": "2024-01-01", "end_date": "2024-01-01"})
+    assert len(servidor.solicitudes) == 3
+
+
+def test_errores_no_transitorios_no_se_reintentan(tmp_path, servidor):
+    servidor.fallos = [404]
+    with pytest.raises(requests.HTTPError):
+        _descargador(tmp_path).obtener_json(f"{servidor.url}/v1/archive", {
+            "latitude": "9.9", "longitude": "-84.0", "hourly": "temperature_2m",
+            "start_date": "2024-01-01", "end_date": "2024-01-01"})
+    assert len(servidor.solicitudes) == 1
+
+
+# ===============================
+# 3. Caché
+# ===============================
+def test_cache_evita_la_red(tmp_path, servidor):
+    primera = _cliente(tmp_path, servidor, _descargador(tmp_path)).descargar_air_quality("2024-01-01", "2024-03-15")
+    solicitudes = len(servidor.solicitudes)
+
+    # Otro descargador (otra ejecución) con la misma carpeta de caché
+    segunda = _cliente(tmp_path, servidor, _descargador(tmp_path)).descargar_air_quality("2024-01-01", "2024-03-15")
+    assert len(servidor.solicitudes) == solicitudes == 3
+    assert primera.equals(segunda)
+
+    # Otros parámetros → otra clave de caché
+    _cliente(tmp_path, servidor, _descargador(tmp_path)).descargar_clima_historico("2024-01-01", "2024-01-10")
+    assert len(servidor.solicitudes) == 4
+
+
+def test_rangos_hasta_hoy_no_se_cachean(tmp_path, servidor):
+    from datetime import date, timedelta
+    hoy = date.today()
+    descargador = _descargador(tmp_path)
+    params = {"latitude": "9.9", "longitude": "-84.0", "hourly": "temperature_2m",
+              "start_date": (hoy - timedelta(days=1)).isoformat(), "end_date": hoy.isoformat()}
+    descargador.obtener_json(f"{servidor.url}/v1/archive", params)
+    descargador.obtener_json(f"{servidor.url}/v1/archive", params)
+    assert len(servidor.solicitudes) == 2
+
+
+# ===============================
+# 4. Concurrencia y límite de tasa
+# ===============================
+def test_concurrencia_acotada_por_workers(tmp_path, servidor):
+    servidor.demora = 0.1
+    cliente = _cliente(tmp_path, servidor, _descargador(tmp_path, workers=2, dias_por_bloque=5))
+    cliente.descargar_air_quality("2024-01-01", "2024-01-30")
+
+    assert len(servidor.solicitudes) == 6
+    assert servidor.max_simultaneas == 2
+
+
+def test_limite_de_tasa_global(tmp_path, servidor):
+    descargador = _descargador(tmp_path, workers=4, dias_por_bloque=5, solicitudes_por_segundo=20)
+    # Instante en que cada hilo envía (tras esperar turno): la llegada al servidor suma la
+    # latencia de conexión, que varía entre solicitudes y no depende del límite de tasa
+    instantes, get = [], descargador.session.get
+
+    def get_medido(*args, **kwargs):
+        instantes.append(time.monotonic())
+        return get(*args, **kwargs)
+
+    descargador.session.get = get_medido
+    _cliente(tmp_path, servidor, descargador).descargar_air_quality("2024-01-01", "2024-01-30")
+
+    assert len(servidor.solicitudes) == 6
+    instantes.sort()
+    # 6 solicitudes a 20/s: al menos 5 intervalos de 50 ms aunque haya 4 hilos
+    assert instantes[-1] - instantes[0] >= 5 * 0.05 * 0.9
+    assert min(b - a for a, b in zip(instantes, instantes[1:])) >= 0.05 * 0.5
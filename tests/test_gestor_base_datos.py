@@ -0,0 +1,187 @@
+# tests/test_gestor_base_datos.py
+# GestorBaseDatos y PoolConexiones contra SQLite en memoria (sustituto local de SQL Server).
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.basedatos.BackendsBaseDatos import BackendSQLite, TABLA_UBICACIONES
+from src.basedatos.GestorBaseDatos import GestorBaseDatos
+from src.basedatos.PoolConexiones import PoolConexiones
+
+
+def _datos(dias: int = 2, ubicaciones=("san pedro", "zapote", "la sabana")) -> pd.DataFrame:
+    horas = pd.date_range("2024-01-01", periods=dias * 24, freq="h")
+    df = pd.DataFrame([(t.normalize(), t.hour, u) for t in horas for u in ubicaciones],
+                      columns=["fecha", "hora", "ubicacion"])
+    df["pm2_5"] = np.arange(len(df), dtype="float64") / 10
+    df.loc[::7, "pm2_5"] = np.nan
+    return df
+
+
+@pytest.fixture
+def gestor():
+    gestor = GestorBaseDatos(backend=BackendSQLite(":memory:"))
+    gestor.conectar()
+    yield gestor
+    gestor.cerrar()
+
+
+def _bloques(df: pd.DataFrame, tamano: int):
+    for inicio in range(0, len(df), tamano):
+        yield df.iloc[inicio:inicio + tamano]
+
+
+# ===============================
+# 1. Inserción por bloques
+# ===============================
+def test_insertar_desde_generador_por_lotes(gestor):
+    df = _datos()
+    gestor.crear_tabla_desde_dataframe(df, "Contaminantes")
+    insertadas = gestor.insertar_dataframe(_bloques(df, 50), "Contaminantes", tamano_lote=20, progreso=False)
+
+    assert insertadas == len(df)
+    leido = gestor.consultar("SELECT fecha, hora, ubicacion, pm2_5 FROM Contaminantes_v ORDER BY id")
+    assert len(leido) == len(df)
+    assert leido["pm2_5"].isna().sum() == df["pm2_5"].isna().sum()
+    assert np.allclose(leido["pm2_5"].fillna(-1), df["pm2_5"].fillna(-1))
+    assert (pd.to_datetime(leido["fecha"]) == df["fecha"]).all()
+
+
+def test_ubicaciones_se_guardan_como_id_en_el_diccionario(gestor):
+    df = _datos(dias=1)
+    gestor.crear_tabla_desde_dataframe(df, "Contaminantes")
+    gestor.insertar_dataframe(df, "Contaminantes", progreso=False)
+    # Un segundo dataset reutiliza los ids existentes y solo agrega los nombres nuevos
+    otro = _datos(dias=1, ubicaciones=("zapote", "ruta 27"))
+    gestor.crear_tabla_desde_dataframe(otro, "Clima")
+    gestor.insertar_dataframe(otro, "Clima", progreso=False)
+
+    diccionario = gestor.consultar(f"SELECT nombre, id FROM {TABLA_UBICACIONES}")
+    assert sorted(diccionario["nombre"]) == ["la sabana", "ruta 27", "san pedro", "zapote"]
+    assert diccionario["id"].is_unique
+
+    columnas = gestor.consultar("SELECT * FROM Contaminantes WHERE 1 = 0").columns
+    assert "ubicacion_id" in columnas and "ubicacion" not in columnas
+    por_id = gestor.consultar("SELECT DISTINCT ubicacion_id FROM Clima")["ubicacion_id"]
+    ids = dict(zip(diccionario["nombre"], diccionario["id"]))
+    assert set(por_id) == {ids["zapote"], ids["ruta 27"]}
+    vista = gestor.consultar("SELECT ubicacion, COUNT(*) AS n FROM Contaminantes_v GROUP BY ubicacion")
+    assert dict(zip(vista["ubicacion"], vista["n"])) == {"san pedro": 24, "zapote": 24, "la sabana": 24}
+
+
+# ===============================
+# 2. Marca de agua
+# ===============================
+def test_marca_agua_ultima_fecha_y_hora(gestor):
+    df = _datos(dias=2)
+    gestor.crear_tabla_desde_dataframe(df, "Contaminantes")
+    assert gestor.marca_agua("Contaminantes") is None
+
+    gestor.insertar_dataframe(df[df["fecha"] == "2024-01-01"], "Contaminantes", progreso=False)
+    assert gestor.marca_agua("Contaminantes") == pd.Timestamp("2024-01-01 23:00")
+
+    gestor.insertar_dataframe(df[(df["fecha"] == "2024-01-02") & (df["hora"] <= 5)], "Contaminantes",
+                              progreso=False)
+    assert gestor.marca_agua("Contaminantes") == pd.Timestamp("2024-01-02 05:00")
+
+
+def test_marca_agua_sin_conexion():
+    gestor = GestorBaseDatos(backend=BackendSQLite(":memory:"))
+    assert gestor.marca_agua("Contaminantes") is None
+
+
+def test_vaciar_tabla_conserva_esquema(gestor):
+    df = _datos(dias=1)
+    gestor.crear_tabla_desde_dataframe(df, "TablaUnificada")
+    gestor.insertar_dataframe(df, "TablaUnificada", progreso=False)
+    gestor.vaciar_tabla("TablaUnificada")
+
+    assert gestor.consultar("SELECT COUNT(*) AS n FROM TablaUnificada")["n"][0] == 0
+    assert gestor.marca_agua("TablaUnificada") is None
+
+
+# ===============================
+# 3. Lectura por bloques
+# ===============================
+def test_consultar_por_bloques_con_categorias_fijas(gestor):
+    df = _datos(dias=2)
+    gestor.crear_tabla_desde_dataframe(df, "Contaminantes")
+    gestor.insertar_dataframe(df, "Contaminantes", progreso=False)
+
+    # Bloques de una sola hora: cada uno trae ubicaciones en otro orden que el diccionario
+    bloques = list(gestor.consultar_por_bloques(
+        "SELECT fecha, hora, ubicacion, pm2_5 FROM Contaminantes_v WHERE ubicacion <> ? ORDER BY id",
+        params=("la sabana",), tamano_bloque=5))
+    assert len(bloques) > 1
+    categorias = [list(b["ubicacion"].cat.categories) for b in bloques]
+    assert all(c == ["la sabana", "san pedro", "zapote"] for c in categorias)
+
+    unido = pd.concat(bloques, ignore_index=True)
+    assert isinstance(unido["ubicacion"].dtype, pd.CategoricalDtype)
+    assert len(unido) == 2 * 24 * 2
+    assert str(unido["hora"].dtype) == "int8" and str(unido["pm2_5"].dtype) == "float32"
+
+
+def test_consultar_por_bloques_formato_arrow(gestor):
+    df = _datos(dias=1)
+    gestor.crear_tabla_desde_dataframe(df, "Contaminantes")
+    gestor.insertar_dataframe(df, "Contaminantes", progreso=False)
+
+    lotes = list(gestor.consultar_por_bloques("SELECT * FROM Contaminantes_v", tamano_bloque=30, formato="arrow"))
+    assert sum(lote.num_rows for lote in lotes) == len(df)
+    assert len({lote.schema.field("ubicacion").type for lote in lotes}) == 1
+
+
+# ===============================
+# 4. Pool de conexiones
+# ===============================
+def test_memoria_compartida_entre_conexiones_del_pool():
+    backend = BackendSQLite(":memory:")
+    pool = PoolConexiones(backend, tamano=2)
+    with pool.conexion() as a, pool.conexion() as b:
+        assert a is not b
+        a.execute("CREATE TABLE t (x INTEGER)")
+        a.execute("INSERT INTO t VALUES (1)")
+        a.commit()
+        assert b.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+
+    # Cada backend ":memory:" es una base distinta
+    assert BackendSQLite(":memory:").clave() != backend.clave()
+
+
+def test_gestores_del_mismo_backend_comparten_datos_y_pool(gestor):
+    otro = GestorBaseDatos(backend=gestor.backend)
+    otro.conectar()
+    try:
+        assert otro.pool is gestor.pool
+        df = _datos(dias=1)
+        gestor.crear_tabla_desde_dataframe(df, "Contaminantes")
+        gestor.insertar_dataframe(df, "Contaminantes", progreso=False)
+        assert otro.consultar("SELECT COUNT(*) AS n FROM Contaminantes")["n"][0] == len(df)
+        assert gestor.metricas_pool()["en_uso"] == 2
+    finally:
+        otro.cerrar()
+
+
+def test_pool_compartido_avisa_opciones_distintas(capsys):
+    backend = BackendSQLite(":memory:")
+    pool = PoolConexiones.compartido(backend, tamano=3, timeout=5)
+    capsys.readouterr()
+
+    assert PoolConexiones.compartido(backend, tamano=3, timeout=5) is pool
+    assert "⚠️" not in capsys.readouterr().out
+
+    assert PoolConexiones.compartido(backend, tamano=8) is pool
+    salida = capsys.readouterr().out
+    assert "⚠️" in salida and "tamaño 8" in salida
+    assert pool.tamano == 3
+
+
+def test_pool_espera_y_agota_timeout():
+    pool = PoolConexiones(BackendSQLite(":memory:"), tamano=1, timeout=0.05)
+    conn = pool.obtener()
+    with pytest.raises(TimeoutError):
+        pool.obtener()
+    pool.devolver(conn)
+    assert pool.obtener() is conn
+    assert pool.metricas()["abiertas"] == 1
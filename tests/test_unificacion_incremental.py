@@ -0,0 +1,96 @@
+# tests/test_unificacion_incremental.py
+# UnificacionIncremental: varias ejecuciones con filas anexadas dan la misma tabla que unificar() completo.
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.datos.GestorDatos import GestorDatos
+from src.datos.UnificacionIncremental import UnificacionIncremental
+
+RAW = Path(__file__).resolve().parents[1] / "data" / "raw"
+FUENTES = UnificacionIncremental.FUENTES
+CLAVES = ["fecha", "hora", "ubicacion"]
+
+
+def _lineas(fuente: str) -> list[str]:
+    with open(RAW / f"{fuente}.csv", encoding="utf-8") as f:
+        return f.readlines()
+
+
+def _ordenada(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["ubicacion"] = df["ubicacion"].astype(str)
+    return df.sort_values(CLAVES, kind="stable").reset_index(drop=True)
+
+
+@pytest.fixture
+def completa(tmp_path) -> pd.DataFrame:
+    """TablaUnificada de una sola ejecución completa sobre data/raw."""
+    raw = tmp_path / "completo" / "raw"
+    raw.mkdir(parents=True)
+    for fuente in FUENTES:
+        (raw / f"{fuente}.csv").write_text("".join(_lineas(fuente)), encoding="utf-8")
+    gd = GestorDatos(ruta_raw=str(raw), ruta_processed=str(tmp_path / "completo" / "processed"))
+    return gd.unificar(incluir_api=False)
+
+
+def test_anexar_en_varias_ejecuciones_equivale_a_unificar_completo(tmp_path, completa):
+    raw = tmp_path / "incremental" / "raw"
+    raw.mkdir(parents=True)
+    gd = GestorDatos(ruta_raw=str(raw), ruta_processed=str(tmp_path / "incremental" / "processed"))
+
+    # Tres entregas; el clima llega atrasado para que queden filas pendientes entre ejecuciones
+    cortes = {"flujo_vehicular": (0.4, 0.7), "contaminantes": (0.35, 0.75), "clima": (0.25, 0.5)}
+    lineas = {fuente: _lineas(fuente) for fuente in FUENTES}
+    escritas = {fuente: 0 for fuente in FUENTES}
+    nuevas = []
+    for entrega in range(3):
+        for fuente, filas in lineas.items():
+            hasta = len(filas) if entrega == 2 else 1 + int((len(filas) - 1) * cortes[fuente][entrega])
+            with open(raw / f"{fuente}.csv", "a", encoding="utf-8") as f:
+                f.writelines(filas[escritas[fuente]:hasta])
+            escritas[fuente] = hasta
+        nuevas.append(gd.unificar(incluir_api=False, incremental=True))
+
+    assert nuevas[0].attrs["reconstruida"] and not nuevas[1].attrs["reconstruida"]
+    assert all(len(n) for n in nuevas)
+    # Lo devuelto en cada ejecución suma exactamente la tabla guardada
+    assert sum(len(n) for n in nuevas) == len(completa)
+
+    tabla = gd.almacen.cargar("TablaUnificada")
+    pd.testing.assert_frame_equal(_ordenada(tabla)[completa.columns], _ordenada(completa), check_dtype=False)
+
+
+def test_sin_datos_nuevos_no_lee_las_fuentes(tmp_path, monkeypatch):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for fuente in FUENTES:
+        (raw / f"{fuente}.csv").write_text("".join(_lineas(fuente)), encoding="utf-8")
+    gd = GestorDatos(ruta_raw=str(raw), ruta_processed=str(tmp_path / "processed"))
+    primera = gd.unificar(incluir_api=False, incremental=True)
+    assert len(primera) and primera.attrs["reconstruida"]
+    huella = gd.almacen.huella("TablaUnificada")
+
+    def no_leer(*args, **kwargs):
+        raise AssertionError("sin cambios en data/raw no se debe leer ninguna fuente")
+
+    monkeypatch.setattr(UnificacionIncremental, "_leer_nuevas", no_leer)
+    segunda = gd.unificar(incluir_api=False, incremental=True)
+    assert segunda.empty
+    assert gd.almacen.huella("TablaUnificada") == huella
+
+
+def test_fuente_reemplazada_reconstruye(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for fuente in FUENTES:
+        (raw / f"{fuente}.csv").write_text("".join(_lineas(fuente)), encoding="utf-8")
+    gd = GestorDatos(ruta_raw=str(raw), ruta_processed=str(tmp_path / "processed"))
+    gd.unificar(incluir_api=False, incremental=True)
+
+    # El archivo se achica: ya no es un append y se reconstruye la tabla completa
+    (raw / "clima.csv").write_text("".join(_lineas("clima")[:201]), encoding="utf-8")
+    resultado = gd.unificar(incluir_api=False, incremental=True)
+    assert resultado.attrs["reconstruida"]
+    assert len(gd.almacen.cargar("TablaUnificada")) == len(resultado)